@@ -39,7 +39,8 @@ def insert_doc(hostname, message, timestamp=None):
         "@timestamp": timestamp
     }
     
-    response = requests.post(url, auth=AUTH, headers=HEADERS, json=doc, verify=VERIFY_SSL)
+    # refresh=wait_for returns once the doc is searchable, so no sleep is needed afterwards
+    response = requests.post(url, auth=AUTH, headers=HEADERS, json=doc, params={"refresh": "wait_for"}, verify=VERIFY_SSL)
     if response.status_code == 201:
         print(f"Inserted doc for {hostname}")
     else:
@@ -292,20 +293,45 @@ def execute_monitor(monitor_id):
         print(f"Execution failed: {exec_resp.status_code} - {exec_resp.text}")
         return {}
 
-def check_mailhog():
-    """Check MailHog for the latest email and verify content."""
+def wait_until(check, timeout=10.0, interval=0.1, max_interval=2.0):
+    """Poll `check` with growing intervals until it returns a truthy value or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while True:
+        result = check()
+        if result or time.monotonic() >= deadline:
+            return result
+        time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+        interval = min(interval * 1.5, max_interval)
+
+def mailhog_message_count():
+    """Number of messages MailHog currently holds (0 if it cannot be reached)."""
+    try:
+        resp = requests.get("http://localhost:8025/api/v2/messages", params={"limit": 1})
+        return resp.json().get("total", 0) if resp.status_code == 200 else 0
+    except requests.RequestException:
+        return 0
+
+def check_mailhog(since_count=0, expected=1):
+    """Wait for `expected` emails beyond the `since_count` already in MailHog, then verify content."""
     print("\n--- Checking MailHog ---")
     try:
-        # Wait a moment for email to arrive
-        time.sleep(2)
-        response = requests.get("http://localhost:8025/api/v2/messages")
-        if response.status_code == 200:
-            messages = response.json()['items']
+        def _fetch_new_messages():
+            resp = requests.get("http://localhost:8025/api/v2/messages")
+            if resp.status_code != 200:
+                return None
+            data = resp.json()
+            new = data["total"] - since_count
+            # Newest first; return only once all expected emails are in.
+            return data["items"][:new] if new >= expected else None
+
+        # Poll until this run's emails arrive; earlier runs' messages don't count
+        messages = wait_until(_fetch_new_messages)
+        if messages is not None:
             if not messages:
                 print("No messages found in MailHog.")
                 return
 
-            print(f"Found {len(messages)} messages in MailHog.")
+            print(f"Found {len(messages)} new messages in MailHog.")
             
             # Check the last few messages (since we just ran the monitor)
             # We expect 2 messages (one for host-A, one for host-B) if it's per-bucket.
@@ -323,7 +349,7 @@ def check_mailhog():
             # We want to see if we have multiple emails.
             
         else:
-            print(f"Failed to query MailHog: {response.status_code}")
+            print(f"Expected {expected} new messages in MailHog, they did not arrive in time.")
     except Exception as e:
         print(f"Error checking MailHog: {e}")
 
@@ -397,8 +423,6 @@ if __name__ == "__main__":
         # --- Step 1: Trigger Host A ---
         print("\n=== STEP 1: Trigger Host A ===")
         insert_doc("host-A", "Error on A", int(time.time() * 1000))
-        print("Waiting 5 seconds for indexing...")
-        time.sleep(5)
         
         debug_search() # Check if data is there
         
@@ -417,9 +441,8 @@ if __name__ == "__main__":
         current_time = int(time.time() * 1000)
         insert_doc("host-A", "Error on A again", current_time)
         insert_doc("host-B", "Error on B", current_time)
-        print("Waiting 5 seconds for indexing...")
-        time.sleep(5)
 
+        mail_before = mailhog_message_count()
         triggered_2 = execute_monitor(monitor_id)
 
         # --- Step 4: Verify Throttling ---
@@ -437,4 +460,5 @@ if __name__ == "__main__":
         else:
             print(f">>> Step 4 FAIL: Host B status: {triggered_2.get('host-B', 'Not Found')}")
 
-        check_mailhog()
+        # One email per bucket whose action was not throttled.
+        check_mailhog(mail_before, expected=max(1, sum(1 for throttled in triggered_2.values() if not throttled)))
@@ -1,6 +1,10 @@
-from importlib.metadata import version, PackageNotFoundError
+def __getattr__(name):
+    # importlib.metadata is slow to import; resolve the version only on demand.
+    if name == "__version__":
+        from importlib.metadata import version, PackageNotFoundError
 
-try:
-    __version__ = version("opensearch-management")
-except PackageNotFoundError:
-    __version__ = "0.0.0"
+        try:
+            return version("opensearch-management")
+        except PackageNotFoundError:
+            return "0.0.0"
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache, optionally persisted to a JSON file.
+
+    CLI invocations are short-lived processes, so a cache that should survive
+    between commands is loaded from `path` on creation and written back
+    (atomically) on every update. Values must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = 256, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        if path:
+            self._load()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.time() - entry["stored_at"] > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry["value"]
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = {"stored_at": time.time(), "value": value}
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            if self.path:
+                self._save()
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None and self.path:
+                self._save()
+            return entry["value"] if entry else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            if self.path:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        # Stored oldest-first, so insertion order restores recency.
+        for key, entry in entries[-self.max_entries:]:
+            self._data[key] = entry
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(list(self._data.items()), f)
+        os.replace(tmp_path, self.path)
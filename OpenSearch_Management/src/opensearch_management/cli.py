@@ -1,13 +1,20 @@
+import json
+import os
 import typer
+from functools import lru_cache
 from typing import List
-from rich.console import Console
-from .config import get_settings, load_settings
-from .log_setup import configure_logging
-from .client import OpenSearchClient
-from .logic.index_operations import get_index_details
-from .logic.index_analysis import simulate_text_analysis, inspect_document_termvectors
-
-app = typer.Typer(help="OpenSearch Management Tool")
+from typer.core import TyperGroup
+
+
+class _RootGroup(TyperGroup):
+    """Keeps the raw argument list so `--clusters` can re-run the command per cluster."""
+
+    def parse_args(self, ctx, args):
+        ctx.meta["raw_args"] = list(args)
+        return super().parse_args(ctx, args)
+
+
+app = typer.Typer(help="OpenSearch Management Tool", cls=_RootGroup)
 index_app = typer.Typer(help="Manage OpenSearch Indices")
 app.add_typer(index_app, name="index")
 
@@ -15,8 +22,117 @@ app.add_typer(index_app, name="index")
 analyze_app = typer.Typer(help="Analyze text tokenization and stored term vectors")
 index_app.add_typer(analyze_app, name="analyze")
 
+# --- Aggregation Sub-commands ---
+agg_app = typer.Typer(help="Stream aggregation buckets")
+app.add_typer(agg_app, name="agg")
+
+# --- Alerting Monitor Sub-commands ---
+monitor_app = typer.Typer(help="Manage alerting monitors")
+app.add_typer(monitor_app, name="monitor")
+
+# --- Neural Search Sub-commands ---
+neural_app = typer.Typer(help="Neural search and k-NN utilities")
+app.add_typer(neural_app, name="neural")
+
+# --- Search Sub-commands ---
+search_app = typer.Typer(help="Run searches")
+app.add_typer(search_app, name="search")
+
+# --- Ingest Pipeline Sub-commands ---
+pipeline_app = typer.Typer(help="Inspect ingest pipelines")
+app.add_typer(pipeline_app, name="pipeline")
+
+# --- Field Sub-commands ---
+field_app = typer.Typer(help="Manage extracted fields")
+app.add_typer(field_app, name="field")
+
+# --- Query Analysis Sub-commands ---
+query_app = typer.Typer(help="Analyze captured queries")
+app.add_typer(query_app, name="query")
+
+# --- ISM Sub-commands ---
+ism_app = typer.Typer(help="Plan index lifecycle (rollover and ISM policies)")
+app.add_typer(ism_app, name="ism")
+
+# --- Segments Sub-commands ---
+segments_app = typer.Typer(help="Inspect and optimize index segments")
+app.add_typer(segments_app, name="segments")
+
+# --- Daemon Sub-commands ---
+daemon_app = typer.Typer(help="Background daemon that keeps connections and caches warm")
+app.add_typer(daemon_app, name="daemon")
+
+# --- Cluster Sub-commands ---
+cluster_app = typer.Typer(help="Cluster readiness and diagnostics")
+app.add_typer(cluster_app, name="cluster")
+
+
+@lru_cache(maxsize=None)
+def get_console():
+    from rich.console import Console
+
+    return Console()
+
+
+class CommandContext(dict):
+    """
+    `ctx.obj` for all commands. Settings and the client are built on first
+    access, so commands that never talk to the cluster (and `--help`) skip
+    parsing the config, configuring logging and importing `requests`.
+    """
+
+    def __missing__(self, key):
+        if key == "settings":
+            from .config import load_settings
+
+            value = load_settings(self["config_path"])
+            if self.get("cluster"):
+                value = value.for_cluster(self["cluster"])
+        elif key == "client":
+            from .client import OpenSearchClient
+            from .log_setup import configure_logging
+
+            settings = self["settings"]
+            configure_logging()
+            value = OpenSearchClient(
+                settings=settings,
+                dry_run=self["dry_run"],
+                query_history=self["query_history"],
+                metadata_ttl=self.get("metadata_ttl", 0.0),
+            )
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
+
+
+class ContextPool(dict):
+    """
+    Warm CommandContexts reused across commands by `shell` and `daemon`,
+    keyed by the global options and the config file's mtime (so editing
+    the config rebuilds the client on the next command).
+    """
 
-console = Console()
+    def __init__(self, metadata_ttl: float = 30.0):
+        super().__init__()
+        self.metadata_ttl = metadata_ttl
+
+    def context(self, config_path: str, dry_run: bool, query_history: bool, cluster: str = None) -> CommandContext:
+        config_path = os.path.abspath(config_path)
+        try:
+            mtime = os.path.getmtime(config_path)
+        except OSError:
+            mtime = None
+        key = (config_path, mtime, dry_run, query_history, cluster)
+        if key not in self:
+            self[key] = CommandContext(
+                config_path=config_path,
+                dry_run=dry_run,
+                query_history=query_history,
+                cluster=cluster,
+                metadata_ttl=self.metadata_ttl,
+            )
+        return self[key]
 
 
 @app.callback()
@@ -29,31 +145,87 @@ def main(
     query_history: bool = typer.Option(
         False, "-qh", "--query-history", help="Save query DSL to history."
     ),
+    cluster: str = typer.Option(
+        None, "--cluster", help="Use this cluster profile from the config."
+    ),
+    clusters: str = typer.Option(
+        None, "--clusters", help="Run the command concurrently on every cluster profile matching these comma-separated globs (e.g. 'prod-*')."
+    ),
+    fanout_workers: int = typer.Option(
+        8, "--fanout-workers", help="Clusters queried at the same time with --clusters."
+    ),
+    profile: bool = typer.Option(
+        False, "--profile", help="Print per-tag request timings (DNS/connect/TTFB/parse, bytes) at exit."
+    ),
+    profile_cpu: bool = typer.Option(
+        False, "--profile-cpu", help="With --profile, also cProfile the command and list the hottest functions of this package."
+    ),
 ):
-    configure_logging()
-    # Load settings from the specified config file
-    load_settings(config)
-    settings = get_settings()
-    
-    # Initialize the client once and pass it to sub-commands via ctx.obj
-    client = OpenSearchClient(
-        settings=settings,
-        dry_run=dry_run,
-        query_history=query_history,
-    )
-    
-    ctx.obj = {
-        "dry_run": dry_run, 
-        "query_history": query_history,
-        "client": client
-    }
+    pool = ctx.obj if isinstance(ctx.obj, ContextPool) else None
+
+    # Settings and the client are created lazily by CommandContext;
+    # shell/daemon pass a ContextPool so they stay warm between commands.
+    if pool is not None:
+        ctx.obj = pool.context(config, dry_run, query_history, cluster)
+    else:
+        ctx.obj = CommandContext(
+            config_path=config,
+            dry_run=dry_run,
+            query_history=query_history,
+            cluster=cluster,
+        )
+
+    if profile or profile_cpu:
+        _start_profiling(ctx, cpu=profile_cpu)
+
+    if cluster or clusters:
+        from .config import load_settings
+
+        profiles = load_settings(config).clusters
+        if cluster and cluster not in profiles:
+            raise typer.BadParameter(f"Unknown cluster profile '{cluster}'", param_hint="--cluster")
+
+    if clusters:
+        from .fanout import fan_out, select_clusters, strip_option
+
+        selected = select_clusters(profiles, clusters)
+        if not selected:
+            raise typer.BadParameter(f"No cluster profile matches '{clusters}'", param_hint="--clusters")
+        hosts = {name: ",".join(profiles[name].connection.hosts) for name in selected}
+        # Profiling is reported once, by this process, across all clusters.
+        argv = [a for a in strip_option(ctx.meta["raw_args"], "--clusters") if a not in ("--profile", "--profile-cpu")]
+        raise typer.Exit(fan_out(argv, selected, hosts, pool or ContextPool(metadata_ttl=0.0), fanout_workers))
+
+
+def _start_profiling(ctx: typer.Context, cpu: bool):
+    import time
+    from . import metrics
+
+    metrics.registry.reset()
+    profiler = None
+    if cpu:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    started = time.perf_counter()
+
+    def _report():
+        if profiler is not None:
+            profiler.disable()
+        metrics.display_report(time.perf_counter() - started)
+        if profiler is not None:
+            state_dir = ctx.obj["settings"].settings.state_dir
+            metrics.display_cpu_profile(profiler, path=os.path.join(state_dir, "profile.pstats"))
+
+    ctx.call_on_close(_report)
 
 
 @app.command()
-def hello(name: str = "world"):
+def hello(ctx: typer.Context, name: str = "world"):
     """Simple hello command."""
-    settings = get_settings()
-    console.print(f"Hello, {name}! Env: {settings.settings.app_env}")
+    settings = ctx.obj["settings"]
+    get_console().print(f"Hello, {name}! Env: {settings.settings.app_env}")
 
 
 @index_app.command("info")
@@ -64,10 +236,51 @@ def index_info(
     """
     Get detailed information about one or more indices.
     """
+    from .logic.index_operations import get_index_details
+
     # Retrieve the client from the context
     client = ctx.obj["client"]
     get_index_details(client, indices)
 
+@index_app.command("fields")
+def index_fields(
+    ctx: typer.Context,
+    index: str = typer.Argument(..., help="Index name or pattern"),
+    usage: bool = typer.Option(False, "--usage", "-u", help="Rank fields by disk usage and query frequency"),
+    sample: int = typer.Option(None, "--sample", help="Estimate from N sampled documents instead of _disk_usage"),
+    slowlogs: List[str] = typer.Option(None, "--slowlog", "-s", help="Search slow log file or glob for query counts; repeatable"),
+    no_history: bool = typer.Option(False, "--no-history", help="Ignore the query history directory"),
+    limit: int = typer.Option(50, "--limit", "-n", help="Fields to list"),
+):
+    """
+    List fields with query tips; --usage adds what each field costs on disk.
+    """
+    client = ctx.obj["client"]
+    if not usage:
+        from .logic.index_operations import show_field_analysis
+
+        show_field_analysis(client, index)
+        return
+
+    from .logic.field_usage import show_field_usage
+
+    history_dir = None if no_history else ctx.obj["settings"].settings.history_dir
+    show_field_usage(client, index, sample=sample, history_dir=history_dir, slowlogs=slowlogs, limit=limit)
+
+@index_app.command("bulk-mode")
+def index_bulk_mode(
+    ctx: typer.Context,
+    action: str = typer.Argument(..., help="on, off or status"),
+    patterns: List[str] = typer.Argument(None, help="Index names or patterns (off without patterns restores all)"),
+):
+    """
+    Switch indices to ingest-optimized settings and restore the previous values.
+    """
+    from .logic.bulk_mode import bulk_mode_command
+
+    client = ctx.obj["client"]
+    bulk_mode_command(client, action, patterns)
+
 @analyze_app.command("simulate")
 def analyze_simulate(
     ctx: typer.Context,
@@ -79,6 +292,8 @@ def analyze_simulate(
     """
     Simulate how text is tokenized by an index (using _analyze API).
     """
+    from .logic.index_analysis import simulate_text_analysis
+
     client = ctx.obj["client"]
     simulate_text_analysis(client, index, text, field, analyzer)
 
@@ -92,10 +307,635 @@ def analyze_doc(
     """
     Inspect how an existing document was tokenized (using _termvectors API).
     """
+    from .logic.index_analysis import inspect_document_termvectors
+
     client = ctx.obj["client"]
     field_list = fields.split(",") if fields else None
     inspect_document_termvectors(client, index, doc_id, field_list)
 
+@agg_app.command("scan")
+def agg_scan(
+    ctx: typer.Context,
+    index: str = typer.Argument(..., help="Index name or pattern"),
+    terms: List[str] = typer.Option(None, "--terms", "-t", help="Terms source field (repeatable)"),
+    date_histogram: List[str] = typer.Option(None, "--date-histogram", help="Date histogram source as FIELD:INTERVAL (repeatable)"),
+    query: str = typer.Option(None, "--query", "-q", help="Query DSL (JSON) to restrict the scan"),
+    sub_aggs: str = typer.Option(None, "--sub-aggs", help="Sub-aggregations (JSON) computed per bucket"),
+    page_size: int = typer.Option(1000, "--page-size", help="Buckets per composite page"),
+    partitions: int = typer.Option(1, "--partitions", "-p", help="Hash partitions of the first source scanned in parallel"),
+    workers: int = typer.Option(None, "--workers", "-w", help="Max parallel partition workers (default: one per partition)"),
+    as_json: bool = typer.Option(False, "--jsonl", help="Emit each bucket as a JSON line"),
+    limit: int = typer.Option(0, "--limit", help="Stop after this many buckets (0 = all)"),
+):
+    """
+    Stream every bucket of an aggregation using composite `after_key` paging.
+    """
+    from .logic.aggregation_scan import build_composite_sources, scan_aggregation
+
+    client = ctx.obj["client"]
+    sources = build_composite_sources(terms, date_histogram)
+    scan_aggregation(
+        client,
+        index,
+        sources,
+        query=json.loads(query) if query else None,
+        sub_aggs=json.loads(sub_aggs) if sub_aggs else None,
+        page_size=page_size,
+        partitions=partitions,
+        max_workers=workers,
+        as_json=as_json,
+        limit=limit,
+    )
+
+@monitor_app.command("apply")
+def monitor_apply(
+    ctx: typer.Context,
+    paths: List[str] = typer.Argument(..., help="Monitor definition files or directories (JSON/YAML)"),
+    workers: int = typer.Option(8, "--workers", "-w", help="Parallel create/update requests"),
+):
+    """
+    Create or update monitors from files, skipping monitors that are unchanged.
+    """
+    from .logic.monitor_manager import apply_monitors
+
+    client = ctx.obj["client"]
+    apply_monitors(client, paths, workers=workers)
+
+@monitor_app.command("evaluate")
+def monitor_evaluate(
+    ctx: typer.Context,
+    source: str = typer.Argument(..., help="Monitor definition file, or the ID of an existing monitor"),
+    name: str = typer.Option(None, "--name", "-n", help="Monitor name when the file holds several monitors"),
+    sort_by: str = typer.Option(None, "--sort", "-s", help="Sort buckets by this buckets_path variable"),
+    ascending: bool = typer.Option(False, "--asc", help="Sort ascending (default: descending)"),
+    show_all: bool = typer.Option(False, "--all", help="Show buckets that do not fire as well"),
+    limit: int = typer.Option(50, "--limit", help="Max buckets shown per trigger (0 = all)"),
+):
+    """
+    Run a monitor's search once and evaluate bucket-level triggers locally (no alerts are sent).
+    """
+    from .logic.monitor_evaluation import evaluate_monitor
+
+    client = ctx.obj["client"]
+    evaluate_monitor(client, source, name=name, sort_by=sort_by, descending=not ascending, show_all=show_all, limit=limit)
+
+@app.command("datagen")
+def datagen(
+    ctx: typer.Context,
+    index: str = typer.Argument("patronidata", help="Target index"),
+    docs: int = typer.Option(100_000, "--docs", "-n", help="Total documents to generate (0 = unlimited, use --duration)"),
+    rate: int = typer.Option(0, "--rate", "-r", help="Target docs/sec across all workers (0 = unthrottled)"),
+    hosts: int = typer.Option(50, "--hosts", help="Distinct hostnames (cardinality)"),
+    error_ratio: float = typer.Option(0.05, "--error-ratio", help="Fraction of ERROR/FATAL/WARNING lines"),
+    skew: float = typer.Option(0.0, "--skew", help="Max random timestamp lag in seconds"),
+    workers: int = typer.Option(4, "--workers", "-w", help="Parallel bulk workers"),
+    batch_size: int = typer.Option(2000, "--batch-size", "-b", help="Documents per _bulk request"),
+    duration: float = typer.Option(0.0, "--duration", help="Stop after this many seconds (0 = until --docs)"),
+    timestamp_field: str = typer.Option("@timestamp", "--timestamp-field", help="Name of the timestamp field"),
+    create_index: bool = typer.Option(False, "--create-index", help="Create the index with the patronidata mapping first"),
+    seed: int = typer.Option(None, "--seed", help="Random seed for reproducible data"),
+    refresh: bool = typer.Option(False, "--refresh", help="Refresh the index at the end so the data is searchable"),
+):
+    """
+    Generate synthetic Patroni/Postgres/etcd logs and stream them through _bulk.
+    """
+    from .logic.datagen import generate_logs
+
+    client = ctx.obj["client"]
+    generate_logs(
+        client,
+        index,
+        total_docs=docs,
+        rate=rate,
+        hosts=hosts,
+        error_ratio=error_ratio,
+        skew_seconds=skew,
+        workers=workers,
+        batch_size=batch_size,
+        duration=duration,
+        timestamp_field=timestamp_field,
+        create_index=create_index,
+        seed=seed,
+        refresh=refresh,
+    )
+
+@cluster_app.command("wait")
+def cluster_wait(
+    ctx: typer.Context,
+    status: str = typer.Option("yellow", "--status", "-s", help="Minimum health status: yellow or green"),
+    index: str = typer.Option(None, "--index", "-i", help="Wait for this index instead of the whole cluster"),
+    timeout: float = typer.Option(60.0, "--timeout", "-t", help="Give up after this many seconds"),
+):
+    """
+    Block until the cluster (or an index) reaches the given health status.
+    """
+    from .waits import WaitTimeout, wait_for_cluster_health
+
+    client = ctx.obj["client"]
+    try:
+        health = wait_for_cluster_health(client, status=status, index=index, timeout=timeout)
+    except WaitTimeout as e:
+        get_console().print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+    if health:
+        get_console().print(f"[green]Health is {health.get('status')}[/green]")
+
+@cluster_app.command("wait-task")
+def cluster_wait_task(
+    ctx: typer.Context,
+    task_id: str = typer.Argument(..., help="Task ID (node:id) returned by a wait_for_completion=false request"),
+    timeout: float = typer.Option(3600.0, "--timeout", "-t", help="Give up after this many seconds"),
+):
+    """
+    Block until a background task (reindex, update_by_query, ...) completes.
+    """
+    from .waits import WaitTimeout, wait_for_task
+
+    client = ctx.obj["client"]
+    try:
+        result = wait_for_task(client, task_id, timeout=timeout)
+    except (WaitTimeout, RuntimeError) as e:
+        get_console().print(f"[bold red]{e}[/bold red]")
+        raise typer.Exit(code=1)
+    status = result.get("task", {}).get("status", {})
+    get_console().print(f"[green]Task {task_id} completed[/green] {status if status else ''}")
+
+@cluster_app.command("diagnose")
+def cluster_diagnose(
+    ctx: typer.Context,
+    samples: int = typer.Option(5, "--samples", "-n", help="Number of samples"),
+    interval: float = typer.Option(2.0, "--interval", help="Seconds between sample starts"),
+    threads: int = typer.Option(3, "--threads", help="Busiest threads per node in each hot_threads sample"),
+    hot_interval: str = typer.Option("500ms", "--hot-interval", help="hot_threads sampling interval"),
+    top: int = typer.Option(3, "--top", help="Hot stacks shown per node"),
+    output: str = typer.Option(None, "--output", "-o", help="Time series file (default <state_dir>/diagnose/<time>.jsonl)"),
+    replay: str = typer.Option(None, "--replay", help="Summarize a saved time series instead of sampling"),
+):
+    """
+    Sample hot threads, JVM/GC, thread pools, breakers and pending tasks, and summarize them.
+    """
+    from .logic.cluster_diagnose import diagnose_cluster
+
+    client = ctx.obj["client"]
+    diagnose_cluster(
+        client,
+        samples=samples,
+        interval=interval,
+        threads=threads,
+        hot_interval=hot_interval,
+        output=output,
+        replay=replay,
+        top=top,
+    )
+
+@neural_app.command("backfill")
+def neural_backfill(
+    ctx: typer.Context,
+    source: str = typer.Argument(..., help="Source index (e.g. patronidata)"),
+    dest: str = typer.Argument(..., help="Destination neural index (e.g. patronidata-neural)"),
+    pipeline: str = typer.Option(..., "--pipeline", "-p", help="Ingest pipeline with the text_embedding processor"),
+    timestamp_field: str = typer.Option("@timestamp", "--timestamp-field", help="Field used to partition and order the source"),
+    query: str = typer.Option(None, "--query", "-q", help="Query DSL (JSON) restricting the source documents"),
+    slices: int = typer.Option(4, "--slices", help="Time-range partitions of the source"),
+    workers: int = typer.Option(4, "--workers", "-w", help="Partitions processed in parallel"),
+    batch_size: int = typer.Option(200, "--batch-size", "-b", help="Initial documents per bulk request"),
+    max_batch_size: int = typer.Option(2000, "--max-batch-size", help="Upper bound for the adaptive batch size"),
+    target_latency: float = typer.Option(5.0, "--target-latency", help="Target seconds per bulk request (inference time)"),
+    checkpoint: str = typer.Option(None, "--checkpoint", help="Checkpoint file (default: <state_dir>/backfill_<source>_<dest>.json)"),
+    restart: bool = typer.Option(False, "--restart", help="Ignore an existing checkpoint and start over"),
+    use_bulk_mode: bool = typer.Option(False, "--bulk-mode", help="Use ingest-optimized settings on dest while running"),
+):
+    """
+    Reindex a source index through an embedding pipeline with parallel, resumable workers.
+    """
+    import contextlib
+    from .logic.bulk_mode import bulk_mode
+    from .logic.neural_backfill import backfill_embeddings
+
+    client = ctx.obj["client"]
+    with contextlib.ExitStack() as stack:
+        if use_bulk_mode:
+            try:
+                stack.enter_context(bulk_mode(client, [dest]))
+            except ValueError as e:
+                get_console().print(f"[bold red]Error enabling bulk mode:[/bold red] {e}")
+                raise typer.Exit(code=1)
+        backfill_embeddings(
+            client,
+            source,
+            dest,
+            pipeline,
+            timestamp_field=timestamp_field,
+            query=json.loads(query) if query else None,
+            slices=slices,
+            workers=workers,
+            batch_size=batch_size,
+            max_batch_size=max_batch_size,
+            target_latency=target_latency,
+            checkpoint_path=checkpoint,
+            restart=restart,
+        )
+
+@neural_app.command("bench")
+def neural_bench(
+    ctx: typer.Context,
+    source_index: str = typer.Option(None, "--source-index", "-s", help="Sample vectors from this index (default: synthetic vectors)"),
+    field: str = typer.Option("message_embedding", "--field", "-f", help="knn_vector field to sample"),
+    dimension: int = typer.Option(384, "--dim", help="Dimension of synthetic vectors"),
+    sample: int = typer.Option(10_000, "--sample", help="Vectors indexed per candidate"),
+    queries: int = typer.Option(200, "--queries", help="Held-out query vectors"),
+    k: int = typer.Option(10, "-k", help="Neighbours per query (recall@k)"),
+    engines: str = typer.Option("lucene,faiss", "--engines", help="Comma-separated engines"),
+    ms: str = typer.Option("8,16,32", "--m", help="Comma-separated HNSW m values"),
+    ef_constructions: str = typer.Option("64,128,256", "--ef-construction", help="Comma-separated ef_construction values"),
+    ef_search: int = typer.Option(None, "--ef-search", help="index.knn.algo_param.ef_search (nmslib/faiss)"),
+    space_type: str = typer.Option("l2", "--space-type", help="l2, cosinesimil or innerproduct"),
+    no_force_merge: bool = typer.Option(False, "--no-force-merge", help="Skip merging each index to one segment"),
+    keep: bool = typer.Option(False, "--keep", help="Keep the benchmark indices afterwards"),
+    seed: int = typer.Option(42, "--seed", help="Sampling / synthetic data seed"),
+):
+    """
+    Sweep HNSW parameters and report build time, size, memory, latency and recall@k.
+    """
+    from .logic.knn_benchmark import build_candidates, run_knn_benchmark
+
+    client = ctx.obj["client"]
+    candidates = build_candidates(
+        [e.strip() for e in engines.split(",") if e.strip()],
+        [int(v) for v in ms.split(",")],
+        [int(v) for v in ef_constructions.split(",")],
+        space_type,
+    )
+    run_knn_benchmark(
+        client,
+        candidates,
+        source_index=source_index,
+        field=field,
+        dimension=dimension,
+        sample_size=sample,
+        query_count=queries,
+        k=k,
+        ef_search=ef_search,
+        force_merge=not no_force_merge,
+        keep=keep,
+        seed=seed,
+    )
+
+@neural_app.command("memory")
+def neural_memory(
+    ctx: typer.Context,
+    indices: List[str] = typer.Argument(..., help="Index names or patterns"),
+    exact_counts: bool = typer.Option(False, "--exact-counts", help="Count documents per vector field instead of using docs.count"),
+):
+    """
+    Estimate k-NN memory per knn_vector field and project quantization savings.
+    """
+    from .logic.knn_memory import analyze_knn_memory
+
+    client = ctx.obj["client"]
+    analyze_knn_memory(client, indices, exact_counts=exact_counts)
+
+@search_app.command("hybrid")
+def search_hybrid(
+    ctx: typer.Context,
+    index: str = typer.Argument(..., help="Index to search"),
+    query: str = typer.Argument(..., help="Query text"),
+    text_field: str = typer.Option("_raw", "--text-field", help="Field for the lexical match query"),
+    vector_field: str = typer.Option("message_embedding", "--vector-field", help="knn_vector field for the neural query"),
+    model_id: str = typer.Option(None, "--model-id", "-m", help="Embedding model (default: from the index's default ingest pipeline)"),
+    weights: str = typer.Option("0.3,0.7", "--weights", "-w", help="Lexical,neural weights"),
+    k: int = typer.Option(50, "-k", help="Neural candidates"),
+    size: int = typer.Option(10, "--size", "-n", help="Hits to return"),
+    pipeline: str = typer.Option("hybrid-norm-pipeline", "--pipeline", "-p", help="Search pipeline to create/use"),
+    technique: str = typer.Option("min_max", "--technique", help="Normalization technique (min_max, l2)"),
+    combination: str = typer.Option("arithmetic_mean", "--combination", help="Combination technique (arithmetic_mean, geometric_mean, harmonic_mean)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Bypass the local result cache"),
+    profile_subqueries: bool = typer.Option(False, "--profile-subqueries", help="Also time the match and neural queries on their own"),
+    fields: List[str] = typer.Option(None, "--field", "-f", help="Source fields to display (repeatable)"),
+):
+    """
+    Hybrid lexical + neural search with score normalization and a local result cache.
+    """
+    from .logic.hybrid_search import hybrid_search
+
+    client = ctx.obj["client"]
+    hybrid_search(
+        client,
+        index,
+        query,
+        text_field=text_field,
+        vector_field=vector_field,
+        model_id=model_id,
+        weights=[float(w) for w in weights.split(",")],
+        k=k,
+        size=size,
+        pipeline=pipeline,
+        technique=technique,
+        combination=combination,
+        use_cache=not no_cache,
+        profile_subqueries=profile_subqueries,
+        fields=fields,
+    )
+
+@search_app.command("async")
+def search_async(
+    ctx: typer.Context,
+    index: str = typer.Argument(..., help="Index or pattern"),
+    body: str = typer.Option(None, "--body", "-b", help="Search body (JSON)"),
+    body_file: str = typer.Option(None, "--body-file", help="File with the search body (JSON)"),
+    time_field: str = typer.Option("@timestamp", "--time-field", help="Field for --from/--to"),
+    start: str = typer.Option(None, "--from", help="Range start, e.g. now-90d or 2024-01-01"),
+    end: str = typer.Option(None, "--to", help="Range end, e.g. now"),
+    search_id: str = typer.Option(None, "--id", help="Resume or fetch an existing async search"),
+    keep_alive: str = typer.Option("1d", "--keep-alive", help="How long the cluster keeps the search and its result"),
+    timeout: float = typer.Option(3600.0, "--timeout", help="Seconds to poll before detaching"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignore locally cached results"),
+    cache_ttl: float = typer.Option(600.0, "--cache-ttl", help="Seconds to reuse results of relative (now-based) ranges"),
+    no_partial: bool = typer.Option(False, "--no-partial", help="Do not print partial results while polling"),
+    output: str = typer.Option(None, "--output", "-o", help="Write the final response to this JSON file"),
+):
+    """
+    Run a long search asynchronously: poll, show partial results, resume after disconnects.
+    """
+    from .logic.async_search import run_async_search
+
+    if body_file:
+        with open(body_file) as f:
+            body = f.read()
+    client = ctx.obj["client"]
+    run_async_search(
+        client,
+        index,
+        body=json.loads(body) if body else None,
+        time_field=time_field,
+        start=start,
+        end=end,
+        search_id=search_id,
+        keep_alive=keep_alive,
+        timeout=timeout,
+        use_cache=not no_cache,
+        cache_ttl=cache_ttl,
+        show_partial=not no_partial,
+        output=output,
+    )
+
+@pipeline_app.command("profile")
+def pipeline_profile(
+    ctx: typer.Context,
+    pipeline_id: str = typer.Argument(..., help="Ingest pipeline id"),
+    index: str = typer.Option(None, "--index", "-i", help="Sample random documents from this index"),
+    file: str = typer.Option(None, "--file", help="JSON-lines file of sample documents (instead of --index)"),
+    sample: int = typer.Option(500, "--sample", "-n", help="Number of sample documents"),
+    batch_size: int = typer.Option(50, "--batch-size", "-b", help="Documents per _simulate request"),
+    workers: int = typer.Option(4, "--workers", "-w", help="Concurrent _simulate requests"),
+    no_isolate: bool = typer.Option(False, "--no-isolate", help="Skip per-processor timing runs"),
+):
+    """
+    Profile an ingest pipeline: per-processor time, drop rate and size growth.
+    """
+    from .logic.pipeline_profiler import profile_pipeline
+
+    client = ctx.obj["client"]
+    profile_pipeline(
+        client,
+        pipeline_id,
+        index=index,
+        file=file,
+        sample=sample,
+        batch_size=batch_size,
+        workers=workers,
+        isolate=not no_isolate,
+    )
+
+@field_app.command("materialize")
+def field_materialize(
+    ctx: typer.Context,
+    index: str = typer.Argument(..., help="Index or pattern"),
+    name: str = typer.Option(None, "--name", help="Target keyword field (defaults to the runtime field name)"),
+    regex: str = typer.Option(None, "--regex", help="Regex whose first capture group is the value"),
+    grok: str = typer.Option(None, "--grok", help="Grok pattern that captures into --name"),
+    runtime_field: str = typer.Option(None, "--runtime-field", help="Runtime field defined in the index mapping"),
+    script: str = typer.Option(None, "--script", help="Painless runtime field script (emit(...))"),
+    source_field: str = typer.Option("_raw", "--source-field", help="Field the value is extracted from"),
+    doc_field: str = typer.Option(None, "--doc-field", help="Doc-values field for the runtime script (default <source-field>.keyword)"),
+    pipeline: str = typer.Option(None, "--pipeline", help="Pipeline to add the processor to (default: the index default_pipeline)"),
+    backfill: bool = typer.Option(False, "--backfill", help="Fill existing documents with _update_by_query"),
+    slices: str = typer.Option("auto", "--slices", help="Parallel slices for the backfill"),
+    requests_per_second: float = typer.Option(None, "--requests-per-second", help="Throttle the backfill"),
+    sample: int = typer.Option(200, "--sample", "-n", help="Documents used to verify the processor"),
+    runs: int = typer.Option(5, "--runs", help="Benchmark repetitions"),
+    force: bool = typer.Option(False, "--force", help="Apply even if verification finds mismatches"),
+):
+    """
+    Materialize a runtime/regex/grok field into an ingest-time keyword field.
+    """
+    from .logic.field_materializer import materialize_field
+
+    client = ctx.obj["client"]
+    materialize_field(
+        client,
+        index,
+        name=name,
+        regex=regex,
+        grok=grok,
+        runtime_field=runtime_field,
+        script=script,
+        source_field=source_field,
+        doc_field=doc_field,
+        pipeline=pipeline,
+        backfill=backfill,
+        slices=slices,
+        requests_per_second=requests_per_second,
+        sample=sample,
+        runs=runs,
+        force=force,
+    )
+
+@app.command("tail")
+def tail(
+    ctx: typer.Context,
+    index: str = typer.Argument(..., help="Index or pattern"),
+    query: str = typer.Option(None, "--query", "-q", help="Query string (e.g. 'host.name:patroni1 AND error') or query DSL (JSON)"),
+    lines: int = typer.Option(10, "--lines", "-n", help="Recent documents to print first"),
+    fields: List[str] = typer.Option(None, "--field", "-f", help="Fields to print (default host.name, _raw)"),
+    as_json: bool = typer.Option(False, "--json", help="Print each document as a JSON line"),
+    time_field: str = typer.Option("@timestamp", "--time-field", help="Sort/cursor field"),
+    tiebreaker: str = typer.Option("_shard_doc", "--tiebreaker", help="Secondary sort: _shard_doc (per-poll point in time) or a unique doc-values field"),
+    lag: float = typer.Option(5.0, "--lag", help="Seconds re-read on each poll to catch late documents"),
+    min_interval: float = typer.Option(0.5, "--min-interval", help="Poll interval while documents arrive"),
+    max_interval: float = typer.Option(10.0, "--max-interval", help="Poll interval ceiling while idle"),
+):
+    """
+    Follow new documents of an index, like tail -f.
+    """
+    from .logic.log_tail import tail_index
+
+    client = ctx.obj["client"]
+    tail_index(
+        client,
+        index,
+        query=query,
+        time_field=time_field,
+        tiebreaker=tiebreaker,
+        lines=lines,
+        fields=fields,
+        as_json=as_json,
+        lag=lag,
+        min_interval=min_interval,
+        max_interval=max_interval,
+    )
+
+@query_app.command("top")
+def query_top_cmd(
+    ctx: typer.Context,
+    slowlogs: List[str] = typer.Option(None, "--slowlog", "-s", help="Search slow log file or glob (.gz ok); repeatable"),
+    no_history: bool = typer.Option(False, "--no-history", help="Ignore the query history directory"),
+    history_dir: str = typer.Option(None, "--history-dir", help="Query history directory (default from settings)"),
+    sort: str = typer.Option("total", "--sort", help="Rank by total, p95, max or count"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Fingerprints to list"),
+    examples: int = typer.Option(3, "--examples", help="Worst examples to print"),
+):
+    """
+    Rank query shapes by cost from slow logs and captured history (-qh).
+    """
+    from .logic.query_top import query_top
+
+    if sort not in ("total", "p95", "max", "count"):
+        raise typer.BadParameter("--sort must be one of total, p95, max, count")
+    history_dir = None if no_history else history_dir or ctx.obj["settings"].settings.history_dir
+    query_top(history_dir=history_dir, slowlogs=slowlogs, sort=sort, limit=limit, examples=examples)
+
+@ism_app.command("plan")
+def ism_plan(
+    ctx: typer.Context,
+    pattern: str = typer.Argument(..., help="Existing time-based indices, e.g. 'patronidata-*'"),
+    alias: str = typer.Option(None, "--alias", help="Rollover alias (default: the pattern prefix)"),
+    policy_id: str = typer.Option(None, "--policy-id", help="ISM policy id (default <alias>-rollover)"),
+    target_shard_gb: float = typer.Option(30.0, "--target-shard-gb", help="Primary shard size to roll over at"),
+    min_shard_gb: float = typer.Option(10.0, "--min-shard-gb", help="Lower bound of the shard size band"),
+    max_shard_gb: float = typer.Option(50.0, "--max-shard-gb", help="Upper bound of the shard size band"),
+    max_age_days: int = typer.Option(30, "--max-age-days", help="Roll over after this many days even if small"),
+    warm_after: str = typer.Option("7d", "--warm-after", help="Move to warm this long after rollover"),
+    delete_after: str = typer.Option("30d", "--delete-after", help="Delete this long after rollover"),
+    warm_replicas: int = typer.Option(None, "--warm-replicas", help="Replica count in the warm state"),
+    warm_attribute: str = typer.Option(None, "--warm-attribute", help="Node attribute for warm shards, e.g. temp=warm"),
+    apply: bool = typer.Option(False, "--apply", help="Create or update the template, policy and alias"),
+):
+    """
+    Plan rollover conditions, shard counts and an ISM policy from index history.
+    """
+    from .logic.ism_planner import plan_ism
+
+    client = ctx.obj["client"]
+    plan_ism(
+        client,
+        pattern,
+        alias=alias,
+        policy_id=policy_id,
+        target_shard_gb=target_shard_gb,
+        min_shard_gb=min_shard_gb,
+        max_shard_gb=max_shard_gb,
+        max_age_days=max_age_days,
+        warm_after=warm_after,
+        delete_after=delete_after,
+        warm_replicas=warm_replicas,
+        warm_attribute=warm_attribute,
+        apply=apply,
+    )
+
+@segments_app.command("optimize")
+def segments_optimize(
+    ctx: typer.Context,
+    pattern: str = typer.Argument(..., help="Index pattern, e.g. 'logs-2024-*'"),
+    sort: str = typer.Option("speed", "--sort", help="Rank by 'speed' (segments per shard) or 'disk' (deleted docs reclaimed)"),
+    limit: int = typer.Option(20, "--limit", help="Maximum number of indices to merge"),
+    include_active: bool = typer.Option(False, "--include-active", help="Also consider indices that still take writes"),
+    max_num_segments: int = typer.Option(1, "--max-num-segments", help="Target segments per shard"),
+    expunge_deletes: bool = typer.Option(False, "--expunge-deletes", help="Only merge away deleted documents"),
+    concurrency: int = typer.Option(2, "--concurrency", help="Indices merged at once"),
+    per_node: int = typer.Option(1, "--per-node", help="Concurrent merges per data node"),
+    headroom_gb: float = typer.Option(20.0, "--headroom-gb", help="Free disk each node must keep after the rewrite"),
+    timeout: float = typer.Option(6 * 3600, "--timeout", help="Seconds to wait for merges to finish"),
+    apply: bool = typer.Option(False, "--apply", help="Run the force merges (default: plan only)"),
+):
+    """
+    Rank read-only and rolled-over indices by force-merge gain and merge them.
+    """
+    from .logic.segment_optimizer import optimize_segments
+
+    client = ctx.obj["client"]
+    optimize_segments(
+        client,
+        pattern,
+        sort=sort,
+        limit=limit,
+        include_active=include_active,
+        max_num_segments=max_num_segments,
+        expunge_deletes=expunge_deletes,
+        concurrency=concurrency,
+        per_node=per_node,
+        headroom_gb=headroom_gb,
+        timeout=timeout,
+        apply=apply,
+    )
+
+@app.command("shell")
+def shell(
+    ctx: typer.Context,
+    metadata_ttl: float = typer.Option(30.0, "--metadata-ttl", help="Seconds to cache mappings/settings between commands"),
+):
+    """
+    Interactive shell: run commands against a warm client and caches.
+    """
+    from .shell import repl
+
+    base_args = ["--config", ctx.obj["config_path"]]
+    if ctx.obj["dry_run"]:
+        base_args.append("--dry-run")
+    if ctx.obj["query_history"]:
+        base_args.append("--query-history")
+    repl(ContextPool(metadata_ttl), base_args)
+
+@daemon_app.command("start")
+def daemon_start(
+    socket_path: str = typer.Option(None, "--socket", help="Unix socket path (default: $OPENSEARCH_MANAGER_SOCKET or .opensearch-manager/daemon.sock)"),
+    metadata_ttl: float = typer.Option(30.0, "--metadata-ttl", help="Seconds to cache mappings/settings between commands"),
+):
+    """
+    Serve CLI invocations over a Unix socket (runs in the foreground).
+    """
+    from .shell import default_socket_path, serve
+
+    serve(socket_path or default_socket_path(), ContextPool(metadata_ttl))
+
+@daemon_app.command("stop")
+def daemon_stop(
+    socket_path: str = typer.Option(None, "--socket", help="Unix socket path"),
+):
+    """
+    Stop a running daemon.
+    """
+    from .shell import default_socket_path, send_control
+
+    reply = send_control(socket_path or default_socket_path(), "stop")
+    get_console().print("[green]Daemon stopped[/green]" if reply else "[yellow]No daemon running[/yellow]")
+
+@daemon_app.command("status")
+def daemon_status(
+    socket_path: str = typer.Option(None, "--socket", help="Unix socket path"),
+):
+    """
+    Show whether a daemon is serving commands.
+    """
+    from .shell import default_socket_path, send_control
+
+    path = socket_path or default_socket_path()
+    reply = send_control(path, "ping")
+    if not reply:
+        get_console().print(f"[yellow]No daemon listening on {path}[/yellow]")
+        raise typer.Exit(1)
+    get_console().print(f"[green]Daemon pid {reply['pid']} on {path}[/green] ({reply['commands']} commands served, up {reply['uptime']:.0f}s)")
+
 if __name__ == "__main__":
     app()
 
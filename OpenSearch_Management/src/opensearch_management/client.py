@@ -1,12 +1,16 @@
+import copy
 import json
 import os
 import datetime
+import time
 from typing import Any, Dict, Optional, Union
 import requests
 from rich.console import Console
 from rich.syntax import Syntax
 import structlog
 from .config import Settings
+from .cache import LRUCache
+from . import metrics
 
 logger = structlog.get_logger()
 console = Console()
@@ -14,7 +18,11 @@ console = Console()
 
 class OpenSearchClient:
     def __init__(
-        self, settings: Settings, dry_run: bool = False, query_history: bool = False
+        self,
+        settings: Settings,
+        dry_run: bool = False,
+        query_history: bool = False,
+        metadata_ttl: float = 0.0,
     ):
         self.settings = settings
         self.dry_run = dry_run
@@ -37,6 +45,20 @@ class OpenSearchClient:
 
         self.verify_certs = settings.connection.verify_certs
 
+        # One pooled session per client: keep-alive connections are reused
+        # across requests and by the worker threads of parallel commands.
+        self.session = requests.Session()
+        adapter = metrics.InstrumentedAdapter(pool_connections=4, pool_maxsize=32)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if settings.settings.metrics_textfile:
+            metrics.enable_textfile_export(settings.settings.metrics_textfile)
+
+        # Only long-lived processes (shell/daemon) set a TTL; one-shot commands
+        # always read fresh metadata.
+        self._metadata_cache = LRUCache(max_entries=512, ttl=metadata_ttl) if metadata_ttl > 0 else None
+
         # Ensure history directory exists if needed
         if self.query_history:
             history_dir = settings.settings.history_dir
@@ -48,17 +70,25 @@ class OpenSearchClient:
         url: str,
         body: Optional[Dict[str, Any]] = None,
         tag: str = "query",
+        params: Optional[Dict[str, Any]] = None,
+        record: Optional[Dict[str, Any]] = None,
     ):
-        timestamp = datetime.datetime.now().isoformat()
+        now = datetime.datetime.now()
         history_dir = self.settings.settings.history_dir
-        filename = f"{history_dir}/{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{tag}.json"
+        filename = f"{history_dir}/{now.strftime('%Y%m%d_%H%M%S_%f')}_{tag}.json"
 
+        record = record or {}
         history_entry = {
-            "timestamp": timestamp,
+            "timestamp": now.isoformat(),
             "tag": tag,
             "method": method,
             "url": url,
+            "params": params,
             "body": body,
+            "duration_ms": record.get("total_ms"),
+            "took_ms": record.get("took_ms"),
+            "status": record.get("status"),
+            "error": record.get("error"),
         }
 
         with open(filename, "w") as f:
@@ -73,17 +103,25 @@ class OpenSearchClient:
         body: Optional[Dict[str, Any]] = None,
         params: Optional[Dict[str, Any]] = None,
         tag: str = "query",
+        data: Optional[str] = None,
+        content_type: str = "application/json",
     ) -> Union[Dict[str, Any], requests.Response]:
         url = f"{self.base_url}/{path.lstrip('/')}"
 
         # Prepare headers
-        headers = {"Content-Type": "application/json"}
+        headers = {"Content-Type": content_type}
 
         # Handle Dry Run
         if self.dry_run:
             console.print(f"[bold yellow]DRY RUN: {method} {url}[/bold yellow]")
             if params:
                 console.print(f"Params: {params}")
+            if data:
+                lines = data.splitlines()
+                preview = "\n".join(lines[:6])
+                if len(lines) > 6:
+                    preview += f"\n... ({len(lines) - 6} more lines)"
+                console.print(Syntax(preview, "json", theme="monokai"))
             if body:
                 syntax = Syntax(
                     json.dumps(body, indent=2),
@@ -94,13 +132,21 @@ class OpenSearchClient:
                 console.print(syntax)
             return {}  # Return empty dict for dry run
 
-        # Handle Query History
-        if self.query_history:
-            self._save_history(method, url, body, tag)
+        if self._metadata_cache is not None and method not in ("GET", "HEAD"):
+            # Any write may change mappings, settings or pipelines.
+            self._metadata_cache.clear()
 
         # Execute Request
+        kwargs: Dict[str, Any] = {}
+        if data is not None:
+            # Raw payloads (e.g. NDJSON for _bulk) bypass JSON encoding.
+            kwargs["data"] = data.encode("utf-8")
+
+        record: Dict[str, Any] = {"tag": tag, "method": method, "path": path}
+        timings = metrics.begin_request()
+        started = time.perf_counter()
         try:
-            response = requests.request(
+            response = self.session.request(
                 method=method,
                 url=url,
                 auth=self.auth,
@@ -109,26 +155,65 @@ class OpenSearchClient:
                 headers=headers,
                 verify=self.verify_certs,
                 timeout=30,
+                **kwargs,
             )
+            # requests reads the body eagerly, so this includes the transfer.
+            record["total_ms"] = (time.perf_counter() - started) * 1000
+            record.update(_response_metrics(response, timings))
             response.raise_for_status()
+            logger.debug("Request completed", **record)
 
             # Try to parse JSON, otherwise return response object or text
+            parse_started = time.perf_counter()
             try:
-                return response.json()
+                result = response.json()
             except json.JSONDecodeError:
                 return response
+            finally:
+                record["parse_ms"] = (time.perf_counter() - parse_started) * 1000
+            if isinstance(result, dict) and isinstance(result.get("took"), (int, float)):
+                record["took_ms"] = result["took"]
+            return result
 
         except requests.exceptions.RequestException as e:
+            record["error"] = type(e).__name__
+            record.setdefault("total_ms", (time.perf_counter() - started) * 1000)
+            record.setdefault("dns_ms", timings["dns_ms"])
             logger.error("Request failed", method=method, url=url, error=str(e))
             if hasattr(e, "response") and e.response is not None:
                 logger.error("Response content", content=e.response.text)
             raise
+        finally:
+            metrics.end_request()
+            metrics.registry.record_request(record)
+            # Saved after the request so entries carry their latency.
+            if self.query_history:
+                self._save_history(method, url, body, tag, params, record)
 
     def get(
         self, path: str, params: Optional[Dict[str, Any]] = None, tag: str = "get"
     ) -> Any:
         return self.request("GET", path, params=params, tag=tag)
 
+    def get_cached(
+        self, path: str, params: Optional[Dict[str, Any]] = None, tag: str = "get"
+    ) -> Any:
+        """
+        GET for slow-changing metadata (mappings, settings, pipelines). Served
+        from the metadata cache for `metadata_ttl` seconds when one is enabled.
+        """
+        if self._metadata_cache is None or self.dry_run:
+            return self.get(path, params=params, tag=tag)
+
+        key = json.dumps([path, params], sort_keys=True)
+        cached = self._metadata_cache.get(key)
+        if cached is None:
+            cached = self.get(path, params=params, tag=tag)
+            if not isinstance(cached, dict):
+                return cached
+            self._metadata_cache.put(key, cached)
+        return copy.deepcopy(cached)
+
     def post(
         self,
         path: str,
@@ -148,6 +233,46 @@ class OpenSearchClient:
         return self.request("PUT", path, body=body, params=params, tag=tag)
 
     def delete(
-        self, path: str, params: Optional[Dict[str, Any]] = None, tag: str = "delete"
+        self,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        tag: str = "delete",
+        body: Optional[Dict[str, Any]] = None,
     ) -> Any:
-        return self.request("DELETE", path, params=params, tag=tag)
+        return self.request("DELETE", path, body=body, params=params, tag=tag)
+
+    def bulk(
+        self,
+        payload: str,
+        index: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        tag: str = "bulk",
+    ) -> Any:
+        """Sends a pre-serialized NDJSON payload to `_bulk`."""
+        path = f"{index}/_bulk" if index else "_bulk"
+        return self.request(
+            "POST",
+            path,
+            params=params,
+            tag=tag,
+            data=payload,
+            content_type="application/x-ndjson",
+        )
+
+
+def _response_metrics(response: requests.Response, timings: Dict[str, float]) -> Dict[str, Any]:
+    """Phase timings and sizes of a completed response (connection phases only when a new connection was opened)."""
+    elapsed = getattr(response, "elapsed", None)
+    request_body = getattr(getattr(response, "request", None), "body", None)
+    content = getattr(response, "_content", None)
+    return {
+        "status": getattr(response, "status_code", None),
+        "dns_ms": timings["dns_ms"],
+        # connect() covers DNS + TCP (+ TLS); report the part after DNS.
+        "connect_ms": max(0.0, timings["connect_ms"] - timings["dns_ms"]),
+        # `elapsed` runs from sending until the headers are parsed, including
+        # opening a new connection; TTFB is the part after connect().
+        "ttfb_ms": max(0.0, elapsed.total_seconds() * 1000 - timings["connect_ms"]) if isinstance(elapsed, datetime.timedelta) else None,
+        "request_bytes": len(request_body) if isinstance(request_body, (bytes, str)) else 0,
+        "response_bytes": len(content) if isinstance(content, bytes) else 0,
+    }
@@ -1,4 +1,5 @@
-from typing import List, Optional
+import os
+from typing import Dict, List, Optional, Tuple
 import yaml
 from pydantic import BaseModel, Field
 
@@ -19,26 +20,70 @@ class AuthConfig(BaseModel):
 
 class AppSettings(BaseModel):
     history_dir: str = Field(default="history_dsl")
+    state_dir: str = Field(default=".opensearch-manager")
     app_env: str = Field(default="dev")
     log_level: str = Field(default="INFO")
     json_logs: bool = Field(default=False)
+    # Render and write log records on a background thread.
+    log_queue: bool = Field(default=False)
+    # Extra JSON-lines sink (buffered; meant for high-volume operations).
+    log_file: Optional[str] = None
+    # High-volume events written only to `log_file` (when set), not the console.
+    log_file_only_events: List[str] = Field(default_factory=lambda: ["Request completed"])
+    # Per-event sampling (fraction kept) and rate limits (events per second).
+    log_sample_rates: Dict[str, float] = Field(default_factory=dict)
+    log_rate_limits: Dict[str, float] = Field(default_factory=dict)
+    # Prometheus textfile (node_exporter) with per-tag request histograms.
+    metrics_textfile: Optional[str] = None
+
+
+class ClusterProfile(BaseModel):
+    connection: ConnectionConfig = Field(default_factory=ConnectionConfig)
+    auth: AuthConfig = Field(default_factory=AuthConfig)
 
 
 class Settings(BaseModel):
     connection: ConnectionConfig = Field(default_factory=ConnectionConfig)
     auth: AuthConfig = Field(default_factory=AuthConfig)
     settings: AppSettings = Field(default_factory=AppSettings)
+    clusters: Dict[str, ClusterProfile] = Field(default_factory=dict)
+
+    def for_cluster(self, name: str) -> "Settings":
+        """Settings for a named cluster profile, with its own state directory."""
+        profile = self.clusters[name]
+        return self.model_copy(
+            update={
+                "connection": profile.connection,
+                "auth": profile.auth,
+                "settings": self.settings.model_copy(
+                    update={"state_dir": os.path.join(self.settings.state_dir, "clusters", name)}
+                ),
+            }
+        )
 
 
 _settings_instance: Optional[Settings] = None
+# Parsed configs keyed by (absolute path, mtime), so a long-lived process
+# (or repeated loads of an unchanged file) does not re-parse the YAML.
+_settings_cache: Dict[Tuple[str, float], Settings] = {}
 
 
 def load_settings(config_path: str = "user-config.yaml") -> Settings:
     global _settings_instance
+    try:
+        cache_key = (os.path.abspath(config_path), os.path.getmtime(config_path))
+    except OSError:
+        cache_key = None
+    if cache_key in _settings_cache:
+        _settings_instance = _settings_cache[cache_key]
+        return _settings_instance
+
     try:
         with open(config_path, "r") as f:
             config_data = yaml.safe_load(f)
         _settings_instance = Settings(**config_data)
+        if cache_key:
+            _settings_cache[cache_key] = _settings_instance
     except FileNotFoundError:
         # Fallback to defaults if file not found, or raise error?
         # Given the requirement, we should probably warn or fail, but for now let's return defaults
@@ -0,0 +1,120 @@
+import fnmatch
+import io
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+
+console = Console()
+
+
+def select_clusters(names: Iterable[str], selector: str) -> List[str]:
+    """Profiles matching any of the comma-separated glob patterns, in config order."""
+    patterns = [p.strip() for p in selector.split(",") if p.strip()]
+    return [name for name in names if any(fnmatch.fnmatchcase(name, p) for p in patterns)]
+
+
+def strip_option(argv: List[str], option: str) -> List[str]:
+    """Removes `option VALUE` and `option=VALUE` from an argument list."""
+    stripped, skip = [], False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg == option:
+            skip = True
+        elif not arg.startswith(f"{option}="):
+            stripped.append(arg)
+    return stripped
+
+
+class ThreadLocalStream(io.TextIOBase):
+    """
+    Stand-in for sys.stdout/sys.stderr that sends writes to a per-thread
+    buffer while one is set, and to the wrapped stream otherwise. Module-level
+    rich consoles resolve sys.stdout on every write, so commands running
+    concurrently in threads each end up with their own output.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def capture(self) -> io.StringIO:
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def release(self) -> None:
+        self._local.buffer = None
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        # Keep colours: captured output is replayed to the real stream.
+        return self.stream.isatty()
+
+    def write(self, text: str) -> int:
+        target = getattr(self._local, "buffer", None) or self.stream
+        return target.write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
+
+
+def fan_out(argv: List[str], clusters: List[str], hosts: Dict[str, str], pool: Any, workers: int = 8) -> int:
+    """
+    Runs the same command once per cluster profile on a shared thread pool.
+
+    Each run gets `--cluster <name>` and its own client from `pool`. Output
+    is buffered per cluster and printed as a labeled block in selection order,
+    followed by a timing summary. Returns the highest exit code.
+    """
+    from .shell import run_command
+
+    stdout, stderr = ThreadLocalStream(sys.stdout), ThreadLocalStream(sys.stderr)
+
+    def _run(name: str) -> Dict[str, Any]:
+        out, err = stdout.capture(), stderr.capture()
+        started = time.perf_counter()
+        try:
+            exit_code = run_command(["--cluster", name] + argv, pool)
+        finally:
+            stdout.release()
+            stderr.release()
+        return {"exit": exit_code, "seconds": time.perf_counter() - started, "stdout": out.getvalue(), "stderr": err.getvalue()}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    started = time.perf_counter()
+    sys.stdout, sys.stderr = stdout, stderr
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(clusters))), thread_name_prefix="fanout") as executor:
+            futures = {name: executor.submit(_run, name) for name in clusters}
+            for name, future in futures.items():
+                result = results[name] = future.result()
+                status = "[green]ok[/green]" if result["exit"] == 0 else f"[red]exit {result['exit']}[/red]"
+                console.rule(f"[bold cyan]{name}[/bold cyan] ({hosts.get(name, '')}) {result['seconds']:.2f}s {status}")
+                stdout.stream.write(result["stdout"])
+                stderr.stream.write(result["stderr"])
+    finally:
+        sys.stdout, sys.stderr = stdout.stream, stderr.stream
+
+    _display_summary(results, hosts, time.perf_counter() - started)
+    return max((r["exit"] for r in results.values()), default=0)
+
+
+def _display_summary(results: Dict[str, Dict[str, Any]], hosts: Dict[str, str], elapsed: float):
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Cluster", style="cyan")
+    table.add_column("Hosts")
+    table.add_column("Exit", justify="right")
+    table.add_column("Time", justify="right", style="green")
+    for name, result in results.items():
+        exit_code = str(result["exit"]) if result["exit"] == 0 else f"[red]{result['exit']}[/red]"
+        table.add_row(name, hosts.get(name, ""), exit_code, f"{result['seconds']:.2f}s")
+    serial = sum(r["seconds"] for r in results.values())
+    console.print(Panel(table, title=f"Fan-out: {len(results)} clusters in {elapsed:.2f}s (serial {serial:.2f}s)", expand=False))
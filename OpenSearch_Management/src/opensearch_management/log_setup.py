@@ -1,28 +1,216 @@
+import atexit
 import logging
+import queue
+import random
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, List, Optional
 import structlog
 from .config import get_settings
 
+_lock = threading.Lock()
+_configured_key: Optional[tuple] = None
+_listener: Optional[QueueListener] = None
+_handlers: List[logging.Handler] = []
+
+
+class EventSampler:
+    """
+    structlog processor that samples and rate-limits events by event name.
+
+    `sample_rates` maps an event to the fraction of occurrences kept; kept
+    events carry `sample_rate` so counts can be re-weighted downstream.
+    `rate_limits` maps an event to the maximum events per second (token
+    bucket). Warnings and errors are never dropped.
+    """
+
+    def __init__(self, sample_rates: Dict[str, float], rate_limits: Dict[str, float]):
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        self.dropped: Dict[str, int] = {}
+        self._buckets: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        if method_name in ("warning", "error", "critical", "exception"):
+            return event_dict
+
+        event = event_dict.get("event")
+        rate = self.sample_rates.get(event)
+        if rate is not None:
+            if random.random() >= rate:
+                self._drop(event)
+            event_dict["sample_rate"] = rate
+
+        limit = self.rate_limits.get(event)
+        if limit is not None and not self._take_token(event, limit):
+            self._drop(event)
+        return event_dict
+
+    def _take_token(self, event: str, limit: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(event, (limit, now))
+            tokens = min(limit, tokens + (now - last) * limit)
+            if tokens < 1:
+                self._buckets[event] = (tokens, now)
+                return False
+            self._buckets[event] = (tokens - 1, now)
+            return True
+
+    def _drop(self, event: str):
+        with self._lock:
+            self.dropped[event] = self.dropped.get(event, 0) + 1
+        raise structlog.DropEvent
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Enqueues records untouched so rendering happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _StderrHandler(logging.StreamHandler):
+    """
+    Writes to whatever `sys.stderr` is when a record is emitted, so the
+    per-thread streams of fan-out and the daemon's redirection capture log
+    lines too. A plain StreamHandler binds the stream once, at creation.
+    """
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _ExcludeEvents(logging.Filter):
+    """Rejects structlog records whose event name is in `events`."""
+
+    def __init__(self, events: Iterable[str]):
+        super().__init__()
+        self.events = set(events)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not (isinstance(record.msg, dict) and record.msg.get("event") in self.events)
+
+
+class JsonLinesHandler(logging.Handler):
+    """
+    Appends one JSON object per line through a large write buffer. Flushes on
+    errors and on close instead of after every record, which keeps it cheap
+    for high-volume operations (bulk ingest, exports).
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 16):
+        super().__init__()
+        self._file = open(path, "a", buffering=buffer_size, encoding="utf-8")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._file.write(self.format(record) + "\n")
+            if record.levelno >= logging.ERROR:
+                self._file.flush()
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        try:
+            self._file.close()
+        finally:
+            super().close()
+
 
 def configure_logging() -> None:
-    settings = get_settings()
-    timestamper = structlog.processors.TimeStamper(fmt="iso")
-    shared = [
-        structlog.stdlib.add_log_level,
-        timestamper,
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-    ]
-    if settings.settings.json_logs:
-        renderer = structlog.processors.JSONRenderer()
-    else:
-        renderer = structlog.dev.ConsoleRenderer()
-
-    structlog.configure(
-        processors=shared + [renderer],
-        wrapper_class=structlog.make_filtering_bound_logger(
-            logging.getLevelName(settings.settings.log_level)
-        ),
-        context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        cache_logger_on_first_use=True,
+    """
+    Routes structlog through stdlib handlers: a console renderer on stderr and,
+    if `log_file` is set, a JSON-lines sink that alone receives the
+    `log_file_only_events`. With `log_queue`, records are only
+    enqueued on the calling thread; rendering and I/O run on a QueueListener
+    thread. Safe to call repeatedly: it only reconfigures when settings change.
+    """
+    global _configured_key, _listener, _handlers
+
+    app_settings = get_settings().settings
+    key = (
+        app_settings.log_level,
+        app_settings.json_logs,
+        app_settings.log_queue,
+        app_settings.log_file,
+        tuple(app_settings.log_file_only_events),
+        tuple(sorted(app_settings.log_sample_rates.items())),
+        tuple(sorted(app_settings.log_rate_limits.items())),
     )
+    with _lock:
+        if key == _configured_key:
+            return
+        _shutdown()
+
+        timestamper = structlog.processors.TimeStamper(fmt="iso")
+        shared = [
+            structlog.stdlib.add_log_level,
+            timestamper,
+            structlog.processors.StackInfoRenderer(),
+            structlog.processors.format_exc_info,
+        ]
+        if app_settings.json_logs:
+            renderer = structlog.processors.JSONRenderer()
+        else:
+            renderer = structlog.dev.ConsoleRenderer()
+
+        console_handler = _StderrHandler()
+        console_handler.setFormatter(structlog.stdlib.ProcessorFormatter(processor=renderer, foreign_pre_chain=shared))
+        _handlers = [console_handler]
+        if app_settings.log_file:
+            console_handler.addFilter(_ExcludeEvents(app_settings.log_file_only_events))
+            file_handler = JsonLinesHandler(app_settings.log_file)
+            file_handler.setFormatter(
+                structlog.stdlib.ProcessorFormatter(processor=structlog.processors.JSONRenderer(), foreign_pre_chain=shared)
+            )
+            _handlers.append(file_handler)
+
+        root = logging.getLogger()
+        level = logging.getLevelName(app_settings.log_level)
+        root.setLevel(level)
+        if app_settings.log_queue:
+            log_queue: queue.Queue = queue.SimpleQueue()
+            root.addHandler(_DeferredQueueHandler(log_queue))
+            _listener = QueueListener(log_queue, *_handlers, respect_handler_level=True)
+            _listener.start()
+        else:
+            for handler in _handlers:
+                root.addHandler(handler)
+
+        sampler = EventSampler(dict(app_settings.log_sample_rates), dict(app_settings.log_rate_limits))
+        structlog.configure(
+            processors=[sampler] + shared + [structlog.stdlib.ProcessorFormatter.wrap_for_formatter],
+            wrapper_class=structlog.make_filtering_bound_logger(level),
+            context_class=dict,
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            cache_logger_on_first_use=True,
+        )
+        _configured_key = key
+
+
+def _shutdown() -> None:
+    """Drains the queue and closes the handlers installed by configure_logging."""
+    global _configured_key, _listener, _handlers
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, _DeferredQueueHandler) or handler in _handlers:
+            root.removeHandler(handler)
+    for handler in _handlers:
+        handler.close()
+    _handlers = []
+    _configured_key = None
+
+
+atexit.register(_shutdown)
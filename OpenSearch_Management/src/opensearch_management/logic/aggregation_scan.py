@@ -0,0 +1,310 @@
+from typing import List, Dict, Any, Optional, Iterator
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+
+console = Console()
+
+_AGG_NAME = "scan"
+_PARTITION_DONE = object()
+
+
+def build_composite_sources(
+    terms_fields: Optional[List[str]] = None,
+    date_histograms: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Builds composite `sources` from plain field names.
+
+    `date_histograms` entries use the `FIELD:INTERVAL` form (e.g. `@timestamp:1h`).
+    """
+    sources = []
+    for field in terms_fields or []:
+        sources.append({field: {"terms": {"field": field}}})
+
+    for spec in date_histograms or []:
+        field, _, interval = spec.partition(":")
+        sources.append(
+            {field: {"date_histogram": {"field": field, "fixed_interval": interval or "1h"}}}
+        )
+
+    return sources
+
+
+def hash_partition_filters(field: str, partitions: int) -> List[Dict[str, Any]]:
+    """
+    Splits the key space of `field` into disjoint hash partitions.
+
+    For a single-valued terms source on `field`, every bucket lands in exactly
+    one partition, so partitions can be scanned in parallel without merging
+    partial counts. Documents missing the field are routed to partition 0.
+    Only the document's first value is hashed, so multi-valued fields and
+    date histograms (one bucket spans many values) must not be partitioned;
+    see `partition_field`.
+    """
+    source = (
+        "if (doc[params.field].size() == 0) { return params.p == 0; } "
+        "return Math.floorMod(doc[params.field].value.hashCode(), params.n) == params.p;"
+    )
+    return [
+        {
+            "script": {
+                "script": {
+                    "source": source,
+                    "lang": "painless",
+                    "params": {"field": field, "n": partitions, "p": p},
+                }
+            }
+        }
+        for p in range(partitions)
+    ]
+
+
+def partition_field(
+    client: OpenSearchClient, index: str, source: Dict[str, Any], query: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """
+    The field to hash-partition on for the composite `source`, or None when
+    partitioning would split buckets: the source is not a terms source on a
+    field, or some matching document has several values for it.
+    """
+    terms = next(iter(source.values())).get("terms", {})
+    field = terms.get("field")
+    if not field:
+        return None
+
+    multi_valued = {
+        "script": {"script": {"source": "doc[params.field].size() > 1", "lang": "painless", "params": {"field": field}}}
+    }
+    response = client.post(
+        f"{index}/_search",
+        body={"size": 0, "terminate_after": 1, "track_total_hits": True, "query": _with_filter(query, multi_valued)},
+        params={"filter_path": "hits.total"},
+        tag="composite_partition_check",
+    )
+    if response and response.get("hits", {}).get("total", {}).get("value", 0):
+        return None
+    return field
+
+
+def iter_composite_pages(
+    client: OpenSearchClient,
+    index: str,
+    sources: List[Dict[str, Any]],
+    query: Optional[Dict[str, Any]] = None,
+    sub_aggs: Optional[Dict[str, Any]] = None,
+    page_size: int = 1000,
+    after_key: Optional[Dict[str, Any]] = None,
+    tag: str = "composite_scan",
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Pages through a composite aggregation, yielding one page of buckets at a time.
+
+    Only the current page is held in memory; the response is trimmed with
+    `filter_path` so the cluster does not send hits or metadata back.
+    """
+    composite: Dict[str, Any] = {"size": page_size, "sources": sources}
+    agg: Dict[str, Any] = {"composite": composite}
+    if sub_aggs:
+        agg["aggs"] = sub_aggs
+
+    body = {
+        "size": 0,
+        "track_total_hits": False,
+        "query": query or {"match_all": {}},
+        "aggs": {_AGG_NAME: agg},
+    }
+    params = {
+        "filter_path": f"aggregations.{_AGG_NAME}.after_key,aggregations.{_AGG_NAME}.buckets"
+    }
+
+    while True:
+        page_body = body
+        if after_key:
+            # A new body per page; earlier request bodies stay as they were sent.
+            page_body = {**body, "aggs": {_AGG_NAME: {**agg, "composite": {**composite, "after": after_key}}}}
+        response = client.post(f"{index}/_search", body=page_body, params=params, tag=tag)
+        if not response:
+            # Dry run, or no aggregation section at all (empty index).
+            return
+
+        result = response.get("aggregations", {}).get(_AGG_NAME, {})
+        buckets = result.get("buckets", [])
+        if buckets:
+            yield buckets
+
+        # Not `len(buckets) < page_size`: a bucket_selector in the sub-aggs can
+        # trim a page while more pages remain.
+        after_key = result.get("after_key")
+        if not after_key:
+            return
+
+
+def iter_composite_buckets(
+    client: OpenSearchClient,
+    index: str,
+    sources: List[Dict[str, Any]],
+    query: Optional[Dict[str, Any]] = None,
+    sub_aggs: Optional[Dict[str, Any]] = None,
+    page_size: int = 1000,
+    partition_filters: Optional[List[Dict[str, Any]]] = None,
+    max_workers: Optional[int] = None,
+    tag: str = "composite_scan",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streams every bucket of a composite aggregation.
+
+    Without `partition_filters` the scan is a single sequential `after_key` walk.
+    With them, each partition is scanned by its own worker and pages are handed
+    over through a bounded queue, so memory stays at roughly two pages per worker
+    no matter how many buckets the aggregation has. Bucket order is only
+    guaranteed within a partition.
+    """
+    if not partition_filters or len(partition_filters) == 1:
+        if partition_filters:
+            query = _with_filter(query, partition_filters[0])
+        for page in iter_composite_pages(client, index, sources, query, sub_aggs, page_size, tag=tag):
+            yield from page
+        return
+
+    workers = max_workers or len(partition_filters)
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+
+    def _put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _scan_partition(partition_filter: Dict[str, Any]) -> None:
+        try:
+            partition_query = _with_filter(query, partition_filter)
+            for page in iter_composite_pages(
+                client, index, sources, partition_query, sub_aggs, page_size, tag=tag
+            ):
+                if not _put(page):
+                    return
+        except Exception as e:
+            _put(e)
+        finally:
+            _put(_PARTITION_DONE)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="composite-scan")
+    try:
+        for partition_filter in partition_filters:
+            executor.submit(_scan_partition, partition_filter)
+
+        remaining = len(partition_filters)
+        while remaining:
+            item = pages.get()
+            if item is _PARTITION_DONE:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield from item
+    finally:
+        # Unblock workers if the consumer stopped early or a partition failed.
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def scan_aggregation(
+    client: OpenSearchClient,
+    index: str,
+    sources: List[Dict[str, Any]],
+    query: Optional[Dict[str, Any]] = None,
+    sub_aggs: Optional[Dict[str, Any]] = None,
+    page_size: int = 1000,
+    partitions: int = 1,
+    max_workers: Optional[int] = None,
+    as_json: bool = False,
+    limit: int = 0,
+):
+    """
+    Streams all buckets of a composite aggregation to the console.
+    """
+    if not sources:
+        console.print("[bold red]At least one --terms or --date-histogram source is required.[/bold red]")
+        return
+
+    partition_filters = None
+    if partitions > 1:
+        try:
+            field = partition_field(client, index, sources[0], query)
+        except Exception as e:
+            console.print(f"[bold red]Error checking the partition field:[/bold red] {e}")
+            return
+        if field:
+            partition_filters = hash_partition_filters(field, partitions)
+        else:
+            if not client.dry_run:
+                console.print(
+                    "[yellow]The first source is not a single-valued terms field; "
+                    "partitioning would split its buckets, so scanning sequentially.[/yellow]"
+                )
+            partitions = 1
+
+    start = time.perf_counter()
+    count = 0
+    total_docs = 0
+
+    try:
+        for bucket in iter_composite_buckets(
+            client,
+            index,
+            sources,
+            query=query,
+            sub_aggs=sub_aggs,
+            page_size=page_size,
+            partition_filters=partition_filters,
+            max_workers=max_workers,
+        ):
+            count += 1
+            total_docs += bucket.get("doc_count", 0)
+            if as_json:
+                sys.stdout.write(json.dumps(bucket) + "\n")
+            else:
+                key = bucket.get("key", {})
+                console.print(
+                    "\t".join(str(v) for v in key.values()) + f"\t{bucket.get('doc_count', 0)}",
+                    markup=False,
+                    highlight=False,
+                )
+            if limit and count >= limit:
+                break
+    except Exception as e:
+        console.print(f"[bold red]Error scanning aggregation:[/bold red] {e}")
+        return
+
+    if client.dry_run:
+        console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+
+    elapsed = time.perf_counter() - start
+    table = Table(box=None)
+    table.add_column("Stat", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Buckets", str(count))
+    table.add_row("Docs in buckets", str(total_docs))
+    table.add_row("Partitions", str(max(partitions, 1)))
+    table.add_row("Elapsed", f"{elapsed:.2f}s")
+    table.add_row("Buckets/sec", f"{count / elapsed:.0f}" if elapsed > 0 else "-")
+
+    # Keep stdout clean for JSON-lines consumers.
+    Console(stderr=True).print(Panel(table, title=f"Composite Scan: {index}", expand=False))
+
+
+def _with_filter(query: Optional[Dict[str, Any]], extra: Dict[str, Any]) -> Dict[str, Any]:
+    return {"bool": {"filter": [query or {"match_all": {}}, extra]}}
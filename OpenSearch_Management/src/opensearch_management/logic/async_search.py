@@ -0,0 +1,267 @@
+from typing import List, Dict, Any, Optional
+import hashlib
+import json
+import os
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..cache import LRUCache
+from ..client import OpenSearchClient
+
+console = Console()
+
+_CACHE_FILE = "async_search_cache.json"
+_PENDING_FILE = "async_search_pending.json"
+
+# States reported by _plugins/_asynchronous_search.
+_DONE_STATES = {"SUCCEEDED", "PERSISTED", "STORE_RESIDENT", "CLOSED"}
+_FAILED_STATES = {"FAILED", "PERSIST_FAILED"}
+
+
+def build_body(
+    body: Optional[Dict[str, Any]],
+    time_field: str = "@timestamp",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Adds the time range as a filter around the query of `body` (a copy)."""
+    body = json.loads(json.dumps(body or {"size": 0}))
+    if not start and not end:
+        return body
+
+    time_range = {key: value for key, value in (("gte", start), ("lte", end)) if value}
+    query = body.pop("query", None)
+    body["query"] = {"bool": {"filter": [{"range": {time_field: time_range}}]}}
+    if query:
+        body["query"]["bool"]["must"] = [query]
+    return body
+
+
+def cache_key(index: str, body: Dict[str, Any]) -> str:
+    """Hash of the index and the canonical body, which includes the time range."""
+    canonical = json.dumps({"index": index, "body": body}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_relative_range(start: Optional[str], end: Optional[str]) -> bool:
+    """True when the range moves with time (date math on `now`, or open-ended)."""
+    return not end or any(value and "now" in value for value in (start, end))
+
+
+def next_interval(interval: float, progressed: bool, initial: float, factor: float, maximum: float) -> float:
+    """Adaptive backoff: back to `initial` after progress, otherwise grow up to `maximum`."""
+    return initial if progressed else min(interval * factor, maximum)
+
+
+def shard_progress(response: Dict[str, Any]) -> Dict[str, int]:
+    shards = response.get("response", {}).get("_shards", {})
+    return {
+        "total": shards.get("total", 0),
+        "successful": shards.get("successful", 0),
+        "failed": shards.get("failed", 0),
+    }
+
+
+def run_async_search(
+    client: OpenSearchClient,
+    index: str,
+    body: Optional[Dict[str, Any]] = None,
+    time_field: str = "@timestamp",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    search_id: Optional[str] = None,
+    keep_alive: str = "1d",
+    timeout: float = 3600.0,
+    use_cache: bool = True,
+    cache_ttl: float = 600.0,
+    show_partial: bool = True,
+    output: Optional[str] = None,
+    initial_interval: float = 0.5,
+    max_interval: float = 15.0,
+    max_retries: int = 5,
+):
+    """
+    Runs a long search through `_plugins/_asynchronous_search`.
+
+    The search is submitted once and polled with adaptive backoff, printing
+    partial aggregations as shards complete. Its id is remembered under the
+    query hash, so re-running the same command after a disconnect or Ctrl+C
+    resumes polling instead of starting over. Completed responses are cached
+    locally; results for relative ranges (`now-30d`) expire after `cache_ttl`.
+    """
+    search_body = build_body(body, time_field, start, end)
+    key = cache_key(index, search_body)
+    state_dir = client.settings.settings.state_dir
+    cache = LRUCache(max_entries=32, path=os.path.join(state_dir, _CACHE_FILE))
+    pending = LRUCache(max_entries=64, path=os.path.join(state_dir, _PENDING_FILE))
+
+    if use_cache and not search_id and not client.dry_run:
+        cached = cache.get(key)
+        if cached is not None and (cached["expires_at"] is None or cached["expires_at"] > time.time()):
+            console.print(f"[dim]Served from cache (completed {time.ctime(cached['completed_at'])}).[/dim]")
+            _display_response(cached["response"], output)
+            return
+
+    search_id = search_id or (pending.get(key) or {}).get("id")
+    response: Optional[Dict[str, Any]] = None
+    if search_id and not client.dry_run:
+        try:
+            response = _get(client, search_id)
+        except Exception as e:
+            console.print(f"[bold red]Error fetching async search {search_id}:[/bold red] {e}")
+            return
+        if response is None:
+            console.print(f"[yellow]Async search {search_id} is gone (expired or deleted); submitting again.[/yellow]")
+            search_id = None
+        else:
+            console.print(f"[cyan]Resuming async search {search_id}[/cyan]")
+
+    if response is None:
+        try:
+            response = client.post(
+                "_plugins/_asynchronous_search",
+                body=search_body,
+                params={
+                    "index": index,
+                    "wait_for_completion_timeout": "1s",
+                    "keep_on_completion": "true",
+                    "keep_alive": keep_alive,
+                },
+                tag="async_search_submit",
+            )
+        except Exception as e:
+            console.print(f"[bold red]Error submitting async search:[/bold red] {e}")
+            return
+        if not response:
+            if client.dry_run:
+                console.print("[dim]Dry run: No response to parse.[/dim]")
+            return
+        search_id = response.get("id")
+        if search_id:
+            pending.put(key, {"id": search_id, "index": index, "submitted_at": time.time()})
+            console.print(f"[cyan]Submitted async search {search_id}[/cyan]")
+
+    response = _poll(client, search_id, response, timeout, show_partial, initial_interval, max_interval, max_retries)
+    if response is None:
+        console.print(f"[yellow]Search keeps running on the cluster as {search_id}; re-run the same command to resume.[/yellow]")
+        return
+
+    state = response.get("state")
+    if state in _FAILED_STATES or "error" in response:
+        console.print(f"[bold red]Async search {search_id} failed:[/bold red] {response.get('error', state)}")
+        pending.pop(key)
+        return
+
+    result = response.get("response", {})
+    cache.put(key, {
+        "completed_at": time.time(),
+        "expires_at": time.time() + cache_ttl if is_relative_range(start, end) else None,
+        "response": result,
+    })
+    pending.pop(key)
+    if search_id:
+        try:
+            client.delete(f"_plugins/_asynchronous_search/{search_id}", tag="async_search_delete")
+        except Exception:
+            pass  # Expires with keep_alive anyway.
+
+    _display_response(result, output)
+
+
+def _get(client: OpenSearchClient, search_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        return client.get(f"_plugins/_asynchronous_search/{search_id}", tag="async_search_get")
+    except Exception as e:
+        if getattr(getattr(e, "response", None), "status_code", None) == 404:
+            return None
+        raise
+
+
+def _poll(
+    client: OpenSearchClient,
+    search_id: Optional[str],
+    response: Dict[str, Any],
+    timeout: float,
+    show_partial: bool,
+    initial: float,
+    maximum: float,
+    max_retries: int,
+) -> Optional[Dict[str, Any]]:
+    """Polls until a terminal state; None on timeout, interrupt or repeated connection errors."""
+    deadline = time.monotonic() + timeout
+    interval, failures = initial, 0
+    last_progress = shard_progress(response)
+    if show_partial:
+        _display_progress(response)
+
+    try:
+        while response.get("state") not in _DONE_STATES | _FAILED_STATES and "error" not in response:
+            if not search_id or time.monotonic() + interval > deadline:
+                return None
+            time.sleep(interval)
+            try:
+                polled = _get(client, search_id)
+            except Exception as e:
+                failures += 1
+                if failures > max_retries:
+                    console.print(f"[bold red]Giving up polling after {failures} errors:[/bold red] {e}")
+                    return None
+                interval = next_interval(interval, False, initial, 1.5, maximum)
+                continue
+            if polled is None:
+                console.print(f"[bold red]Async search {search_id} disappeared (keep_alive expired?).[/bold red]")
+                return None
+
+            failures = 0
+            response = polled
+            progress = shard_progress(response)
+            progressed = progress != last_progress
+            if progressed and show_partial:
+                _display_progress(response)
+            last_progress = progress
+            interval = next_interval(interval, progressed, initial, 1.5, maximum)
+    except KeyboardInterrupt:
+        return None
+    return response
+
+
+def _display_progress(response: Dict[str, Any]):
+    progress = shard_progress(response)
+    partial = response.get("response", {})
+    line = f"[dim]{response.get('state', '?')}: {progress['successful']}/{progress['total']} shards"
+    if progress["failed"]:
+        line += f", {progress['failed']} failed"
+    hits = partial.get("hits", {}).get("total", {}).get("value")
+    if hits is not None:
+        line += f", {hits:,} hits"
+    console.print(line + "[/dim]")
+    for name, buckets in _bucket_aggs(partial.get("aggregations", {})).items():
+        top = ", ".join(f"{b.get('key_as_string', b.get('key'))}={b.get('doc_count', 0):,}" for b in buckets[:3])
+        console.print(f"[dim]  {name} (partial): {top}[/dim]")
+
+
+def _display_response(result: Dict[str, Any], output: Optional[str]):
+    if output:
+        with open(output, "w") as f:
+            json.dump(result, f, indent=2)
+        console.print(f"[green]Response written to {output}[/green]")
+
+    total = result.get("hits", {}).get("total", {}).get("value", 0)
+    console.print(f"Took [bold]{result.get('took', 0):,} ms[/bold], [bold]{total:,}[/bold] hits")
+
+    aggregations = result.get("aggregations", {})
+    for name, buckets in _bucket_aggs(aggregations).items():
+        table = Table(show_header=True, header_style="bold magenta", box=None)
+        table.add_column("Key", style="cyan")
+        table.add_column("Doc Count", justify="right", style="green")
+        for bucket in buckets:
+            table.add_row(str(bucket.get("key_as_string", bucket.get("key"))), f"{bucket.get('doc_count', 0):,}")
+        console.print(Panel(table, title=name, expand=False))
+    for name, agg in aggregations.items():
+        if "value" in agg:
+            console.print(f"{name}: [bold]{agg.get('value_as_string', agg['value'])}[/bold]")
+
+
+def _bucket_aggs(aggregations: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    return {name: agg["buckets"] for name, agg in aggregations.items() if isinstance(agg.get("buckets"), list)}
@@ -0,0 +1,246 @@
+from typing import List, Dict, Any, Optional, Iterator
+import contextlib
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..waits import refresh
+
+console = Console()
+
+# Ingest-optimized values; everything listed is snapshotted and restored.
+BULK_SETTINGS = {
+    "index.refresh_interval": "-1",
+    "index.number_of_replicas": "0",
+    "index.translog.durability": "async",
+    "index.translog.sync_interval": "30s",
+    "index.translog.flush_threshold_size": "1gb",
+    "index.merge.policy.segments_per_tier": "20",
+}
+
+_STATE_FILE = "bulk_mode.json"
+_state_lock = threading.Lock()
+
+
+def state_path(client: OpenSearchClient) -> str:
+    return os.path.join(client.settings.settings.state_dir, _STATE_FILE)
+
+
+def load_state(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"indices": {}}
+
+
+def save_state(path: str, state: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def snapshot_settings(response: Dict[str, Any]) -> Dict[str, Dict[str, Optional[str]]]:
+    """
+    Previous values per index from a flat `_settings` response. Settings that
+    were not set explicitly are recorded as None, which resets them to the
+    default on restore.
+    """
+    return {
+        index: {key: details.get("settings", {}).get(key) for key in BULK_SETTINGS}
+        for index, details in response.items()
+    }
+
+
+def is_stale(entry: Dict[str, Any]) -> bool:
+    """True when the process that enabled bulk mode for an index is gone (it crashed or was killed)."""
+    pid = entry.get("pid")
+    if not pid or entry.get("host") != socket.gethostname():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def enable_bulk_mode(client: OpenSearchClient, patterns: List[str], owner_pid: Optional[int] = None, workers: int = 8) -> List[str]:
+    """
+    Snapshots the current settings of all indices matching `patterns` to the
+    state file, then applies BULK_SETTINGS in parallel. Indices already in bulk
+    mode keep their original snapshot (and owner). Returns the indices whose
+    snapshot was taken by this call, i.e. the ones the caller should restore.
+
+    Raises ValueError when no existing index matches: an index that a later
+    bulk request auto-creates would never get the bulk settings.
+    """
+    path = ",".join(patterns)
+    try:
+        response = client.get(
+            f"{path}/_settings/{','.join(BULK_SETTINGS)}", params={"flat_settings": "true"}, tag="bulk_mode_snapshot"
+        )
+    except Exception as e:
+        if getattr(getattr(e, "response", None), "status_code", None) != 404:
+            raise
+        response = None
+    if not response:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+            return []
+        raise ValueError(f"No existing index matches {path}; create it before enabling bulk mode.")
+
+    snapshot = snapshot_settings(response)
+    state_file = state_path(client)
+    owned = []
+    with _state_lock:
+        state = load_state(state_file)
+        for index, previous in snapshot.items():
+            if index not in state["indices"]:
+                owned.append(index)
+                state["indices"][index] = {
+                    "previous": previous,
+                    "pid": owner_pid,
+                    "host": socket.gethostname(),
+                    "enabled_at": time.time(),
+                }
+        # Written before any change, so a crash mid-way can still be restored.
+        save_state(state_file, state)
+
+    _put_parallel(client, {index: BULK_SETTINGS for index in snapshot}, workers, "bulk_mode_on")
+    return sorted(owned)
+
+
+def disable_bulk_mode(
+    client: OpenSearchClient, patterns: Optional[List[str]] = None, workers: int = 8, only_stale: bool = False
+) -> List[str]:
+    """
+    Restores the snapshotted settings of the indices in the state file that
+    match `patterns` (all when None), refreshes them and removes them from
+    the state file. Returns the indices restored.
+    """
+    import fnmatch
+
+    state_file = state_path(client)
+    with _state_lock:
+        state = load_state(state_file)
+    entries = {
+        index: entry for index, entry in state["indices"].items()
+        if (patterns is None or any(fnmatch.fnmatchcase(index, p) for p in ",".join(patterns).split(",")))
+        and (not only_stale or is_stale(entry))
+    }
+    if not entries:
+        return []
+
+    failed = _put_parallel(client, {index: entry["previous"] for index, entry in entries.items()}, workers, "bulk_mode_off")
+    restored = sorted(index for index in entries if index not in failed)
+    if restored and not client.dry_run:
+        refresh(client, ",".join(restored))
+        with _state_lock:
+            state = load_state(state_file)
+            for index in restored:
+                state["indices"].pop(index, None)
+            save_state(state_file, state)
+    return restored
+
+
+def recover_stale(client: OpenSearchClient) -> List[str]:
+    """Restores indices left in bulk mode by a process that no longer runs."""
+    restored = disable_bulk_mode(client, only_stale=True)
+    if restored:
+        console.print(f"[yellow]Restored settings of {len(restored)} indices left in bulk mode by a crashed run.[/yellow]")
+    return restored
+
+
+@contextlib.contextmanager
+def bulk_mode(client: OpenSearchClient, patterns: List[str]) -> Iterator[List[str]]:
+    """
+    Bulk mode for the duration of a block; settings are restored on exit,
+    including on errors and Ctrl+C. If the process is killed, the next run
+    finds the stale state entry (dead pid) and restores it.
+    """
+    recover_stale(client)
+    indices = enable_bulk_mode(client, patterns, owner_pid=os.getpid())
+    try:
+        yield indices
+    finally:
+        if indices:
+            disable_bulk_mode(client, indices)
+
+
+def bulk_mode_command(client: OpenSearchClient, action: str, patterns: Optional[List[str]] = None):
+    """`index bulk-mode on|off|status`."""
+    if action == "status":
+        _display_status(load_state(state_path(client)))
+        return
+
+    try:
+        recover_stale(client)
+        if action == "on":
+            if not patterns:
+                console.print("[bold red]Index patterns are required for 'on'.[/bold red]")
+                return
+            indices = enable_bulk_mode(client, patterns)
+            if not client.dry_run:
+                console.print(f"[green]Bulk mode on ({len(indices)} indices snapshotted).[/green] Restore with: index bulk-mode off {' '.join(patterns)}")
+        elif action == "off":
+            indices = disable_bulk_mode(client, patterns or None)
+            if indices:
+                console.print(f"[green]Restored settings of {len(indices)} indices.[/green]")
+            elif not client.dry_run:
+                console.print("[yellow]No matching indices are in bulk mode.[/yellow]")
+        else:
+            console.print(f"[bold red]Unknown action {action}; use on, off or status.[/bold red]")
+    except Exception as e:
+        console.print(f"[bold red]Error switching bulk mode:[/bold red] {e}")
+
+
+def _put_parallel(client: OpenSearchClient, bodies: Dict[str, Dict[str, Any]], workers: int, tag: str) -> Dict[str, str]:
+    """PUTs per-index settings concurrently; returns {index: error} for failures."""
+    failed: Dict[str, str] = {}
+
+    def _put(index: str):
+        try:
+            client.put(f"{index}/_settings", body=bodies[index], tag=tag)
+        except Exception as e:
+            failed[index] = str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(bodies)))) as executor:
+        list(executor.map(_put, bodies))
+    for index, error in sorted(failed.items()):
+        console.print(f"[bold red]{index}:[/bold red] {error}")
+    return failed
+
+
+def _display_status(state: Dict[str, Any]):
+    if not state["indices"]:
+        console.print("[green]No indices are in bulk mode.[/green]")
+        return
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Index", style="cyan")
+    table.add_column("Since", justify="right")
+    table.add_column("Owner")
+    table.add_column("Previous refresh / replicas / durability")
+    for index, entry in sorted(state["indices"].items()):
+        previous = entry["previous"]
+        owner = f"pid {entry['pid']}" if entry.get("pid") else "cli"
+        if is_stale(entry):
+            owner += " [red](dead)[/red]"
+        table.add_row(
+            index,
+            f"{(time.time() - entry['enabled_at']) / 60:.0f} min",
+            owner,
+            " / ".join(str(previous.get(key) or "default") for key in (
+                "index.refresh_interval", "index.number_of_replicas", "index.translog.durability"
+            )),
+        )
+    console.print(Panel(table, title="Bulk Mode", expand=False))
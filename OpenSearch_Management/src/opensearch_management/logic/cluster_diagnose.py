@@ -0,0 +1,325 @@
+from typing import List, Dict, Any, Optional, Iterable
+import datetime
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+
+console = Console()
+
+_HOT_NODE = re.compile(r"^:::\s*\{([^}]*)\}")
+_HOT_THREAD = re.compile(r"^\s*([\d.]+)%\s+\(([^)]*)\)\s+(cpu|wait|block)\s+usage by thread '([^']*)'")
+_THREAD_POOL = re.compile(r"^opensearch\[[^\]]*\]\[([^\]]+)\]")
+_FRAME_PREFIX = re.compile(r"^(?:app//|java\.base@[^/]+/|[\w.-]+@[^/]+/)")
+
+_NODE_STATS_METRICS = "jvm,thread_pool,breaker"
+_STACK_DEPTH = 3
+
+
+def parse_hot_threads(text: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Busiest threads per node from the plain-text `_nodes/hot_threads`
+    output: CPU share, thread pool and the top stack frames of each.
+    """
+    nodes: Dict[str, List[Dict[str, Any]]] = {}
+    threads: Optional[List[Dict[str, Any]]] = None
+    current: Optional[Dict[str, Any]] = None
+    for line in text.splitlines():
+        node = _HOT_NODE.match(line)
+        if node:
+            threads = nodes.setdefault(node.group(1), [])
+            current = None
+            continue
+        thread = _HOT_THREAD.match(line)
+        if thread and threads is not None:
+            pool = _THREAD_POOL.match(thread.group(4))
+            current = {
+                "pct": float(thread.group(1)),
+                "kind": thread.group(3),
+                "thread": thread.group(4),
+                "pool": pool.group(1) if pool else thread.group(4),
+                "frames": [],
+            }
+            threads.append(current)
+            continue
+        frame = line.strip()
+        if current is None or not frame or "snapshots sharing" in frame or frame.startswith("unique snapshot"):
+            continue
+        if len(current["frames"]) < _STACK_DEPTH:
+            current["frames"].append(_FRAME_PREFIX.sub("", frame))
+    return nodes
+
+
+def parse_node_stats(response: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Compact per-node JVM, GC, thread pool and breaker counters from `_nodes/stats`."""
+    nodes = {}
+    for node_id, stats in response.get("nodes", {}).items():
+        jvm = stats.get("jvm", {})
+        collectors = jvm.get("gc", {}).get("collectors", {})
+        young = collectors.get("young", {})
+        old = collectors.get("old", {})
+        nodes[stats.get("name", node_id)] = {
+            "heap_pct": jvm.get("mem", {}).get("heap_used_percent"),
+            "gc_young": [young.get("collection_count", 0), young.get("collection_time_in_millis", 0)],
+            "gc_old": [old.get("collection_count", 0), old.get("collection_time_in_millis", 0)],
+            "pools": {
+                name: [pool.get("active", 0), pool.get("queue", 0), pool.get("rejected", 0)]
+                for name, pool in stats.get("thread_pool", {}).items()
+                if pool.get("queue") or pool.get("rejected") or pool.get("active")
+            },
+            "breakers": {
+                name: [breaker.get("estimated_size_in_bytes", 0), breaker.get("limit_size_in_bytes", 0), breaker.get("tripped", 0)]
+                for name, breaker in stats.get("breakers", {}).items()
+            },
+        }
+    return nodes
+
+
+def parse_pending_tasks(rows: Any) -> Dict[str, Any]:
+    """Count, longest wait and sources from `_cat/pending_tasks?format=json&time=ms`."""
+    rows = rows if isinstance(rows, list) else []
+    waits = [float(row.get("timeInQueue") or 0) for row in rows]
+    return {
+        "count": len(rows),
+        "max_wait_ms": max(waits, default=0.0),
+        "sources": [row.get("source", "") for row in rows[:20]],
+    }
+
+
+def summarize(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduces a time series of samples to per-node GC churn and heap range,
+    thread pool rejection deltas, breaker trips, recurring hot stacks and
+    the pending task backlog.
+    """
+    first: Dict[str, Dict[str, Any]] = {}
+    last: Dict[str, Dict[str, Any]] = {}
+    heap: Dict[str, List[float]] = {}
+    max_queue: Dict[tuple, int] = {}
+    stacks: Dict[tuple, Dict[str, Any]] = {}
+    pending = {"samples": 0, "max_count": 0, "max_wait_ms": 0.0, "sources": {}}
+
+    for record in records:
+        kind = record.get("kind")
+        if kind == "node_stats":
+            node = record["node"]
+            first.setdefault(node, record)
+            last[node] = record
+            if record.get("heap_pct") is not None:
+                heap.setdefault(node, []).append(record["heap_pct"])
+            for pool, (_, queue, _) in record.get("pools", {}).items():
+                max_queue[(node, pool)] = max(max_queue.get((node, pool), 0), queue)
+        elif kind == "hot_threads":
+            for thread in record.get("threads", []):
+                key = (record["node"], thread["pool"], " < ".join(thread["frames"]))
+                stack = stacks.setdefault(key, {"node": record["node"], "pool": thread["pool"], "frames": thread["frames"], "seen": 0, "pct": 0.0})
+                stack["seen"] += 1
+                stack["pct"] += thread["pct"]
+        elif kind == "pending":
+            pending["samples"] += 1
+            pending["max_count"] = max(pending["max_count"], record["count"])
+            pending["max_wait_ms"] = max(pending["max_wait_ms"], record["max_wait_ms"])
+            for source in record.get("sources", []):
+                pending["sources"][source] = pending["sources"].get(source, 0) + 1
+
+    gc = []
+    rejections = []
+    breakers = []
+    for node, end in last.items():
+        start = first[node]
+        elapsed = max(end["ts"] - start["ts"], 1e-9)
+        young_count, young_ms = (b - a for a, b in zip(start["gc_young"], end["gc_young"]))
+        old_count, old_ms = (b - a for a, b in zip(start["gc_old"], end["gc_old"]))
+        gc.append({
+            "node": node,
+            "heap_min": min(heap.get(node, [0])),
+            "heap_max": max(heap.get(node, [0])),
+            "young_count": young_count,
+            "old_count": old_count,
+            "gc_ms_per_s": (young_ms + old_ms) / elapsed if end is not start else 0.0,
+            "old_ms": old_ms,
+        })
+        # parse_node_stats leaves out idle pools, so a pool missing from the
+        # first sample had rejected nothing yet.
+        for pool, (_, _, rejected) in end.get("pools", {}).items():
+            delta = rejected - start.get("pools", {}).get(pool, [0, 0, 0])[2]
+            if delta or max_queue.get((node, pool)):
+                rejections.append({"node": node, "pool": pool, "rejected": delta, "total": rejected, "max_queue": max_queue.get((node, pool), 0)})
+        for name, (estimated, limit, tripped) in end.get("breakers", {}).items():
+            delta = tripped - start.get("breakers", {}).get(name, [0, 0, 0])[2]
+            if delta or (limit and estimated / limit >= 0.8):
+                breakers.append({"node": node, "breaker": name, "tripped": delta, "used_pct": 100.0 * estimated / limit if limit else 0.0})
+
+    for stack in stacks.values():
+        stack["pct"] /= stack["seen"]
+    return {
+        "gc": sorted(gc, key=lambda g: g["gc_ms_per_s"], reverse=True),
+        "rejections": sorted(rejections, key=lambda r: (r["rejected"], r["max_queue"]), reverse=True),
+        "breakers": sorted(breakers, key=lambda b: (b["tripped"], b["used_pct"]), reverse=True),
+        "stacks": sorted(stacks.values(), key=lambda s: (s["seen"], s["pct"]), reverse=True),
+        "pending": pending,
+    }
+
+
+def load_series(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def diagnose_cluster(
+    client: OpenSearchClient,
+    samples: int = 5,
+    interval: float = 2.0,
+    threads: int = 3,
+    hot_interval: str = "500ms",
+    output: Optional[str] = None,
+    replay: Optional[str] = None,
+    top: int = 3,
+):
+    """
+    Samples hot threads (per node, in parallel), node stats and pending tasks
+    `samples` times, appends every sample to a JSON-lines time series under
+    `<state_dir>/diagnose/` and prints what stands out across the samples.
+    `replay` summarizes a previously written series without contacting the cluster.
+    """
+    if replay:
+        try:
+            records = load_series(replay)
+        except (OSError, json.JSONDecodeError) as e:
+            console.print(f"[bold red]Error reading {replay}:[/bold red] {e}")
+            return
+        _display_summary(summarize(records), top, replay)
+        return
+
+    try:
+        nodes = client.get("_cat/nodes", params={"format": "json", "h": "id,name", "full_id": "true"}, tag="diagnose_nodes")
+    except Exception as e:
+        console.print(f"[bold red]Error listing nodes:[/bold red] {e}")
+        return
+    if not nodes:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+
+    path = output or os.path.join(
+        client.settings.settings.state_dir, "diagnose", f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    records: List[Dict[str, Any]] = []
+    hot_params = {"threads": str(threads), "interval": hot_interval, "ignore_idle_threads": "true"}
+
+    # One worker per node for hot threads, plus node stats and pending tasks.
+    with ThreadPoolExecutor(max_workers=len(nodes) + 2) as executor, open(path, "a") as series:
+        for number in range(samples):
+            started = time.time()
+            hot_futures = {
+                node["name"]: executor.submit(client.get, f"_nodes/{node['id']}/hot_threads", params=hot_params, tag="diagnose_hot_threads")
+                for node in nodes
+            }
+            stats_future = executor.submit(client.get, f"_nodes/stats/{_NODE_STATS_METRICS}", tag="diagnose_node_stats")
+            pending_future = executor.submit(
+                client.get, "_cat/pending_tasks", params={"format": "json", "time": "ms"}, tag="diagnose_pending"
+            )
+
+            sample: List[Dict[str, Any]] = []
+            try:
+                for node, stats in parse_node_stats(stats_future.result() or {}).items():
+                    sample.append({"ts": started, "kind": "node_stats", "node": node, **stats})
+                sample.append({"ts": started, "kind": "pending", **parse_pending_tasks(pending_future.result())})
+            except Exception as e:
+                console.print(f"[bold red]Error sampling node stats:[/bold red] {e}")
+            for node, future in hot_futures.items():
+                try:
+                    text = _text(future.result())
+                except Exception as e:
+                    console.print(f"[yellow]Hot threads of {node} failed:[/yellow] {e}")
+                    continue
+                for hot_node, hot_threads in parse_hot_threads(text).items():
+                    sample.append({"ts": started, "kind": "hot_threads", "node": hot_node, "threads": hot_threads})
+
+            for record in sample:
+                series.write(json.dumps(record, separators=(",", ":")) + "\n")
+            series.flush()
+            records.extend(sample)
+            console.print(f"[dim]Sample {number + 1}/{samples} ({time.time() - started:.1f}s)[/dim]")
+            if number + 1 < samples:
+                time.sleep(max(0.0, interval - (time.time() - started)))
+
+    _display_summary(summarize(records), top, path)
+
+
+def _text(response: Any) -> str:
+    # hot_threads answers in plain text, which the client returns as the Response.
+    if isinstance(response, str):
+        return response
+    return getattr(response, "text", "") or ""
+
+
+def _display_summary(summary: Dict[str, Any], top: int, path: str):
+    gc_table = Table(show_header=True, header_style="bold magenta", box=None)
+    gc_table.add_column("Node", style="cyan")
+    gc_table.add_column("Heap %", justify="right")
+    gc_table.add_column("Young GCs", justify="right")
+    gc_table.add_column("Old GCs", justify="right")
+    gc_table.add_column("Old GC ms", justify="right")
+    gc_table.add_column("GC ms/s", justify="right", style="green")
+    for gc in summary["gc"]:
+        churn = f"{gc['gc_ms_per_s']:.1f}"
+        if gc["gc_ms_per_s"] >= 100 or gc["old_count"]:
+            churn = f"[red]{churn}[/red]"
+        gc_table.add_row(
+            gc["node"], f"{gc['heap_min']}–{gc['heap_max']}", str(gc["young_count"]), str(gc["old_count"]), str(gc["old_ms"]), churn,
+        )
+    console.print(Panel(gc_table, title="JVM Heap and GC", expand=False))
+
+    if summary["rejections"]:
+        pool_table = Table(show_header=True, header_style="bold magenta", box=None)
+        pool_table.add_column("Node", style="cyan")
+        pool_table.add_column("Pool")
+        pool_table.add_column("Rejected", justify="right", style="red")
+        pool_table.add_column("Total Rejected", justify="right")
+        pool_table.add_column("Max Queue", justify="right")
+        for row in summary["rejections"][:15]:
+            pool_table.add_row(row["node"], row["pool"], str(row["rejected"]), str(row["total"]), str(row["max_queue"]))
+        console.print(Panel(pool_table, title="Thread Pool Queues and Rejections", expand=False))
+    else:
+        console.print("[green]No thread pool queues or rejections during sampling.[/green]")
+
+    if summary["breakers"]:
+        breaker_table = Table(show_header=True, header_style="bold magenta", box=None)
+        breaker_table.add_column("Node", style="cyan")
+        breaker_table.add_column("Breaker")
+        breaker_table.add_column("Tripped", justify="right", style="red")
+        breaker_table.add_column("Used %", justify="right")
+        for row in summary["breakers"]:
+            breaker_table.add_row(row["node"], row["breaker"], str(row["tripped"]), f"{row['used_pct']:.0f}")
+        console.print(Panel(breaker_table, title="Circuit Breakers", expand=False))
+
+    if summary["stacks"]:
+        stack_table = Table(show_header=True, header_style="bold magenta", box=None)
+        stack_table.add_column("Node", style="cyan")
+        stack_table.add_column("Pool")
+        stack_table.add_column("Seen", justify="right")
+        stack_table.add_column("Avg %", justify="right", style="green")
+        stack_table.add_column("Top Frames", overflow="fold")
+        shown: Dict[str, int] = {}
+        for stack in summary["stacks"]:
+            if shown.get(stack["node"], 0) >= top:
+                continue
+            shown[stack["node"]] = shown.get(stack["node"], 0) + 1
+            stack_table.add_row(stack["node"], stack["pool"], str(stack["seen"]), f"{stack['pct']:.1f}", "\n".join(stack["frames"]))
+        console.print(Panel(stack_table, title="Hot Stacks", expand=False))
+
+    pending = summary["pending"]
+    if pending["max_count"]:
+        sources = sorted(pending["sources"].items(), key=lambda item: item[1], reverse=True)[:3]
+        console.print(
+            f"[yellow]Pending cluster tasks: up to {pending['max_count']}, longest wait {pending['max_wait_ms']:.0f} ms.[/yellow] "
+            + ", ".join(source for source, _ in sources)
+        )
+    console.print(f"[dim]Time series: {path}[/dim]")
@@ -0,0 +1,271 @@
+from typing import Dict, Any, Optional
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..waits import refresh as refresh_index
+
+console = Console()
+
+# Same shape as the `patronidata` / `patronidata-neural` indices.
+PATRONI_MAPPING = {
+    "mappings": {
+        "properties": {
+            "@timestamp": {"type": "date"},
+            "hostname": {"type": "keyword"},
+            "component": {"type": "keyword"},
+            "level": {"type": "keyword"},
+            "_raw": {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 512}}},
+        }
+    }
+}
+
+_INFO_TEMPLATES = {
+    "patroni": [
+        "INFO: no action. I am ({host}), the leader with the lock",
+        "INFO: no action. I am ({host}), a secondary, and following a leader ({leader})",
+        "INFO: Lock owner: {leader}; I am {host}",
+        "INFO: establishing a new patroni heartbeat connection to postgres",
+    ],
+    "postgres": [
+        "LOG:  checkpoint starting: time",
+        "LOG:  checkpoint complete: wrote {n} buffers ({pct}%); write={sec}.{ms} s",
+        "LOG:  connection authorized: user=app database=orders application_name=pgbouncer",
+        "LOG:  duration: {ms}.{n} ms  statement: SELECT * FROM orders WHERE id = {n}",
+    ],
+    "etcd": [
+        "INFO: raft.node: {member} elected leader {member} at term {n}",
+        "INFO: etcdserver: published local member to cluster",
+        "INFO: compacted raft logs at index {n}",
+        "INFO: apply request took {ms}ms, expected-duration 100ms",
+    ],
+}
+
+_ERROR_TEMPLATES = {
+    "patroni": [
+        "ERROR: Failed to update leader lock in DCS: u={n},e={code},ERROR etcd timeout",
+        "ERROR: get_cluster failed, retrying: e={code}",
+        "WARNING: Request failed to {host}: GET /patroni (connection refused)",
+    ],
+    "postgres": [
+        "ERROR:  canceling statement due to statement timeout u={n},e={code},ERROR",
+        "FATAL:  remaining connection slots are reserved for non-replication superuser connections e={code}",
+        "ERROR:  could not serialize access due to concurrent update e={code}",
+    ],
+    "etcd": [
+        "ERROR: rafthttp: failed to dial {member} on stream MsgApp v2 (peer {member} failed to find local node) e={code}",
+        "WARNING: etcdserver: read-only range request took too long ({ms}ms) to execute",
+    ],
+}
+
+_ERROR_CODES = ["22012", "40001", "53300", "57014", "08006", "XX000"]
+_COMPONENTS = list(_INFO_TEMPLATES)
+
+# Keep bulk responses tiny: only per-item errors are needed to count failures.
+_BULK_FILTER_PATH = "took,errors,items.*.error"
+
+
+class LogDocumentGenerator:
+    """
+    Produces Patroni/Postgres/etcd log documents as pre-serialized NDJSON.
+
+    Hostnames and templates are built once; each document costs a handful of
+    random draws, a `str.format` and one `json.dumps`.
+    """
+
+    def __init__(
+        self,
+        hosts: int = 50,
+        error_ratio: float = 0.05,
+        skew_seconds: float = 0.0,
+        timestamp_field: str = "@timestamp",
+        seed: Optional[int] = None,
+    ):
+        self.hostnames = [f"pg-node-{i:04d}" for i in range(max(1, hosts))]
+        self.error_ratio = error_ratio
+        self.skew_ms = int(skew_seconds * 1000)
+        self.timestamp_field = timestamp_field
+        self.rng = random.Random(seed)
+
+    def document(self, now_ms: int) -> Dict[str, Any]:
+        rng = self.rng
+        component = rng.choice(_COMPONENTS)
+        is_error = rng.random() < self.error_ratio
+        template = rng.choice((_ERROR_TEMPLATES if is_error else _INFO_TEMPLATES)[component])
+        host = rng.choice(self.hostnames)
+        raw = template.format(
+            host=host,
+            leader=rng.choice(self.hostnames),
+            member=f"etcd-{rng.randrange(3)}",
+            code=rng.choice(_ERROR_CODES),
+            n=rng.randrange(1, 100000),
+            pct=rng.randrange(1, 100),
+            sec=rng.randrange(0, 30),
+            ms=rng.randrange(1, 999),
+        )
+        level = raw.split(":", 1)[0].strip() if is_error else "INFO"
+        timestamp = now_ms - rng.randrange(self.skew_ms) if self.skew_ms else now_ms
+        return {
+            self.timestamp_field: timestamp,
+            "hostname": host,
+            "component": component,
+            "level": level,
+            "_raw": f"{component}[{rng.randrange(1000, 65535)}]: {raw}",
+        }
+
+    def ndjson_batch(self, size: int) -> str:
+        now_ms = int(time.time() * 1000)
+        # Templates, hostnames and the timestamp field contain no characters that
+        # need JSON escaping, so documents are formatted directly instead of
+        # going through json.dumps (roughly 2x faster per document).
+        line = '{"index":{}}\n{"%s":%d,"hostname":"%s","component":"%s","level":"%s","_raw":"%s"}'
+        field = json.dumps(self.timestamp_field)[1:-1]
+        lines = []
+        for _ in range(size):
+            doc = self.document(now_ms)
+            lines.append(
+                line % (field, doc[self.timestamp_field], doc["hostname"], doc["component"], doc["level"], doc["_raw"])
+            )
+        return "\n".join(lines) + "\n"
+
+
+def generate_logs(
+    client: OpenSearchClient,
+    index: str,
+    total_docs: int = 100_000,
+    rate: int = 0,
+    hosts: int = 50,
+    error_ratio: float = 0.05,
+    skew_seconds: float = 0.0,
+    workers: int = 4,
+    batch_size: int = 2000,
+    duration: float = 0.0,
+    timestamp_field: str = "@timestamp",
+    create_index: bool = False,
+    seed: Optional[int] = None,
+    refresh: bool = False,
+):
+    """
+    Streams synthetic log documents into `index` through `_bulk` with parallel workers.
+
+    `rate` is a global docs/sec target (0 = as fast as possible); it is split
+    evenly across workers, each pacing its own batches. With `refresh`, the
+    index is refreshed at the end so the data is searchable on return.
+    """
+    if create_index:
+        _ensure_index(client, index, timestamp_field)
+
+    workers = max(1, workers)
+    if client.dry_run:
+        # One sample batch is enough to preview the payload.
+        generator = LogDocumentGenerator(hosts, error_ratio, skew_seconds, timestamp_field, seed)
+        client.bulk(generator.ndjson_batch(min(batch_size, 3)), index=index, tag="datagen_bulk")
+        return
+
+    state = {"sent": 0, "reserved": 0, "failed": 0, "bytes": 0, "requests": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    deadline = time.monotonic() + duration if duration else None
+    per_worker_rate = rate / workers if rate else 0
+
+    def _claim(n: int) -> int:
+        # Reserve up to n docs from the global budget.
+        with lock:
+            if total_docs:
+                n = min(n, total_docs - state["sent"] - state["reserved"])
+            n = max(n, 0)
+            state["reserved"] += n
+            return n
+
+    def _worker(worker_id: int) -> None:
+        generator = LogDocumentGenerator(
+            hosts, error_ratio, skew_seconds, timestamp_field,
+            None if seed is None else seed + worker_id,
+        )
+        next_send = time.monotonic()
+        while not stop.is_set():
+            if deadline and time.monotonic() >= deadline:
+                return
+            size = _claim(batch_size)
+            if not size:
+                return
+
+            if per_worker_rate:
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send = max(next_send, time.monotonic() - 1) + size / per_worker_rate
+
+            payload = generator.ndjson_batch(size)
+            failed = 0
+            try:
+                response = client.bulk(
+                    payload, index=index, params={"filter_path": _BULK_FILTER_PATH}, tag="datagen_bulk"
+                )
+                if response and response.get("errors"):
+                    failed = sum(1 for item in response.get("items", []) for r in item.values() if r.get("error"))
+            except Exception as e:
+                console.print(f"[bold red]Worker {worker_id} bulk failed:[/bold red] {e}")
+                failed = size
+
+            with lock:
+                state["reserved"] -= size
+                state["sent"] += size
+                state["failed"] += failed
+                state["bytes"] += len(payload)
+                state["requests"] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="datagen") as executor:
+        futures = [executor.submit(_worker, i) for i in range(workers)]
+        try:
+            while wait(futures, timeout=2)[1]:
+                elapsed = time.perf_counter() - start
+                console.print(
+                    f"[dim]{state['sent']:,} docs, {state['sent'] / elapsed:,.0f} docs/s, "
+                    f"{state['failed']:,} failed[/dim]"
+                )
+        except KeyboardInterrupt:
+            console.print("[yellow]Interrupted, waiting for in-flight batches...[/yellow]")
+            stop.set()
+
+    elapsed = time.perf_counter() - start
+    if refresh:
+        refresh_index(client, index)
+    _display_summary(index, state, elapsed, workers)
+
+
+def _ensure_index(client: OpenSearchClient, index: str, timestamp_field: str):
+    mapping = json.loads(json.dumps(PATRONI_MAPPING))
+    if timestamp_field != "@timestamp":
+        properties = mapping["mappings"]["properties"]
+        properties[timestamp_field] = properties.pop("@timestamp")
+
+    try:
+        client.put(index, body=mapping, tag="datagen_create_index")
+    except Exception as e:
+        # Already existing indices are fine; the mapping is only a convenience.
+        response = getattr(e, "response", None)
+        if response is None or "resource_already_exists_exception" not in response.text:
+            raise
+
+
+def _display_summary(index: str, state: Dict[str, int], elapsed: float, workers: int):
+    table = Table(box=None)
+    table.add_column("Stat", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Index", index)
+    table.add_row("Docs sent", f"{state['sent']:,}")
+    table.add_row("Docs failed", f"{state['failed']:,}")
+    table.add_row("Bulk requests", f"{state['requests']:,}")
+    table.add_row("Workers", str(workers))
+    table.add_row("Elapsed", f"{elapsed:.2f}s")
+    if elapsed > 0:
+        table.add_row("Throughput", f"{state['sent'] / elapsed:,.0f} docs/s")
+        table.add_row("Payload", f"{state['bytes'] / 1024 / 1024 / elapsed:.2f} MB/s")
+    console.print(Panel(table, title="Synthetic Log Generation", expand=False))
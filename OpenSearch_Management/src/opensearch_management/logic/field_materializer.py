@@ -0,0 +1,393 @@
+from typing import List, Dict, Any, Optional, Tuple
+import json
+import re
+import statistics
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from rich.syntax import Syntax
+from ..client import OpenSearchClient
+from ..waits import WaitTimeout, refresh, wait_for_task
+
+console = Console()
+
+_GROK_DEFINITION = "MATERIALIZED"
+
+
+def capture_group_span(pattern: str) -> Tuple[int, int, int]:
+    """
+    Locates the first capturing group of a regex.
+
+    Returns (start, inner_start, end): the index of its "(", of the first
+    character inside it, and of its closing ")". Escapes and character
+    classes are skipped; non-capturing and lookaround groups are ignored.
+    """
+    depth_stack: List[Tuple[int, int, bool]] = []
+    i, in_class = 0, False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+            if pattern[i + 1:i + 2] == "]":
+                i += 1
+        elif char == "(":
+            inner, capturing = i + 1, True
+            if pattern[i + 1:i + 2] == "?":
+                named = re.match(r"\?P?<([A-Za-z_][A-Za-z0-9_]*)>", pattern[i + 1:])
+                capturing = bool(named)
+                inner = i + 1 + named.end() if named else i + 1
+            depth_stack.append((i, inner, capturing))
+        elif char == ")" and depth_stack:
+            start, inner, capturing = depth_stack.pop()
+            # Groups are numbered by their opening parenthesis, so the first
+            # capturing group is the outermost one that closes.
+            if capturing and not any(c for _, _, c in depth_stack):
+                return start, inner, i
+        i += 1
+    raise ValueError(f"Pattern has no capturing group: {pattern}")
+
+
+def regex_to_grok(pattern: str, target: str) -> Dict[str, Any]:
+    """Grok processor config whose first capture group is written to `target` (dotted names allowed)."""
+    start, inner, end = capture_group_span(pattern)
+    grok_pattern = pattern[:start] + f"%{{{_GROK_DEFINITION}:{target}}}" + pattern[end + 1:]
+    return {"patterns": [grok_pattern], "pattern_definitions": {_GROK_DEFINITION: pattern[inner:end]}}
+
+
+def regex_runtime_script(pattern: str, doc_field: str) -> str:
+    """Painless runtime script emitting the first capture group of `pattern` (needs regexes enabled, 'limited' is enough)."""
+    literal = pattern.replace("/", "\\/")
+    return (
+        f"if (doc['{doc_field}'].size() == 0) return; "
+        f"def m = /{literal}/.matcher(doc['{doc_field}'].value); "
+        f"if (m.find()) emit(m.group(1));"
+    )
+
+
+def runtime_to_ingest_script(source: str, target: str) -> str:
+    """
+    Best-effort translation of a runtime field script into an ingest script.
+
+    `doc['f'].value` / `doc['f.keyword'].value` read `ctx.f`, `.size() == 0`
+    becomes a null check and `emit(x)` assigns the target field. The result
+    is verified against the runtime field on sample documents before use.
+    """
+
+    def _ctx(field: str) -> str:
+        field = field[:-len(".keyword")] if field.endswith(".keyword") else field
+        return "ctx." + "?.".join(field.split("."))
+
+    script = re.sub(r"doc\['([^']+)'\]\.size\(\)\s*==\s*0", lambda m: f"{_ctx(m.group(1))} == null", source)
+    script = re.sub(r"doc\['([^']+)'\]\.size\(\)\s*(?:>|!=)\s*0", lambda m: f"{_ctx(m.group(1))} != null", script)
+    script = re.sub(r"doc\['([^']+)'\]\.value", lambda m: _ctx(m.group(1)), script)
+
+    # emit(<expr>) -> assignment; the argument may itself contain parentheses.
+    parts, i = [], 0
+    while True:
+        start = script.find("emit(", i)
+        if start == -1:
+            parts.append(script[i:])
+            break
+        depth, end = 0, start + len("emit")
+        for end in range(start + len("emit"), len(script)):
+            depth += {"(": 1, ")": -1}.get(script[end], 0)
+            if depth == 0:
+                break
+        parts.append(script[i:start] + f"ctx['{target}'] = {script[start + len('emit('):end]}")
+        i = end + 1
+
+    translated = "".join(parts)
+    if "doc[" in translated:
+        raise ValueError("Runtime script uses doc-value access that cannot be translated; pass --regex or --grok instead")
+    return translated
+
+
+def build_definition(
+    name: str,
+    source_field: str,
+    doc_field: str,
+    regex: Optional[str] = None,
+    grok: Optional[str] = None,
+    script: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Returns the runtime mapping (None for grok) and the equivalent tagged ingest processor."""
+    tag = f"materialize-{name}"
+    if regex:
+        runtime = {"type": "keyword", "script": {"source": regex_runtime_script(regex, doc_field)}}
+        processor = {"grok": dict(field=source_field, ignore_missing=True, ignore_failure=True, tag=tag, **regex_to_grok(regex, name))}
+    elif grok:
+        runtime = None
+        processor = {"grok": {"field": source_field, "patterns": [grok], "ignore_missing": True, "ignore_failure": True, "tag": tag}}
+    elif script:
+        runtime = {"type": "keyword", "script": {"source": script}}
+        processor = {"script": {"lang": "painless", "source": runtime_to_ingest_script(script, name), "ignore_failure": True, "tag": tag}}
+    else:
+        raise ValueError("One of --regex, --grok, --runtime-field or --script is required")
+    return {"runtime": runtime, "processor": processor}
+
+
+def upsert_processor(processors: List[Dict[str, Any]], processor: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Replaces the processor with the same tag, or appends it (idempotent re-runs)."""
+    tag = next(iter(processor.values()))["tag"]
+    updated = [p for p in processors if next(iter(p.values()), {}).get("tag") != tag]
+    updated.append(processor)
+    return updated
+
+
+def materialize_field(
+    client: OpenSearchClient,
+    index: str,
+    name: Optional[str] = None,
+    regex: Optional[str] = None,
+    grok: Optional[str] = None,
+    runtime_field: Optional[str] = None,
+    script: Optional[str] = None,
+    source_field: str = "_raw",
+    doc_field: Optional[str] = None,
+    pipeline: Optional[str] = None,
+    backfill: bool = False,
+    slices: str = "auto",
+    requests_per_second: Optional[float] = None,
+    sample: int = 200,
+    runs: int = 5,
+    force: bool = False,
+    timeout: float = 6 * 3600,
+):
+    """
+    Turns a query-time extraction (runtime field, regex or grok) into a keyword
+    field filled at ingest time.
+
+    Steps: benchmark the runtime field, generate the ingest processor and
+    verify it against the runtime values on sample documents, map the keyword
+    field, add the processor to the index's pipeline, and optionally backfill
+    existing documents with a sliced `_update_by_query`.
+    """
+    name = name or runtime_field
+    if not name:
+        console.print("[bold red]A target field name is required (--name).[/bold red]")
+        return
+    doc_field = doc_field or f"{source_field}.keyword"
+
+    try:
+        mapping_response = client.get(f"{index}/_mapping", tag="materialize_mapping") or {}
+        settings_response = client.get(f"{index}/_settings/index.default_pipeline", tag="materialize_settings") or {}
+    except Exception as e:
+        console.print(f"[bold red]Error reading index {index}:[/bold red] {e}")
+        return
+
+    mapped_runtime = None
+    if runtime_field:
+        for details in mapping_response.values():
+            mapped_runtime = details.get("mappings", {}).get("runtime", {}).get(runtime_field) or mapped_runtime
+        if mapped_runtime is None and not client.dry_run:
+            console.print(f"[bold red]Runtime field {runtime_field} is not defined in the mapping of {index}.[/bold red]")
+            return
+        script = ((mapped_runtime or {}).get("script") or {}).get("source", script)
+
+    try:
+        definition = build_definition(name, source_field, doc_field, regex=regex, grok=grok, script=script)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return
+
+    runtime = mapped_runtime or definition["runtime"]
+    processor = definition["processor"]
+    console.print(Panel(Syntax(json.dumps(processor, indent=2), "json", theme="monokai"), title="Generated Ingest Processor", expand=False))
+
+    before = None
+    if runtime:
+        before = _benchmark_terms(client, index, name, {name: runtime}, runs)
+        mismatches = _verify_sample(client, index, name, runtime, processor, source_field, sample)
+        if mismatches and not force:
+            console.print("[bold red]The processor does not reproduce the runtime field; nothing changed (use --force to apply anyway).[/bold red]")
+            return
+    else:
+        console.print("[dim]No runtime equivalent for grok patterns; skipping query-time benchmark and verification.[/dim]")
+
+    materialize_pipeline = f"materialize-{index}-{name}".replace("*", "")
+    default_pipeline = pipeline
+    if not default_pipeline:
+        for details in settings_response.values():
+            default_pipeline = details.get("settings", {}).get("index", {}).get("default_pipeline") or default_pipeline
+
+    try:
+        client.put(f"{index}/_mapping", body={"properties": {name: {"type": "keyword", "ignore_above": 256}}}, tag="materialize_put_mapping")
+        client.put(
+            f"_ingest/pipeline/{materialize_pipeline}",
+            body={"description": f"Extracts {name} (managed by opensearch-manager field materialize)", "processors": [processor]},
+            tag="materialize_put_pipeline",
+        )
+        if default_pipeline:
+            current = client.get(f"_ingest/pipeline/{default_pipeline}", tag="materialize_get_default_pipeline") or {}
+            body = current.get(default_pipeline, {"processors": []})
+            body["processors"] = upsert_processor(body.get("processors", []), processor)
+            client.put(f"_ingest/pipeline/{default_pipeline}", body=body, tag="materialize_update_default_pipeline")
+            console.print(f"[green]Added processor to pipeline {default_pipeline}[/green]")
+        else:
+            client.put(f"{index}/_settings", body={"index.default_pipeline": materialize_pipeline}, tag="materialize_set_default_pipeline")
+            console.print(f"[green]Set index.default_pipeline of {index} to {materialize_pipeline}[/green]")
+    except Exception as e:
+        console.print(f"[bold red]Error applying mapping or pipeline:[/bold red] {e}")
+        return
+
+    if not backfill:
+        console.print(f"[yellow]New documents get {name} at ingest. Re-run with --backfill to fill existing documents.[/yellow]")
+        if mapped_runtime:
+            console.print(f"[yellow]The runtime field {name} still shadows the new field until it is removed after a backfill.[/yellow]")
+        return
+
+    if not _backfill(client, index, name, source_field, materialize_pipeline, slices, requests_per_second, timeout):
+        return
+
+    if mapped_runtime:
+        client.put(f"{index}/_mapping", body={"runtime": {name: None}}, tag="materialize_remove_runtime")
+        console.print(f"[green]Removed runtime field {name}; queries now read doc values.[/green]")
+
+    after = _benchmark_terms(client, index, name, None, runs)
+    if before and after:
+        console.print(
+            f"[bold]Top {name} aggregation:[/bold] {statistics.median(before):.0f} ms (runtime) → "
+            f"{statistics.median(after):.0f} ms (keyword), {statistics.median(before) / max(statistics.median(after), 1):.1f}x faster"
+        )
+
+
+def _benchmark_terms(
+    client: OpenSearchClient, index: str, field: str, runtime_mappings: Optional[Dict[str, Any]], runs: int
+) -> List[float]:
+    """`took` of a top-10 terms aggregation on `field`, request cache disabled."""
+    body: Dict[str, Any] = {"size": 0, "track_total_hits": True, "aggs": {"top": {"terms": {"field": field, "size": 10}}}}
+    if runtime_mappings:
+        body["runtime_mappings"] = runtime_mappings
+
+    tooks, hits = [], 0
+    for _ in range(max(1, runs)):
+        response = client.post(f"{index}/_search", body=body, params={"request_cache": "false"}, tag="materialize_benchmark")
+        if not response:
+            return []
+        tooks.append(float(response.get("took", 0)))
+        hits = response.get("hits", {}).get("total", {}).get("value", 0)
+
+    label = "runtime field" if runtime_mappings else "keyword field"
+    per_doc = statistics.median(tooks) * 1000 / hits if hits else 0
+    console.print(
+        f"• Terms aggregation on {label} [cyan]{field}[/cyan]: median [bold]{statistics.median(tooks):.0f} ms[/bold] "
+        f"over {len(tooks)} runs ({hits:,} docs, {per_doc:.2f} µs/doc)"
+    )
+    return tooks
+
+
+def _verify_sample(
+    client: OpenSearchClient,
+    index: str,
+    name: str,
+    runtime: Dict[str, Any],
+    processor: Dict[str, Any],
+    source_field: str,
+    sample: int,
+) -> int:
+    """Compares runtime field values with the simulated processor output; returns the mismatch count."""
+    response = client.post(
+        f"{index}/_search",
+        body={
+            "size": sample,
+            "query": {"exists": {"field": source_field}},
+            "runtime_mappings": {name: runtime},
+            "fields": [name],
+        },
+        tag="materialize_sample",
+    )
+    hits = (response or {}).get("hits", {}).get("hits", [])
+    if not hits:
+        return 0
+
+    simulated = client.post(
+        "_ingest/pipeline/_simulate",
+        body={"pipeline": {"processors": [processor]}, "docs": [{"_source": hit.get("_source", {})} for hit in hits]},
+        tag="materialize_simulate",
+    ) or {}
+
+    mismatches = []
+    for hit, result in zip(hits, simulated.get("docs", [])):
+        expected = (hit.get("fields", {}).get(name) or [None])[0]
+        actual = _lookup(result.get("doc", {}).get("_source", {}), name)
+        if expected != actual:
+            mismatches.append((hit.get("_id"), expected, actual))
+
+    extracted = sum(1 for hit in hits if hit.get("fields", {}).get(name))
+    console.print(f"• Verified on {len(hits)} sample documents ({extracted} with a value): [bold]{len(mismatches)}[/bold] mismatches")
+    if mismatches:
+        table = Table(show_header=True, header_style="bold red", box=None)
+        table.add_column("_id")
+        table.add_column("Runtime")
+        table.add_column("Ingest")
+        for doc_id, expected, actual in mismatches[:5]:
+            table.add_row(str(doc_id), str(expected), str(actual))
+        console.print(Panel(table, title="Mismatches", expand=False))
+    return len(mismatches)
+
+
+def _backfill(
+    client: OpenSearchClient,
+    index: str,
+    name: str,
+    source_field: str,
+    pipeline: str,
+    slices: str,
+    requests_per_second: Optional[float],
+    timeout: float,
+) -> bool:
+    """Fills documents that lack the field via sliced `_update_by_query`; safe to re-run."""
+    params: Dict[str, Any] = {
+        "pipeline": pipeline,
+        "slices": slices,
+        "conflicts": "proceed",
+        "wait_for_completion": "false",
+    }
+    if requests_per_second:
+        params["requests_per_second"] = requests_per_second
+    body = {"query": {"bool": {"filter": [{"exists": {"field": source_field}}], "must_not": [{"exists": {"field": name}}]}}}
+
+    try:
+        response = client.post(f"{index}/_update_by_query", body=body, params=params, tag="materialize_backfill")
+    except Exception as e:
+        console.print(f"[bold red]Error starting backfill:[/bold red] {e}")
+        return False
+    if not response:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return False
+
+    task_id = response["task"]
+    console.print(f"[cyan]Backfill running as task {task_id} (slices={slices})[/cyan]")
+
+    def _progress(status: Dict[str, Any]):
+        total = status.get("total", 0)
+        done = status.get("updated", 0) + status.get("noops", 0)
+        if total:
+            console.print(f"[dim]{done:,}/{total:,} documents ({done / total:.0%})[/dim]")
+
+    try:
+        result = wait_for_task(client, task_id, timeout=timeout, on_progress=_progress)
+    except (WaitTimeout, RuntimeError) as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return False
+
+    status = result.get("response", {}) or result.get("task", {}).get("status", {})
+    failures = status.get("failures", [])
+    console.print(f"[green]Backfilled {status.get('updated', 0):,} documents[/green] ({len(failures)} failures)")
+    refresh(client, index)
+    return not failures
+
+
+def _lookup(source: Dict[str, Any], dotted: str) -> Any:
+    if dotted in source:
+        return source[dotted]
+    value: Any = source
+    for part in dotted.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
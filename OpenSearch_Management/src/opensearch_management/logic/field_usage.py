@@ -0,0 +1,350 @@
+from typing import List, Dict, Any, Optional, Iterable, Set
+import json
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..metrics import format_bytes
+from .index_operations import flatten_fields
+from .query_top import iter_history, iter_slowlog
+
+console = Console()
+
+STRUCTURES = ("inverted_index", "doc_values", "points", "norms", "stored", "term_vectors", "knn_vectors")
+
+# Lucene file extensions (from `_stats?include_segment_file_sizes`) per structure.
+FILE_STRUCTURES = {
+    "tim": "inverted_index", "tip": "inverted_index", "tmd": "inverted_index",
+    "doc": "inverted_index", "pos": "inverted_index", "pay": "inverted_index",
+    "dvd": "doc_values", "dvm": "doc_values",
+    "dim": "points", "dii": "points", "kdd": "points", "kdi": "points", "kdm": "points",
+    "nvd": "norms", "nvm": "norms",
+    "fdt": "stored", "fdx": "stored", "fdm": "stored",
+    "tvd": "term_vectors", "tvx": "term_vectors", "tvm": "term_vectors",
+    "vec": "knn_vectors", "vex": "knn_vectors", "vem": "knn_vectors",
+    "hnsw": "knn_vectors", "hnswc": "knn_vectors", "faiss": "knn_vectors", "faissc": "knn_vectors",
+}
+
+_TERM_TYPES = {"text", "match_only_text", "keyword", "wildcard", "constant_keyword", "flat_object"}
+_POINT_TYPES = {
+    "long", "integer", "short", "byte", "double", "float", "half_float", "scaled_float",
+    "unsigned_long", "date", "date_nanos", "ip", "geo_point",
+}
+_DOC_VALUE_TYPES = _POINT_TYPES | {"keyword", "boolean", "wildcard", "constant_keyword"}
+
+# Leaf queries whose object keys are field names.
+_FIELD_KEYED_QUERIES = {
+    "term", "terms", "match", "match_phrase", "match_phrase_prefix", "match_bool_prefix", "range",
+    "prefix", "wildcard", "regexp", "fuzzy", "geo_distance", "geo_bounding_box", "knn", "neural", "intervals",
+}
+
+# Keys next to field names in those queries, and in same-named aggregations (terms, range).
+_OPTION_KEYS = {
+    "boost", "_name", "field", "size", "shard_size", "order", "min_doc_count", "include", "exclude",
+    "missing", "script", "ranges", "keyed", "format", "time_zone", "relation", "value_type",
+}
+_METADATA_FIELDS = {"_score", "_doc", "_id", "_index", "_shard_doc", "_seq_no"}
+
+
+def parse_disk_usage(response: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """Per-field bytes by structure from a `_disk_usage` response (summed over indices)."""
+    fields: Dict[str, Dict[str, int]] = {}
+    for index_usage in response.values():
+        if not isinstance(index_usage, dict):
+            continue
+        for field, usage in index_usage.get("fields", {}).items():
+            entry = fields.setdefault(field, {structure: 0 for structure in STRUCTURES})
+            entry["inverted_index"] += usage.get("inverted_index", {}).get("total_in_bytes", 0)
+            entry["stored"] += usage.get("stored_fields_in_bytes", 0)
+            for structure in ("doc_values", "points", "norms", "term_vectors", "knn_vectors"):
+                entry[structure] += usage.get(f"{structure}_in_bytes", 0)
+    for entry in fields.values():
+        entry["total"] = sum(entry[structure] for structure in STRUCTURES)
+    return fields
+
+
+def segment_file_totals(stats: Dict[str, Any]) -> Dict[str, int]:
+    """Primary-shard bytes per structure from segment file sizes."""
+    totals = {structure: 0 for structure in STRUCTURES}
+    for index_stats in stats.get("indices", {}).values():
+        file_sizes = index_stats.get("primaries", {}).get("segments", {}).get("file_sizes", {})
+        for extension, details in file_sizes.items():
+            structure = FILE_STRUCTURES.get(extension)
+            if structure:
+                totals[structure] += details.get("size_in_bytes", 0)
+    return totals
+
+
+def source_value_bytes(sources: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """Total JSON size of the values of each dotted field path over the sampled `_source`s."""
+    sizes: Dict[str, int] = {}
+
+    def _walk(value: Any, path: str):
+        if isinstance(value, dict):
+            for key, child in value.items():
+                _walk(child, f"{path}.{key}" if path else key)
+        elif isinstance(value, list) and any(isinstance(item, dict) for item in value):
+            for item in value:
+                _walk(item, path)
+        elif value is not None:
+            sizes[path] = sizes.get(path, 0) + len(json.dumps(value))
+
+    for source in sources:
+        _walk(source, "")
+    return sizes
+
+
+def estimate_field_usage(
+    mapped: Dict[str, Dict[str, Any]], totals: Dict[str, int], value_bytes: Dict[str, int]
+) -> Dict[str, Dict[str, int]]:
+    """
+    Splits each structure's bytes across the fields that write to it, in
+    proportion to their sampled value sizes. Multi-fields (`_raw.keyword`)
+    are weighted by the parent's values.
+    """
+    weights: Dict[str, Dict[str, int]] = {structure: {} for structure in STRUCTURES}
+    for field, details in mapped.items():
+        ftype = details.get("type", "object")
+        weight = value_bytes.get(field)
+        if weight is None and "." in field:
+            weight = value_bytes.get(field.rsplit(".", 1)[0], 0)
+        if not weight:
+            continue
+        indexed = details.get("index", True) is not False
+        if indexed and ftype in _TERM_TYPES:
+            weights["inverted_index"][field] = weight
+        if indexed and ftype in _POINT_TYPES:
+            weights["points"][field] = weight
+        if details.get("doc_values", ftype in _DOC_VALUE_TYPES) and ftype in _DOC_VALUE_TYPES:
+            weights["doc_values"][field] = weight
+        if ftype == "text" and details.get("norms", True) is not False:
+            weights["norms"][field] = weight
+        if details.get("term_vector", "no") != "no":
+            weights["term_vectors"][field] = weight
+        if ftype == "knn_vector":
+            weights["knn_vectors"][field] = weight
+        if field in value_bytes:
+            # Stored bytes are the compressed _source, shared by every field in it.
+            weights["stored"][field] = weight
+
+    usage: Dict[str, Dict[str, int]] = {}
+    for structure, field_weights in weights.items():
+        total_weight = sum(field_weights.values())
+        for field, weight in field_weights.items():
+            entry = usage.setdefault(field, {s: 0 for s in STRUCTURES})
+            entry[structure] = int(totals.get(structure, 0) * weight / total_weight)
+    for entry in usage.values():
+        entry["total"] = sum(entry[structure] for structure in STRUCTURES)
+    return usage
+
+
+def parse_field_usage_stats(response: Dict[str, Any]) -> Dict[str, int]:
+    """Query count per field from a `_field_usage_stats` response (`any`, summed over shards)."""
+    counts: Dict[str, int] = {}
+    for index_usage in response.values():
+        if not isinstance(index_usage, dict):
+            continue
+        for shard in index_usage.get("shards", []):
+            for field, usage in shard.get("stats", {}).get("fields", {}).items():
+                counts[field] = counts.get(field, 0) + usage.get("any", 0)
+    return counts
+
+
+def referenced_fields(body: Any) -> Set[str]:
+    """Field names a search body queries, aggregates or sorts on."""
+    fields: Set[str] = set()
+
+    def _walk(node: Any, parent: Optional[str] = None):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if parent in _FIELD_KEYED_QUERIES and key not in _OPTION_KEYS:
+                    fields.add(key)
+                if key in ("field", "default_field") and isinstance(value, str):
+                    fields.add(value)
+                elif key == "fields" and isinstance(value, list):
+                    fields.update(v.split("^")[0] for v in value if isinstance(v, str))
+                elif key == "sort":
+                    for item in value if isinstance(value, list) else [value]:
+                        if isinstance(item, str):
+                            fields.add(item)
+                        elif isinstance(item, dict):
+                            fields.update(item.keys())
+                _walk(value, key)
+        elif isinstance(node, list):
+            for item in node:
+                _walk(item, parent)
+
+    _walk(body)
+    return fields - _METADATA_FIELDS
+
+
+def history_field_counts(history_dir: Optional[str], slowlogs: Optional[List[str]], index: str) -> Dict[str, int]:
+    """How many captured queries (history and slow logs) reference each field of `index`."""
+    import fnmatch
+    import glob
+
+    counts: Dict[str, int] = {}
+    sources = [iter_slowlog([p for pattern in slowlogs or [] for p in sorted(glob.glob(pattern))])]
+    if history_dir:
+        sources.append(iter_history(history_dir))
+    for source in sources:
+        for entry in source:
+            target = entry.get("index") or ""
+            if target and not any(fnmatch.fnmatchcase(i, p) or fnmatch.fnmatchcase(p, i) for i in index.split(",") for p in target.split(",")):
+                continue
+            body = entry["source"]
+            if isinstance(body, str):
+                try:
+                    body = json.loads(body)
+                except json.JSONDecodeError:
+                    continue
+            for field in referenced_fields(body):
+                counts[field] = counts.get(field, 0) + 1
+    return counts
+
+
+def suggest(ftype: str, usage: Dict[str, int], queried: Optional[int]) -> str:
+    """Mapping change for an unqueried field, based on where its bytes go."""
+    if queried is None or queried > 0 or not usage.get("total"):
+        return ""
+    suggestions = []
+    if usage.get("doc_values"):
+        suggestions.append("doc_values: false")
+    if usage.get("norms"):
+        suggestions.append("norms: false")
+    if usage.get("inverted_index") or usage.get("points"):
+        suggestions.append("index: false")
+    return ", ".join(suggestions) or "unused"
+
+
+def show_field_usage(
+    client: OpenSearchClient,
+    index: str,
+    sample: Optional[int] = None,
+    history_dir: Optional[str] = None,
+    slowlogs: Optional[List[str]] = None,
+    limit: int = 50,
+):
+    """
+    Ranks the fields of an index by the bytes they take on disk and how often
+    they are queried.
+
+    Bytes come from `_disk_usage` when the cluster has it. Otherwise, or with
+    `sample`, the per-structure totals from segment files are split across
+    fields by the value sizes of a random document sample (an estimate).
+    Query counts come from `_field_usage_stats` where available and from the
+    captured query history / slow logs.
+    """
+    try:
+        mapping_response = client.get_cached(f"{index}/_mapping", tag="fields_mapping") or {}
+    except Exception as e:
+        console.print(f"[bold red]Error fetching mapping for {index}:[/bold red] {e}")
+        return
+    if not mapping_response:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+
+    mapped: Dict[str, Dict[str, Any]] = {}
+    for details in mapping_response.values():
+        mapped.update(flatten_fields(details.get("mappings", {}).get("properties", {})))
+
+    field_bytes, method = None, "estimated"
+    if not sample:
+        field_bytes = _disk_usage(client, index)
+        method = "_disk_usage"
+    if field_bytes is None:
+        field_bytes = _estimate(client, index, mapped, sample or 1000)
+        method = f"estimated from {sample or 1000} sampled documents"
+    if field_bytes is None:
+        return
+
+    queried: Optional[Dict[str, int]] = _field_usage_stats(client, index)
+    query_source = "_field_usage_stats"
+    captured = history_field_counts(history_dir, slowlogs, index)
+    if queried is None:
+        queried = captured if captured else None
+        query_source = "captured queries" if captured else "none"
+
+    _display_usage(mapped, field_bytes, queried, method, query_source, limit)
+
+
+def _disk_usage(client: OpenSearchClient, index: str) -> Optional[Dict[str, Dict[str, int]]]:
+    try:
+        response = client.post(
+            f"{index}/_disk_usage", params={"run_expensive_tasks": "true", "flush": "true"}, tag="fields_disk_usage"
+        )
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status in (400, 404, 405):
+            console.print("[dim]_disk_usage is not available on this cluster; estimating from a sample.[/dim]")
+            return None
+        raise
+    return parse_disk_usage(response) if response else None
+
+
+def _field_usage_stats(client: OpenSearchClient, index: str) -> Optional[Dict[str, int]]:
+    try:
+        response = client.get(f"{index}/_field_usage_stats", tag="fields_usage_stats")
+    except Exception:
+        return None
+    return parse_field_usage_stats(response) if response else None
+
+
+def _estimate(client: OpenSearchClient, index: str, mapped: Dict[str, Dict[str, Any]], sample: int) -> Optional[Dict[str, Dict[str, int]]]:
+    try:
+        stats = client.get(
+            f"{index}/_stats/docs,segments", params={"include_segment_file_sizes": "true"}, tag="fields_segment_files"
+        )
+        response = client.post(
+            f"{index}/_search",
+            body={"size": sample, "query": {"function_score": {"query": {"match_all": {}}, "random_score": {}}}},
+            params={"filter_path": "hits.hits._source"},
+            tag="fields_sample",
+        )
+    except Exception as e:
+        console.print(f"[bold red]Error sampling {index}:[/bold red] {e}")
+        return None
+    if not stats:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return None
+
+    sources = [hit.get("_source", {}) for hit in (response or {}).get("hits", {}).get("hits", [])]
+    return estimate_field_usage(mapped, segment_file_totals(stats), source_value_bytes(sources))
+
+
+def _display_usage(
+    mapped: Dict[str, Dict[str, Any]],
+    field_bytes: Dict[str, Dict[str, int]],
+    queried: Optional[Dict[str, int]],
+    method: str,
+    query_source: str,
+    limit: int,
+):
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Field", style="cyan")
+    table.add_column("Type", style="green")
+    table.add_column("Total", justify="right", style="bold")
+    for column in ("Inverted", "Doc Values", "Points", "Norms", "Stored", "Vectors"):
+        table.add_column(column, justify="right")
+    table.add_column("Queried", justify="right")
+    table.add_column("Suggestion", style="yellow")
+
+    ranked = sorted(field_bytes.items(), key=lambda item: item[1]["total"], reverse=True)
+    grand_total = sum(usage["total"] for _, usage in ranked) or 1
+    for field, usage in ranked[:limit]:
+        ftype = mapped.get(field, {}).get("type", "-")
+        count = None if queried is None else queried.get(field, 0)
+        table.add_row(
+            field,
+            ftype,
+            f"{format_bytes(usage['total'])} ({usage['total'] / grand_total:.0%})",
+            *(format_bytes(usage[s]) if usage[s] else "-" for s in ("inverted_index", "doc_values", "points", "norms", "stored", "knn_vectors")),
+            "-" if count is None else str(count),
+            suggest(ftype, usage, count),
+        )
+    console.print(Panel(table, title=f"Field Disk Usage ({method}; queries: {query_source})", expand=False))
+    if queried is None:
+        console.print("[dim]No query usage data: capture queries with --query-history or pass --slowlog to get suggestions.[/dim]")
+
@@ -0,0 +1,230 @@
+from typing import List, Dict, Any, Optional
+import hashlib
+import json
+import os
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..cache import LRUCache
+
+console = Console()
+
+DEFAULT_PIPELINE = "hybrid-norm-pipeline"
+_CACHE_FILE = "hybrid_search_cache.json"
+
+
+def normalize_query_text(text: str) -> str:
+    """Case- and whitespace-insensitive form of a query, used for cache keys."""
+    return " ".join(text.lower().split())
+
+
+def search_pipeline_body(
+    weights: List[float], technique: str = "min_max", combination: str = "arithmetic_mean"
+) -> Dict[str, Any]:
+    return {
+        "description": "Hybrid lexical + neural score normalization (managed by opensearch-manager)",
+        "phase_results_processors": [
+            {
+                "normalization-processor": {
+                    "normalization": {"technique": technique},
+                    "combination": {"technique": combination, "parameters": {"weights": weights}},
+                }
+            }
+        ],
+    }
+
+
+def ensure_search_pipeline(client: OpenSearchClient, name: str, body: Dict[str, Any]) -> bool:
+    """Creates or updates the normalization pipeline; returns True if a write was needed."""
+    try:
+        current = client.get(f"_search/pipeline/{name}", tag="hybrid_get_pipeline") or {}
+    except Exception:
+        current = {}
+
+    existing = current.get(name, {})
+    if existing.get("phase_results_processors") == body["phase_results_processors"]:
+        return False
+    client.put(f"_search/pipeline/{name}", body=body, tag="hybrid_put_pipeline")
+    return True
+
+
+def build_hybrid_query(
+    text: str, text_field: str, vector_field: str, model_id: str, k: int, size: int
+) -> Dict[str, Any]:
+    return {
+        "size": size,
+        "_source": {"excludes": [vector_field]},
+        "query": {
+            "hybrid": {
+                "queries": [
+                    {"match": {text_field: {"query": text}}},
+                    {"neural": {vector_field: {"query_text": text, "model_id": model_id, "k": k}}},
+                ]
+            }
+        },
+    }
+
+
+def hybrid_search(
+    client: OpenSearchClient,
+    index: str,
+    text: str,
+    text_field: str = "_raw",
+    vector_field: str = "message_embedding",
+    model_id: Optional[str] = None,
+    weights: Optional[List[float]] = None,
+    k: int = 50,
+    size: int = 10,
+    pipeline: str = DEFAULT_PIPELINE,
+    technique: str = "min_max",
+    combination: str = "arithmetic_mean",
+    use_cache: bool = True,
+    profile_subqueries: bool = False,
+    fields: Optional[List[str]] = None,
+    cache: Optional[LRUCache] = None,
+):
+    """
+    Runs a hybrid `match` + `neural` query through a normalization search pipeline.
+
+    Results are cached locally, keyed by the normalized query, its parameters
+    and the index generation (indexing/delete/refresh counters), so a repeated search
+    skips inference until the index changes.
+    """
+    weights = weights or [0.3, 0.7]
+    timings: Dict[str, float] = {}
+
+    try:
+        model_id = model_id or _resolve_model_id(client, index)
+    except Exception as e:
+        console.print(f"[bold red]Error resolving model id:[/bold red] {e}")
+        return
+    if not model_id and not client.dry_run:
+        console.print(f"[bold red]No model id found for {index}; pass --model-id.[/bold red]")
+        return
+
+    cache_key = None
+    if use_cache and not client.dry_run:
+        cache = cache or LRUCache(path=os.path.join(client.settings.settings.state_dir, _CACHE_FILE))
+        start = time.perf_counter()
+        generation = _index_generation(client, index)
+        timings["generation lookup"] = (time.perf_counter() - start) * 1000
+        cache_key = _cache_key(index, text, text_field, vector_field, model_id, weights, k, size, technique, combination, generation)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            _display_results(cached, fields, text_field)
+            _display_latency(timings, cache_hit=True)
+            return
+
+    try:
+        ensure_search_pipeline(client, pipeline, search_pipeline_body(weights, technique, combination))
+    except Exception as e:
+        console.print(f"[bold red]Error creating search pipeline {pipeline}:[/bold red] {e}")
+        return
+
+    body = build_hybrid_query(text, text_field, vector_field, model_id, k, size)
+    start = time.perf_counter()
+    try:
+        response = client.post(f"{index}/_search", body=body, params={"search_pipeline": pipeline}, tag="hybrid_search")
+    except Exception as e:
+        console.print(f"[bold red]Error running hybrid search:[/bold red] {e}")
+        return
+    timings["hybrid (wall)"] = (time.perf_counter() - start) * 1000
+
+    if not response:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+    timings["hybrid (took)"] = response.get("took", 0)
+
+    if profile_subqueries:
+        for name, sub_query in zip(("match", "neural"), body["query"]["hybrid"]["queries"]):
+            start = time.perf_counter()
+            sub = client.post(
+                f"{index}/_search",
+                body={"size": size, "_source": False, "query": sub_query},
+                params={"filter_path": "took"},
+                tag=f"hybrid_profile_{name}",
+            ) or {}
+            timings[f"{name} (wall)"] = (time.perf_counter() - start) * 1000
+            timings[f"{name} (took)"] = sub.get("took", 0)
+
+    hits = response.get("hits", {}).get("hits", [])
+    if cache_key:
+        cache.put(cache_key, hits)
+
+    _display_results(hits, fields, text_field)
+    _display_latency(timings, cache_hit=False)
+
+
+def _resolve_model_id(client: OpenSearchClient, index: str) -> Optional[str]:
+    """Finds the embedding model through the index's default ingest pipeline."""
+    settings = client.get_cached(f"{index}/_settings/index.default_pipeline", tag="hybrid_get_settings") or {}
+    for index_settings in settings.values():
+        pipeline_id = index_settings.get("settings", {}).get("index", {}).get("default_pipeline")
+        if not pipeline_id:
+            continue
+        pipeline = client.get_cached(f"_ingest/pipeline/{pipeline_id}", tag="hybrid_get_ingest_pipeline") or {}
+        for processor in pipeline.get(pipeline_id, {}).get("processors", []):
+            model_id = processor.get("text_embedding", {}).get("model_id")
+            if model_id:
+                return model_id
+    return None
+
+
+def _index_generation(client: OpenSearchClient, index: str) -> str:
+    """
+    Cheap fingerprint of the searchable index contents. Doc stats come from
+    the refreshed segments, so they move only when writes become searchable
+    (an update adds a deleted doc); idle scheduled refreshes of an ingesting
+    index keep the cache valid.
+    """
+    stats = client.get(
+        f"{index}/_stats/docs",
+        params={"filter_path": "_all.primaries.docs"},
+        tag="hybrid_generation",
+    ) or {}
+    docs = stats.get("_all", {}).get("primaries", {}).get("docs", {})
+    return f"{docs.get('count')}:{docs.get('deleted')}"
+
+
+def _cache_key(index: str, text: str, *params: Any) -> str:
+    raw = json.dumps([index, normalize_query_text(text), *params], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _display_results(hits: List[Dict[str, Any]], fields: Optional[List[str]], text_field: str):
+    if not hits:
+        console.print("[yellow]No hits.[/yellow]")
+        return
+
+    fields = fields or [text_field]
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("#", justify="right", style="dim")
+    table.add_column("Score", justify="right", style="green")
+    for field in fields:
+        table.add_column(field, overflow="fold")
+
+    for rank, hit in enumerate(hits, start=1):
+        source = hit.get("_source", {})
+        values = [str(_lookup(source, field))[:200] for field in fields]
+        table.add_row(str(rank), f"{hit.get('_score') or 0:.4f}", *values)
+    console.print(Panel(table, title="Hybrid Search Results", expand=False))
+
+
+def _display_latency(timings: Dict[str, float], cache_hit: bool):
+    table = Table(box=None)
+    table.add_column("Step", style="cyan")
+    table.add_column("ms", justify="right", style="green")
+    for step, ms in timings.items():
+        table.add_row(step, f"{ms:.1f}")
+    table.add_row("cache", "[green]hit[/green]" if cache_hit else "miss")
+    console.print(Panel(table, title="Latency", expand=False))
+
+
+def _lookup(source: Dict[str, Any], dotted: str) -> Any:
+    value: Any = source
+    for part in dotted.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return "" if value is None else value
@@ -7,6 +7,7 @@ from rich.text import Text
 from rich.layout import Layout
 import json
 from ..client import OpenSearchClient
+from .knn_memory import display_knn_memory, knn_field_specs
 
 console = Console()
 
@@ -19,7 +20,7 @@ def get_index_details(client: OpenSearchClient, index_patterns: List[str]):
     path = ",".join(index_patterns)
 
     try:
-        response = client.get(path, tag="get_index_details")
+        response = client.get_cached(path, tag="get_index_details")
         # Also fetch stats for these indices
         stats_response = client.get(f"{path}/_stats", tag="get_index_stats")
     except Exception as e:
@@ -38,12 +39,42 @@ def get_index_details(client: OpenSearchClient, index_patterns: List[str]):
     # If dry run, stats_response might be empty or None
     stats_data = stats_response.get("indices", {}) if stats_response else {}
 
+    # k-NN plugin stats are only worth a request when a vector field exists
+    knn_stats = None
+    if any(knn_field_specs(details.get("mappings", {})) for details in response.values()):
+        try:
+            knn_stats = client.get("_plugins/_knn/stats", tag="get_knn_stats")
+        except Exception:
+            knn_stats = None
+
     for index_name, details in response.items():
         index_stats = stats_data.get(index_name, {})
-        _display_single_index(index_name, details, index_stats)
+        _display_single_index(index_name, details, index_stats, knn_stats)
+
+
+def show_field_analysis(client: OpenSearchClient, index: str):
+    """
+    Displays the field analysis table for each index matching `index`.
+    """
+    try:
+        response = client.get_cached(f"{index}/_mapping", tag="get_index_mapping")
+    except Exception as e:
+        console.print(f"[bold red]Error fetching mapping:[/bold red] {e}")
+        return
 
+    if not response:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
 
-def _display_single_index(index_name: str, details: Dict[str, Any], stats: Dict[str, Any]):
+    for index_name, details in response.items():
+        console.print(f"[bold cyan]{index_name}[/bold cyan]")
+        _display_field_analysis(details.get("mappings", {}))
+
+
+def _display_single_index(
+    index_name: str, details: Dict[str, Any], stats: Dict[str, Any], knn_stats: Optional[Dict[str, Any]] = None
+):
     mappings = details.get("mappings", {})
     settings = details.get("settings", {}).get("index", {})
     aliases = details.get("aliases", {})
@@ -57,7 +88,10 @@ def _display_single_index(index_name: str, details: Dict[str, Any], stats: Dict[
     # --- 3. Field Analysis ---
     _display_field_analysis(mappings)
 
-    # --- 4. Analysis Components ---
+    # --- 4. k-NN Memory ---
+    display_knn_memory(index_name, mappings, settings, stats, knn_stats)
+
+    # --- 5. Analysis Components ---
     analysis = settings.get("analysis", {})
     if analysis:
         console.print(
@@ -118,7 +152,8 @@ def _display_advanced_settings(settings: Dict):
         "sort.field",
         "sort.order",
         "query.default_field",
-        "lifecycle.name"
+        "lifecycle.name",
+        "index_state_management"
     ]
     
     table = Table(title="Advanced Settings", show_header=True, header_style="bold magenta", box=None)
@@ -150,7 +185,8 @@ def _get_setting_impact(key: str) -> str:
         "max_result_window": "Deep pagination limit (default 10k)",
         "translog": "Crash recovery & Write performance",
         "sort.field": "Faster range/sort queries (Sorted Index)",
-        "lifecycle": "ISM Policy attached"
+        "lifecycle": "ISM Policy attached",
+        "index_state_management": "ISM rollover alias (see `ism plan`)"
     }
     for k, v in impacts.items():
         if k in key:
@@ -172,7 +208,7 @@ def _display_field_analysis(mappings: Dict):
     table.add_column("Notes/Warnings", style="red")
 
     # Recursively get fields
-    flat_fields = _flatten_fields(properties)
+    flat_fields = flatten_fields(properties)
 
     for field, details in flat_fields.items():
         ftype = details.get("type", "object")
@@ -225,7 +261,7 @@ def _analyze_field_usage(ftype: str, details: Dict) -> tuple[str, str]:
     return best_query, ", ".join(notes)
 
 
-def _flatten_fields(properties: Dict, prefix: str = "") -> Dict[str, Dict]:
+def flatten_fields(properties: Dict, prefix: str = "") -> Dict[str, Dict]:
     """Recursively flattens mapping properties."""
     fields = {}
     for name, details in properties.items():
@@ -239,7 +275,7 @@ def _flatten_fields(properties: Dict, prefix: str = "") -> Dict[str, Dict]:
         
         if "properties" in details:
             # Nested object or object type
-            fields.update(_flatten_fields(details["properties"], full_name))
+            fields.update(flatten_fields(details["properties"], full_name))
         else:
             fields[full_name] = details
             
@@ -0,0 +1,380 @@
+from typing import List, Dict, Any, Optional
+import fnmatch
+import hashlib
+import json
+import math
+import os
+import re
+import statistics
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from rich.syntax import Syntax
+from ..client import OpenSearchClient
+
+console = Console()
+
+GB = 1024 ** 3
+DAY_MS = 86_400_000
+_SAMPLES_FILE = "ism_samples.jsonl"
+_MANAGED_BY = "opensearch-manager ism plan"
+
+
+def series_pattern(alias: str) -> str:
+    """
+    Pattern of the rollover series (`<alias>-000001`, ...). It is narrower
+    than `<alias>-*` so that daily indices sharing the prefix are not matched
+    by the template or the policy's `ism_template`.
+    """
+    return f"{alias}-0*"
+
+
+def clashing_indices(names: List[str], alias: str) -> List[str]:
+    """Existing indices that match the series pattern but are not rollover indices of `alias`."""
+    rollover_name = re.compile(rf"{re.escape(alias)}-\d{{6,}}")
+    return [name for name in names if fnmatch.fnmatchcase(name, series_pattern(alias)) and not rollover_name.fullmatch(name)]
+
+
+def parse_cat_indices(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Typed `_cat/indices` rows, oldest first."""
+    indices = []
+    for row in rows:
+        if not row.get("creation.date"):
+            continue
+        indices.append({
+            "index": row["index"],
+            "created": int(row["creation.date"]),
+            "primaries": int(row.get("pri") or 1),
+            "replicas": int(row.get("rep") or 0),
+            "pri_bytes": int(row.get("pri.store.size") or 0),
+            "docs": int(row.get("docs.count") or 0),
+        })
+    return sorted(indices, key=lambda i: i["created"])
+
+
+def daily_rates(indices: List[Dict[str, Any]], now_ms: int, write_rate: Optional[float] = None) -> List[float]:
+    """
+    Primary bytes per day of each time-based index: its size over the time
+    until the next index was created. The newest index is still being
+    written, so its rate comes from `write_rate` (sampled) when known, and is
+    skipped when younger than an hour.
+    """
+    rates = []
+    for position, index in enumerate(indices):
+        is_last = position == len(indices) - 1
+        if is_last and write_rate is not None:
+            rates.append(write_rate)
+            continue
+        end = now_ms if is_last else indices[position + 1]["created"]
+        days = (end - index["created"]) / DAY_MS
+        if days >= 1 / 24:
+            rates.append(index["pri_bytes"] / days)
+    return rates
+
+
+def record_sample(path: str, indices: List[Dict[str, Any]], now: float) -> Optional[float]:
+    """
+    Appends a size sample for the newest index to `path` and returns its
+    write rate (bytes/day) since the oldest earlier sample of the same index.
+    """
+    if not indices:
+        return None
+    newest = indices[-1]
+    rate = None
+    try:
+        with open(path) as f:
+            for line in f:
+                sample = json.loads(line)
+                if sample["index"] == newest["index"] and now - sample["ts"] >= 600:
+                    rate = (newest["pri_bytes"] - sample["pri_bytes"]) / ((now - sample["ts"]) / 86400)
+                    break
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        pass
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps({"ts": now, "index": newest["index"], "pri_bytes": newest["pri_bytes"]}) + "\n")
+    return rate if rate is not None and rate > 0 else None
+
+
+def plan_rollover(
+    rates: List[float],
+    target_shard_bytes: float,
+    min_shard_bytes: float,
+    max_shard_bytes: float,
+    max_age_days: int,
+    max_primaries: int,
+) -> Dict[str, Any]:
+    """
+    Primary count and rollover conditions that keep shards in the size band.
+
+    Primaries are sized so that at peak (p95) ingest one index fills to
+    `target` per shard in about a day. Rollover happens at the target primary
+    shard size, or after `max_age_days` when ingest is slow.
+    """
+    median = statistics.median(rates)
+    peak = sorted(rates)[max(0, math.ceil(len(rates) * 0.95) - 1)]
+    primaries = max(1, min(max_primaries, math.ceil(peak / target_shard_bytes)))
+    capacity = primaries * target_shard_bytes
+
+    shard_at_median = min(target_shard_bytes, median * max_age_days / primaries)
+    notes = []
+    if peak / primaries > max_shard_bytes:
+        notes.append(f"Peak ingest fills {primaries} primaries past the maximum shard size within a day; add data nodes.")
+    if shard_at_median < min_shard_bytes:
+        notes.append(
+            f"At median ingest shards reach only {shard_at_median / GB:.1f} GB within {max_age_days} days; "
+            "raise --max-age-days to reach the band."
+        )
+    return {
+        "median_bytes_per_day": median,
+        "peak_bytes_per_day": peak,
+        "primaries": primaries,
+        "conditions": {"min_primary_shard_size": f"{int(target_shard_bytes / GB)}gb", "min_index_age": f"{max_age_days}d"},
+        "days_per_index_at_peak": capacity / peak if peak else float("inf"),
+        "days_per_index_at_median": min(max_age_days, capacity / median) if median else max_age_days,
+        "shard_at_median": shard_at_median,
+        "notes": notes,
+    }
+
+
+def build_policy(
+    alias: str,
+    conditions: Dict[str, str],
+    warm_after: str,
+    delete_after: str,
+    warm_replicas: Optional[int] = None,
+    warm_attribute: Optional[str] = None,
+) -> Dict[str, Any]:
+    """hot (rollover) → warm (force merge, optional replicas/allocation) → delete."""
+    warm_actions: List[Dict[str, Any]] = []
+    if warm_replicas is not None:
+        warm_actions.append({"replica_count": {"number_of_replicas": warm_replicas}})
+    if warm_attribute:
+        key, _, value = warm_attribute.partition("=")
+        warm_actions.append({"allocation": {"require": {key: value}, "wait_for": True}})
+    warm_actions.append({"force_merge": {"max_num_segments": 1}})
+
+    return {
+        "policy": {
+            "description": "",
+            "default_state": "hot",
+            "states": [
+                {
+                    "name": "hot",
+                    "actions": [{"rollover": conditions}],
+                    "transitions": [{"state_name": "warm", "conditions": {"min_rollover_age": warm_after}}],
+                },
+                {
+                    "name": "warm",
+                    "actions": warm_actions,
+                    "transitions": [{"state_name": "delete", "conditions": {"min_rollover_age": delete_after}}],
+                },
+                {"name": "delete", "actions": [{"delete": {}}], "transitions": []},
+            ],
+            "ism_template": [{"index_patterns": [series_pattern(alias)], "priority": 100}],
+        }
+    }
+
+
+def build_template(alias: str, primaries: int, replicas: int, mappings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    template: Dict[str, Any] = {
+        "settings": {
+            "index.number_of_shards": primaries,
+            "index.number_of_replicas": replicas,
+            "plugins.index_state_management.rollover_alias": alias,
+        }
+    }
+    if mappings:
+        template["mappings"] = mappings
+    return {"index_patterns": [series_pattern(alias)], "priority": 200, "template": template, "_meta": {"managed_by": _MANAGED_BY}}
+
+
+def plan_hash(body: Dict[str, Any]) -> str:
+    """Hash of the canonical JSON, ignoring the fields the hash is stored in."""
+    body = json.loads(json.dumps(body))
+    body.get("policy", {}).pop("description", None)
+    body.get("_meta", {}).pop("plan_hash", None)
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def plan_ism(
+    client: OpenSearchClient,
+    pattern: str,
+    alias: Optional[str] = None,
+    policy_id: Optional[str] = None,
+    target_shard_gb: float = 30.0,
+    min_shard_gb: float = 10.0,
+    max_shard_gb: float = 50.0,
+    max_age_days: int = 30,
+    warm_after: str = "7d",
+    delete_after: str = "30d",
+    warm_replicas: Optional[int] = None,
+    warm_attribute: Optional[str] = None,
+    apply: bool = False,
+):
+    """
+    Plans rollover, shard count and an ISM policy from the sizes of existing
+    time-based indices, and with `apply` creates or updates the index template,
+    the policy and the rollover alias. Re-applying an unchanged plan is a no-op.
+    """
+    alias = alias or pattern.rstrip("*").rstrip("-._")
+    policy_id = policy_id or f"{alias}-rollover"
+
+    try:
+        rows = client.get(
+            f"_cat/indices/{pattern}",
+            params={"format": "json", "bytes": "b", "h": "index,creation.date,pri,rep,pri.store.size,docs.count"},
+            tag="ism_plan_cat_indices",
+        )
+        nodes = client.get("_cat/nodes", params={"format": "json", "h": "node.role"}, tag="ism_plan_cat_nodes")
+    except Exception as e:
+        console.print(f"[bold red]Error reading indices for {pattern}:[/bold red] {e}")
+        return
+    if not isinstance(rows, list) or not rows:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        else:
+            console.print(f"[yellow]No indices match {pattern}.[/yellow]")
+        return
+
+    indices = parse_cat_indices(rows)
+    clashing = clashing_indices([index["index"] for index in indices], alias)
+    if clashing:
+        console.print(
+            f"[bold red]{len(clashing)} existing indices match the rollover series {series_pattern(alias)} "
+            f"(e.g. {clashing[0]}); pass --alias with a distinct name.[/bold red]"
+        )
+        return
+    now = time.time()
+    write_rate = record_sample(os.path.join(client.settings.settings.state_dir, _SAMPLES_FILE), indices, now)
+    rates = daily_rates(indices, int(now * 1000), write_rate)
+    if not rates:
+        console.print("[yellow]Not enough history to compute ingest rates (indices younger than an hour).[/yellow]")
+        return
+
+    data_nodes = sum(1 for node in nodes or [] if "d" in node.get("node.role", "")) or 1
+    plan = plan_rollover(rates, target_shard_gb * GB, min_shard_gb * GB, max_shard_gb * GB, max_age_days, data_nodes)
+    replicas = indices[-1]["replicas"]
+    _display_indices(indices, min_shard_gb * GB, max_shard_gb * GB)
+    _display_plan(plan, alias, policy_id, replicas, target_shard_gb, min_shard_gb, max_shard_gb)
+
+    mappings = None
+    try:
+        latest = client.get_cached(f"{indices[-1]['index']}/_mapping", tag="ism_plan_mapping") or {}
+        mappings = next(iter(latest.values()), {}).get("mappings")
+    except Exception:
+        pass
+
+    policy = build_policy(alias, plan["conditions"], warm_after, delete_after, warm_replicas, warm_attribute)
+    policy["policy"]["description"] = f"Managed by {_MANAGED_BY} (plan:{plan_hash(policy)})"
+    template = build_template(alias, plan["primaries"], replicas, mappings)
+    template["_meta"]["plan_hash"] = plan_hash(template)
+
+    console.print(Panel(Syntax(json.dumps(policy, indent=2), "json", theme="monokai"), title=f"ISM Policy {policy_id}", expand=False))
+    if not apply:
+        console.print("[dim]Plan only. Re-run with --apply to create the template, policy and rollover alias.[/dim]")
+        return
+
+    try:
+        _apply_template(client, f"{alias}-template", template)
+        _apply_policy(client, policy_id, policy)
+        _bootstrap_alias(client, alias)
+    except Exception as e:
+        console.print(f"[bold red]Error applying plan:[/bold red] {e}")
+
+
+def _apply_template(client: OpenSearchClient, name: str, template: Dict[str, Any]):
+    existing = _get_or_none(client, f"_index_template/{name}", "ism_plan_get_template") or {}
+    current = next(iter(existing.get("index_templates", [])), {}).get("index_template", {})
+    if current.get("_meta", {}).get("plan_hash") == template["_meta"]["plan_hash"]:
+        console.print(f"[dim]Index template {name} is up to date.[/dim]")
+        return
+    client.put(f"_index_template/{name}", body=template, tag="ism_plan_put_template")
+    console.print(f"[green]{'Updated' if current else 'Created'} index template {name}[/green]")
+
+
+def _apply_policy(client: OpenSearchClient, policy_id: str, policy: Dict[str, Any]):
+    existing = _get_or_none(client, f"_plugins/_ism/policies/{policy_id}", "ism_plan_get_policy")
+    if not existing:
+        client.put(f"_plugins/_ism/policies/{policy_id}", body=policy, tag="ism_plan_put_policy")
+        console.print(f"[green]Created ISM policy {policy_id}[/green]")
+        return
+    if existing.get("policy", {}).get("description") == policy["policy"]["description"]:
+        console.print(f"[dim]ISM policy {policy_id} is up to date.[/dim]")
+        return
+    # ISM requires optimistic concurrency control for updates.
+    client.put(
+        f"_plugins/_ism/policies/{policy_id}",
+        body=policy,
+        params={"if_seq_no": existing.get("_seq_no"), "if_primary_term": existing.get("_primary_term")},
+        tag="ism_plan_update_policy",
+    )
+    console.print(f"[green]Updated ISM policy {policy_id}; managed indices pick it up on their next transition.[/green]")
+
+
+def _bootstrap_alias(client: OpenSearchClient, alias: str):
+    if _get_or_none(client, f"_alias/{alias}", "ism_plan_get_alias"):
+        console.print(f"[dim]Rollover alias {alias} exists.[/dim]")
+        return
+    if _get_or_none(client, alias, "ism_plan_get_index"):
+        console.print(f"[bold red]{alias} is an index, not an alias; pass --alias with a free name.[/bold red]")
+        return
+    first_index = f"{alias}-000001"
+    client.put(first_index, body={"aliases": {alias: {"is_write_index": True}}}, tag="ism_plan_bootstrap")
+    console.print(f"[green]Created {first_index} as write index of {alias}; point writers at the alias.[/green]")
+
+
+def _get_or_none(client: OpenSearchClient, path: str, tag: str) -> Optional[Dict[str, Any]]:
+    try:
+        return client.get(path, tag=tag)
+    except Exception as e:
+        if getattr(getattr(e, "response", None), "status_code", None) == 404:
+            return None
+        raise
+
+
+def _display_indices(indices: List[Dict[str, Any]], min_shard: float, max_shard: float):
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Index", style="cyan")
+    table.add_column("Created")
+    table.add_column("Pri", justify="right")
+    table.add_column("Primary Size", justify="right")
+    table.add_column("Shard Size", justify="right")
+    table.add_column("Band")
+    tiny = huge = 0
+    for index in indices[-30:]:
+        shard = index["pri_bytes"] / index["primaries"]
+        if shard < min_shard:
+            band, tiny = "[yellow]small[/yellow]", tiny + 1
+        elif shard > max_shard:
+            band, huge = "[red]large[/red]", huge + 1
+        else:
+            band = "[green]ok[/green]"
+        table.add_row(
+            index["index"],
+            time.strftime("%Y-%m-%d", time.gmtime(index["created"] / 1000)),
+            str(index["primaries"]),
+            f"{index['pri_bytes'] / GB:.2f} GB",
+            f"{shard / GB:.2f} GB",
+            band,
+        )
+    title = f"Indices ({len(indices)}, last 30 shown; {tiny} small, {huge} large)"
+    console.print(Panel(table, title=title, expand=False))
+
+
+def _display_plan(plan: Dict[str, Any], alias: str, policy_id: str, replicas: int, target: float, low: float, high: float):
+    table = Table(box=None)
+    table.add_column("Stat", style="cyan")
+    table.add_column("Value", style="bold green")
+    table.add_row("Ingest (median / p95)", f"{plan['median_bytes_per_day'] / GB:.2f} / {plan['peak_bytes_per_day'] / GB:.2f} GB/day")
+    table.add_row("Shard band (target)", f"{low:g}-{high:g} GB ({target:g} GB)")
+    table.add_row("Primary shards", f"{plan['primaries']} (replicas {replicas})")
+    table.add_row("Rollover when", " or ".join(f"{k}={v}" for k, v in plan["conditions"].items()))
+    table.add_row("Days per index (peak / median)", f"{plan['days_per_index_at_peak']:.1f} / {plan['days_per_index_at_median']:.1f}")
+    table.add_row("Shard size at median ingest", f"{plan['shard_at_median'] / GB:.1f} GB")
+    table.add_row("Rollover alias / policy", f"{alias} / {policy_id}")
+    console.print(Panel(table, title="Rollover Plan", expand=False))
+    for note in plan["notes"]:
+        console.print(f"[yellow]{note}[/yellow]")
@@ -0,0 +1,351 @@
+from typing import List, Dict, Any, Optional
+import itertools
+import json
+import math
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..waits import refresh
+
+console = Console()
+
+_BENCH_PREFIX = "knn-bench"
+
+
+def pareto_front(
+    rows: List[Dict[str, Any]],
+    maximize: List[str],
+    minimize: List[str],
+) -> List[bool]:
+    """
+    Flags rows that are not dominated by any other row.
+
+    A row is dominated when another row is at least as good on every metric
+    and strictly better on one. Rows with a missing (None) metric never
+    dominate on that metric.
+    """
+
+    def _better_or_equal(a: Dict[str, Any], b: Dict[str, Any]) -> tuple:
+        ge, gt = True, False
+        for key in maximize + minimize:
+            va, vb = a.get(key), b.get(key)
+            if va is None or vb is None:
+                continue
+            if key in minimize:
+                va, vb = -va, -vb
+            if va < vb:
+                ge = False
+            elif va > vb:
+                gt = True
+        return ge, gt
+
+    front = []
+    for row in rows:
+        dominated = False
+        for other in rows:
+            if other is row:
+                continue
+            ge, gt = _better_or_equal(other, row)
+            if ge and gt:
+                dominated = True
+                break
+        front.append(not dominated)
+    return front
+
+
+def build_candidates(
+    engines: List[str], ms: List[int], ef_constructions: List[int], space_type: str
+) -> List[Dict[str, Any]]:
+    """Cartesian product of HNSW parameters to benchmark."""
+    return [
+        {"engine": engine, "m": m, "ef_construction": efc, "space_type": space_type}
+        for engine, m, efc in itertools.product(engines, ms, ef_constructions)
+    ]
+
+
+def run_knn_benchmark(
+    client: OpenSearchClient,
+    candidates: List[Dict[str, Any]],
+    source_index: Optional[str] = None,
+    field: str = "message_embedding",
+    dimension: int = 384,
+    sample_size: int = 10_000,
+    query_count: int = 200,
+    k: int = 10,
+    ef_search: Optional[int] = None,
+    force_merge: bool = True,
+    keep: bool = False,
+    seed: int = 42,
+):
+    """
+    Builds one index per HNSW candidate from the same vectors and measures
+    indexing time, size, native graph memory, query latency percentiles and
+    recall@k against exact (brute-force) neighbours computed with NumPy.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        console.print(
+            "[bold red]NumPy is required for `neural bench`.[/bold red] "
+            "Install it with: pip install 'opensearch-management[bench]'"
+        )
+        return
+
+    space_type = candidates[0]["space_type"] if candidates else "l2"
+    if source_index:
+        try:
+            vectors = _sample_vectors(client, source_index, field, sample_size + query_count, seed)
+        except Exception as e:
+            console.print(f"[bold red]Error sampling vectors:[/bold red] {e}")
+            return
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+            return
+        if len(vectors) <= query_count:
+            console.print(f"[yellow]Only {len(vectors)} vectors found in {source_index}.{field}[/yellow]")
+            return
+        data = np.asarray(vectors, dtype=np.float32)
+    else:
+        data = _synthetic_vectors(np, sample_size + query_count, dimension, seed)
+
+    queries, corpus = data[:query_count], data[query_count:]
+    dimension = corpus.shape[1]
+
+    truth_start = time.perf_counter()
+    truth = _exact_neighbours(np, corpus, queries, k, space_type)
+    console.print(
+        f"[dim]Exact top-{k} for {len(queries)} queries over {len(corpus):,} vectors "
+        f"computed in {time.perf_counter() - truth_start:.2f}s[/dim]"
+    )
+
+    if client.dry_run:
+        first = candidates[0]
+        index = f"{_BENCH_PREFIX}-{first['engine']}-m{first['m']}-efc{first['ef_construction']}"
+        client.put(index, body=_index_body(first, dimension, ef_search), tag="knn_bench_create")
+        console.print(f"[dim]Dry run: {len(candidates)} candidate indices would be built like the one above.[/dim]")
+        return
+
+    rows = []
+    for candidate in candidates:
+        index = f"{_BENCH_PREFIX}-{candidate['engine']}-m{candidate['m']}-efc{candidate['ef_construction']}"
+        console.print(f"[cyan]Benchmarking {index}...[/cyan]")
+        try:
+            row = _benchmark_candidate(
+                client, index, candidate, corpus, queries, truth, dimension, k, ef_search, force_merge
+            )
+        except Exception as e:
+            console.print(f"[bold red]{index} failed:[/bold red] {e}")
+            continue
+        finally:
+            if not keep:
+                _delete_index(client, index)
+        rows.append(row)
+
+    if rows:
+        _display_results(rows, k, len(corpus))
+
+
+def _delete_index(client: OpenSearchClient, index: str):
+    """Deletes a benchmark index; a missing index is fine, other failures are reported."""
+    try:
+        client.delete(index, tag="knn_bench_cleanup")
+    except Exception as e:
+        if getattr(getattr(e, "response", None), "status_code", None) != 404:
+            console.print(f"[yellow]Could not delete {index}:[/yellow] {e}")
+
+
+def _benchmark_candidate(
+    client: OpenSearchClient,
+    index: str,
+    candidate: Dict[str, Any],
+    corpus: Any,
+    queries: Any,
+    truth: List[set],
+    dimension: int,
+    k: int,
+    ef_search: Optional[int],
+    force_merge: bool,
+) -> Dict[str, Any]:
+    _delete_index(client, index)
+    client.put(index, body=_index_body(candidate, dimension, ef_search), tag="knn_bench_create")
+
+    start = time.perf_counter()
+    for offset in range(0, len(corpus), 1000):
+        lines = []
+        for i, vector in enumerate(corpus[offset:offset + 1000], start=offset):
+            lines.append(json.dumps({"index": {"_id": str(i)}}))
+            lines.append(json.dumps({"vector": vector.tolist()}))
+        response = client.bulk(
+            "\n".join(lines) + "\n", index=index, params={"filter_path": "errors,items.*.error"}, tag="knn_bench_bulk"
+        ) or {}
+        if response.get("errors"):
+            # Missing vectors would skew recall and latency; abort this candidate.
+            errors = [item for entry in response.get("items", []) for item in entry.values() if item.get("error")]
+            first = errors[0]["error"] if errors else {}
+            raise RuntimeError(
+                f"{len(errors)} of {len(lines) // 2} documents rejected while loading "
+                f"(first: {first.get('type')}: {first.get('reason')})"
+            )
+    refresh(client, index)
+    if force_merge:
+        # Graphs are built per segment; merging to one matches a read-only production index.
+        client.post(f"{index}/_forcemerge", params={"max_num_segments": 1}, tag="knn_bench_forcemerge")
+    index_seconds = time.perf_counter() - start
+
+    stats = client.get(f"{index}/_stats/store", tag="knn_bench_stats") or {}
+    size_bytes = stats.get("_all", {}).get("primaries", {}).get("store", {}).get("size_in_bytes")
+
+    graph_kb = None
+    if candidate["engine"] != "lucene":
+        client.get(f"_plugins/_knn/warmup/{index}", tag="knn_bench_warmup")
+        knn_stats = client.get("_plugins/_knn/stats", tag="knn_bench_knn_stats") or {}
+        graph_kb = sum(
+            node.get("indices_in_cache", {}).get(index, {}).get("graph_memory_usage", 0)
+            for node in knn_stats.get("nodes", {}).values()
+        )
+
+    latencies, took, recalls = [], [], []
+    for i, query in enumerate(queries):
+        body = {"size": k, "_source": False, "query": {"knn": {"vector": {"vector": query.tolist(), "k": k}}}}
+        q_start = time.perf_counter()
+        response = client.post(
+            f"{index}/_search", body=body, params={"filter_path": "took,hits.hits._id"}, tag="knn_bench_query"
+        ) or {}
+        latencies.append((time.perf_counter() - q_start) * 1000)
+        took.append(response.get("took", 0))
+        ids = {int(hit["_id"]) for hit in response.get("hits", {}).get("hits", [])}
+        recalls.append(len(ids & truth[i]) / k)
+
+    return {
+        "engine": candidate["engine"],
+        "m": candidate["m"],
+        "ef_construction": candidate["ef_construction"],
+        "index_seconds": index_seconds,
+        "docs_per_sec": len(corpus) / index_seconds if index_seconds else None,
+        "size_mb": size_bytes / 1024 / 1024 if size_bytes is not None else None,
+        "graph_mb": graph_kb / 1024 if graph_kb is not None else None,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "took_p95": _percentile(took, 95),
+        "recall": sum(recalls) / len(recalls) if recalls else 0.0,
+    }
+
+
+def _index_body(candidate: Dict[str, Any], dimension: int, ef_search: Optional[int]) -> Dict[str, Any]:
+    index_settings: Dict[str, Any] = {"knn": True, "number_of_shards": 1, "number_of_replicas": 0, "refresh_interval": "-1"}
+    if ef_search:
+        index_settings["knn.algo_param.ef_search"] = ef_search
+    return {
+        "settings": {"index": index_settings},
+        "mappings": {
+            "properties": {
+                "vector": {
+                    "type": "knn_vector",
+                    "dimension": dimension,
+                    "method": {
+                        "name": "hnsw",
+                        "engine": candidate["engine"],
+                        "space_type": candidate["space_type"],
+                        "parameters": {"m": candidate["m"], "ef_construction": candidate["ef_construction"]},
+                    },
+                }
+            }
+        },
+    }
+
+
+def _sample_vectors(client: OpenSearchClient, index: str, field: str, count: int, seed: int) -> List[List[float]]:
+    """Random sample of stored vectors, paged with search_after over a seeded random score."""
+    vectors: List[List[float]] = []
+    search_after = None
+    while len(vectors) < count:
+        body: Dict[str, Any] = {
+            "size": min(1000, count - len(vectors)),
+            "_source": [field],
+            "query": {
+                "function_score": {
+                    "query": {"exists": {"field": field}},
+                    "random_score": {"seed": seed, "field": "_seq_no"},
+                }
+            },
+            "sort": [{"_score": "desc"}, {"_id": "asc"}],
+        }
+        if search_after:
+            body["search_after"] = search_after
+        response = client.post(f"{index}/_search", body=body, tag="knn_bench_sample")
+        hits = (response or {}).get("hits", {}).get("hits", [])
+        if not hits:
+            break
+        vectors.extend(hit["_source"][field] for hit in hits if field in hit.get("_source", {}))
+        search_after = hits[-1]["sort"]
+    return vectors
+
+
+def _synthetic_vectors(np: Any, count: int, dimension: int, seed: int) -> Any:
+    """Clustered Gaussian vectors; uniform noise would make every ANN config look equally bad."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(8, count // 500), dimension)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=count)
+    return (centers[labels] + 0.3 * rng.normal(size=(count, dimension))).astype(np.float32)
+
+
+def _exact_neighbours(np: Any, corpus: Any, queries: Any, k: int, space_type: str) -> List[set]:
+    """Brute-force top-k ids, computed in query blocks to bound memory."""
+    if space_type == "cosinesimil":
+        corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+    truth = []
+    corpus_sq = (corpus ** 2).sum(axis=1)
+    for start in range(0, len(queries), 64):
+        block = queries[start:start + 64]
+        scores = block @ corpus.T
+        if space_type == "l2":
+            # Smaller distance is better: rank by -(|x|^2 - 2 q.x), |q|^2 is constant per row.
+            scores = 2 * scores - corpus_sq
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        truth.extend(set(row.tolist()) for row in top)
+    return truth
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Nearest-rank percentile
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _display_results(rows: List[Dict[str, Any]], k: int, corpus_size: int):
+    front = pareto_front(rows, maximize=["recall"], minimize=["p95", "size_mb", "graph_mb", "index_seconds"])
+
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    for column in ["Engine", "m", "ef_c", "Index s", "Docs/s", "Size MB", "Graph MB", "p50 ms", "p95 ms", "p99 ms", f"Recall@{k}", "Pareto"]:
+        table.add_column(column, justify="right" if column not in ("Engine", "Pareto") else "left")
+
+    def _fmt(value: Optional[float], spec: str = ".1f") -> str:
+        return "-" if value is None else format(value, spec)
+
+    ordered = sorted(zip(rows, front), key=lambda item: (-item[0]["recall"], item[0]["p95"] or 0))
+    for row, optimal in ordered:
+        table.add_row(
+            row["engine"],
+            str(row["m"]),
+            str(row["ef_construction"]),
+            _fmt(row["index_seconds"]),
+            _fmt(row["docs_per_sec"], ",.0f"),
+            _fmt(row["size_mb"]),
+            _fmt(row["graph_mb"]),
+            _fmt(row["p50"]),
+            _fmt(row["p95"]),
+            _fmt(row["p99"]),
+            _fmt(row["recall"], ".3f"),
+            "[green]★[/green]" if optimal else "",
+        )
+
+    console.print(Panel(table, title=f"k-NN HNSW Sweep ({corpus_size:,} vectors)", expand=False))
+    console.print("[dim]★ = Pareto-optimal on recall vs p95 latency, index size, graph memory and build time.[/dim]")
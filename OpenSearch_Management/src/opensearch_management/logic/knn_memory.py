@@ -0,0 +1,252 @@
+from typing import List, Dict, Any, Optional
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..metrics import format_bytes
+
+console = Console()
+
+# Bytes stored per dimension for each vector encoding / quantization mode.
+# 8x-32x are the disk-based compression levels (4, 2 and 1 bit per dimension).
+COMPRESSION_MODES = {
+    "fp32 (1x)": 4.0,
+    "fp16 (2x)": 2.0,
+    "byte (4x)": 1.0,
+    "8x (4-bit)": 0.5,
+    "16x (2-bit)": 0.25,
+    "32x (binary)": 0.125,
+}
+
+_DATA_TYPE_MODE = {"float": "fp32 (1x)", "byte": "byte (4x)", "binary": "32x (binary)"}
+_COMPRESSION_LEVEL_MODE = {
+    "1x": "fp32 (1x)", "2x": "fp16 (2x)", "4x": "byte (4x)",
+    "8x": "8x (4-bit)", "16x": "16x (2-bit)", "32x": "32x (binary)",
+}
+
+# HNSW overhead factor and per-neighbour link size from the k-NN sizing guide:
+# memory ≈ 1.1 * (bytes_per_vector + 8 * m) * num_vectors
+_HNSW_OVERHEAD = 1.1
+_LINK_BYTES = 8
+
+
+def estimate_hnsw_bytes(dimension: int, num_vectors: int, m: int = 16, bytes_per_dim: float = 4.0) -> float:
+    """Expected graph + vector memory of one copy of an HNSW field."""
+    return _HNSW_OVERHEAD * (bytes_per_dim * dimension + _LINK_BYTES * m) * num_vectors
+
+
+def knn_field_specs(mappings: Dict[str, Any], prefix: str = "") -> List[Dict[str, Any]]:
+    """Extracts dimension, engine, m and encoding for every `knn_vector` field in a mapping."""
+    specs = []
+    for name, details in mappings.get("properties", {}).items():
+        full_name = f"{prefix}.{name}" if prefix else name
+        if "properties" in details:
+            specs.extend(knn_field_specs(details, full_name))
+            continue
+        if details.get("type") != "knn_vector":
+            continue
+
+        method = details.get("method", {})
+        data_type = details.get("data_type", "float")
+        mode = _DATA_TYPE_MODE.get(data_type, "fp32 (1x)")
+        if details.get("compression_level") in _COMPRESSION_LEVEL_MODE:
+            mode = _COMPRESSION_LEVEL_MODE[details["compression_level"]]
+        encoder = method.get("parameters", {}).get("encoder", {})
+        if encoder.get("name") == "sq" and encoder.get("parameters", {}).get("type") == "fp16":
+            mode = "fp16 (2x)"
+
+        specs.append(
+            {
+                "field": full_name,
+                "dimension": int(details.get("dimension", 0)),
+                "engine": method.get("engine", "nmslib"),
+                "m": int(method.get("parameters", {}).get("m", 16)),
+                "mode": mode,
+            }
+        )
+    return specs
+
+
+def estimate_index_knn_memory(
+    specs: List[Dict[str, Any]], num_vectors: int, replicas: int
+) -> List[Dict[str, Any]]:
+    """
+    Estimates per-field memory for the current encoding and every alternative mode.
+
+    lucene keeps graphs in files served from the OS page cache; nmslib/faiss
+    load them into native memory outside the JVM heap, limited by the k-NN
+    circuit breaker. No heap bytes are estimated: neither engine holds
+    vectors or graphs on the heap when searching. The only heap use is
+    lucene building the graph of the in-memory segment while indexing, which
+    is bounded by `indices.memory.index_buffer_size`, not by the vector count.
+    """
+    copies = 1 + max(replicas, 0)
+    rows = []
+    for spec in specs:
+        per_copy = estimate_hnsw_bytes(spec["dimension"], num_vectors, spec["m"], COMPRESSION_MODES[spec["mode"]])
+        alternatives = {
+            mode: estimate_hnsw_bytes(spec["dimension"], num_vectors, spec["m"], bytes_per_dim) * copies
+            for mode, bytes_per_dim in COMPRESSION_MODES.items()
+        }
+        rows.append(
+            dict(
+                spec,
+                vectors=num_vectors,
+                copies=copies,
+                location="page cache" if spec["engine"] == "lucene" else "native",
+                heap="indexing buffer" if spec["engine"] == "lucene" else "none",
+                per_copy_bytes=per_copy,
+                total_bytes=per_copy * copies,
+                alternatives=alternatives,
+            )
+        )
+    return rows
+
+
+def loaded_graph_bytes(knn_stats: Dict[str, Any], index_name: str) -> Optional[float]:
+    """Graph memory currently loaded for `index_name` across all nodes (from `_plugins/_knn/stats`)."""
+    nodes = (knn_stats or {}).get("nodes", {})
+    if not nodes:
+        return None
+    total_kb = sum(
+        node.get("indices_in_cache", {}).get(index_name, {}).get("graph_memory_usage", 0)
+        for node in nodes.values()
+    )
+    return total_kb * 1024.0
+
+
+def display_knn_memory(
+    index_name: str,
+    mappings: Dict[str, Any],
+    settings: Dict[str, Any],
+    stats: Dict[str, Any],
+    knn_stats: Optional[Dict[str, Any]] = None,
+    vector_counts: Optional[Dict[str, int]] = None,
+):
+    """Renders the memory estimate, the loaded graph memory and the quantization savings for one index."""
+    specs = knn_field_specs(mappings)
+    if not specs:
+        return
+
+    docs = stats.get("primaries", {}).get("docs", {}).get("count", 0) or 0
+    replicas = int(settings.get("number_of_replicas", 0) or 0)
+
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Field", style="cyan")
+    table.add_column("Dim", justify="right")
+    table.add_column("Engine")
+    table.add_column("m", justify="right")
+    table.add_column("Encoding")
+    table.add_column("Vectors", justify="right")
+    table.add_column("Copies", justify="right")
+    table.add_column("Location")
+    table.add_column("Expected", justify="right", style="green")
+    table.add_column("Heap")
+
+    savings = Table(show_header=True, header_style="bold yellow", box=None)
+    savings.add_column("Field", style="cyan")
+    savings.add_column("Mode")
+    savings.add_column("Total", justify="right")
+    savings.add_column("Saving", justify="right", style="green")
+
+    expected_native = 0.0
+    for spec in specs:
+        count = (vector_counts or {}).get(spec["field"], docs)
+        row = estimate_index_knn_memory([spec], count, replicas)[0]
+        if row["location"] == "native":
+            expected_native += row["total_bytes"]
+        table.add_row(
+            row["field"], str(row["dimension"]), row["engine"], str(row["m"]), row["mode"],
+            f"{count:,}", str(row["copies"]), row["location"], format_bytes(row["total_bytes"]), row["heap"],
+        )
+        for mode, total in row["alternatives"].items():
+            saving = 1 - total / row["total_bytes"] if row["total_bytes"] else 0
+            marker = " (current)" if mode == row["mode"] else ""
+            savings.add_row(row["field"], mode + marker, format_bytes(total), f"{saving:.0%}" if saving > 0 else "-")
+
+    console.print(Panel(table, title=f"k-NN Memory Estimate: {index_name}", expand=False))
+    console.print(
+        "[dim]Heap: vectors and graphs stay off the JVM heap when searching; lucene builds graphs on the heap "
+        "while indexing, within indices.memory.index_buffer_size.[/dim]"
+    )
+
+    loaded = loaded_graph_bytes(knn_stats, index_name) if knn_stats else None
+    if loaded is not None:
+        note = "graphs load on first search or via _plugins/_knn/warmup"
+        if expected_native:
+            note = f"{loaded / expected_native:.0%} of expected native memory"
+        console.print(f"• Loaded graph memory (_plugins/_knn/stats): [bold]{format_bytes(loaded)}[/bold] ({note})")
+
+    console.print(Panel(savings, title="Projected Quantization Savings", expand=False))
+
+
+def analyze_knn_memory(client: OpenSearchClient, index_patterns: List[str], exact_counts: bool = False):
+    """
+    Estimates k-NN memory per `knn_vector` field and compares it with `_plugins/_knn/stats`.
+    """
+    path = ",".join(index_patterns)
+    try:
+        response = client.get(path, tag="knn_memory_index")
+        stats_response = client.get(f"{path}/_stats/docs", tag="knn_memory_stats")
+        knn_stats = client.get("_plugins/_knn/stats", tag="knn_memory_knn_stats")
+    except Exception as e:
+        console.print(f"[bold red]Error fetching k-NN memory data:[/bold red] {e}")
+        return
+
+    if not response:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        else:
+            console.print(f"[yellow]No indices found matching: {index_patterns}[/yellow]")
+        return
+
+    stats_data = (stats_response or {}).get("indices", {})
+    for index_name, details in response.items():
+        mappings = details.get("mappings", {})
+        specs = knn_field_specs(mappings)
+        if not specs:
+            console.print(f"[dim]{index_name}: no knn_vector fields[/dim]")
+            continue
+
+        vector_counts = None
+        if exact_counts:
+            vector_counts = {}
+            for spec in specs:
+                count = client.post(
+                    f"{index_name}/_count",
+                    body={"query": {"exists": {"field": spec["field"]}}},
+                    tag="knn_memory_count",
+                ) or {}
+                vector_counts[spec["field"]] = count.get("count", 0)
+
+        display_knn_memory(
+            index_name,
+            mappings,
+            details.get("settings", {}).get("index", {}),
+            stats_data.get(index_name, {}),
+            knn_stats,
+            vector_counts,
+        )
+
+    _display_node_summary(knn_stats)
+
+
+def _display_node_summary(knn_stats: Optional[Dict[str, Any]]):
+    nodes = (knn_stats or {}).get("nodes", {})
+    if not nodes:
+        return
+
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Node", style="cyan")
+    table.add_column("Graph Memory", justify="right")
+    table.add_column("Of Limit", justify="right")
+    table.add_column("Breaker Tripped")
+    for node_id, node in nodes.items():
+        table.add_row(
+            node_id,
+            format_bytes(node.get("graph_memory_usage", 0) * 1024.0),
+            f"{node.get('graph_memory_usage_percentage', 0):.1f}%",
+            "[red]yes[/red]" if node.get("circuit_breaker_triggered") else "no",
+        )
+    console.print(Panel(table, title="k-NN Native Memory per Node", expand=False))
+
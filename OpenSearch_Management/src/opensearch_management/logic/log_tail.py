@@ -0,0 +1,234 @@
+from typing import List, Dict, Any, Optional, Tuple
+import datetime
+import json
+import time
+from rich.console import Console
+from rich.text import Text
+from ..client import OpenSearchClient
+
+console = Console()
+
+_FILTER_PATH = "hits.hits._index,hits.hits._id,hits.hits._source,hits.hits.sort"
+# `_shard_doc` is only defined inside a point in time.
+_SHARD_DOC = "_shard_doc"
+_PIT_KEEP_ALIVE = "1m"
+
+
+def parse_query(query: Optional[str]) -> Dict[str, Any]:
+    """Query DSL when `query` is a JSON object, otherwise a `query_string` query."""
+    if not query:
+        return {"match_all": {}}
+    if query.lstrip().startswith("{"):
+        return json.loads(query)
+    return {"query_string": {"query": query, "default_field": "_raw"}}
+
+
+def build_tail_body(
+    query: Dict[str, Any],
+    time_field: str,
+    since_ms: Optional[int],
+    sort: List[Dict[str, Any]],
+    size: int,
+    fields: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Search for documents at or after `since_ms`. The range filter on the time
+    field keeps each poll proportional to the new documents, not the index.
+    """
+    filters: List[Dict[str, Any]] = [query]
+    if since_ms is not None:
+        filters.append({"range": {time_field: {"gte": since_ms, "format": "epoch_millis"}}})
+    body: Dict[str, Any] = {
+        "size": size,
+        "track_total_hits": False,
+        "query": {"bool": {"filter": filters}},
+        "sort": sort,
+    }
+    if fields:
+        body["_source"] = [time_field] + fields
+    return body
+
+
+class TailWindow:
+    """
+    Cursor state for following an index.
+
+    Documents can become searchable out of timestamp order (refresh interval,
+    ingest lag, several writers), so each poll re-reads the last `lag_ms`
+    before the newest timestamp seen. Ids seen inside that window are
+    remembered to drop the overlap; older ids are pruned, so memory is bounded
+    by the documents in the window.
+    """
+
+    def __init__(self, lag_ms: int):
+        self.lag_ms = lag_ms
+        self.high_water: Optional[int] = None
+        self._seen: Dict[Tuple[str, str], int] = {}
+
+    def start_ms(self) -> Optional[int]:
+        return None if self.high_water is None else self.high_water - self.lag_ms
+
+    def accept(self, hit: Dict[str, Any]) -> bool:
+        """True the first time a hit is seen."""
+        key = (hit.get("_index", ""), hit["_id"])
+        if key in self._seen:
+            return False
+        timestamp = int(hit["sort"][0])
+        self._seen[key] = timestamp
+        self.high_water = timestamp if self.high_water is None else max(self.high_water, timestamp)
+        return True
+
+    def prune(self) -> None:
+        start = self.start_ms()
+        if start is not None:
+            self._seen = {key: ts for key, ts in self._seen.items() if ts >= start}
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+def poll_new_hits(
+    client: OpenSearchClient,
+    index: str,
+    query: Dict[str, Any],
+    window: TailWindow,
+    time_field: str = "@timestamp",
+    tiebreaker: str = _SHARD_DOC,
+    batch_size: int = 500,
+    fields: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    One poll: pages with `search_after` through everything since the window
+    start, returns unseen hits in order. With the `_shard_doc` tiebreaker the
+    poll runs in its own point in time, closed afterwards: each poll sees the
+    latest refresh, and the tiebreaker costs no heap (unlike sorting on `_id`,
+    which loads `_id` fielddata).
+    """
+    sort = [{time_field: "asc"}, {tiebreaker: "asc"}]
+    body = build_tail_body(query, time_field, window.start_ms(), sort, batch_size, fields)
+    path, pit_id = f"{index}/_search", None
+    if tiebreaker == _SHARD_DOC:
+        pit_id = (client.post(
+            f"{index}/_search/point_in_time", params={"keep_alive": _PIT_KEEP_ALIVE}, tag="tail_pit_open"
+        ) or {}).get("pit_id")
+        path = "_search"
+
+    new_hits: List[Dict[str, Any]] = []
+    try:
+        while True:
+            if pit_id:
+                body["pit"] = {"id": pit_id, "keep_alive": _PIT_KEEP_ALIVE}
+            response = client.post(path, body=body, params={"filter_path": f"pit_id,{_FILTER_PATH}"}, tag="tail_poll")
+            pit_id = (response or {}).get("pit_id", pit_id)
+            hits = (response or {}).get("hits", {}).get("hits", [])
+            new_hits.extend(hit for hit in hits if window.accept(hit))
+            if len(hits) < batch_size:
+                break
+            body["search_after"] = hits[-1]["sort"]
+    finally:
+        if pit_id:
+            client.delete("_search/point_in_time", body={"pit_id": [pit_id]}, tag="tail_pit_close")
+    window.prune()
+    return new_hits
+
+
+def tail_index(
+    client: OpenSearchClient,
+    index: str,
+    query: Optional[str] = None,
+    time_field: str = "@timestamp",
+    tiebreaker: str = _SHARD_DOC,
+    lines: int = 10,
+    fields: Optional[List[str]] = None,
+    as_json: bool = False,
+    lag: float = 5.0,
+    min_interval: float = 0.5,
+    max_interval: float = 10.0,
+    batch_size: int = 500,
+    max_polls: Optional[int] = None,
+):
+    """
+    Follows new documents like `tail -f`.
+
+    Prints the last `lines` matching documents, then polls with a sorted
+    `[time_field, tiebreaker]` `search_after` cursor (a per-poll point in
+    time for `_shard_doc`; other tiebreakers must be doc-values fields). The interval drops back
+    to `min_interval` whenever new documents arrive and grows by 1.5x up to
+    `max_interval` while the index is idle. Stops on Ctrl+C.
+    """
+    fields = fields or ["host.name", "_raw"]
+    try:
+        parsed_query = parse_query(query)
+    except json.JSONDecodeError as e:
+        console.print(f"[bold red]Invalid query DSL:[/bold red] {e}")
+        return
+
+    window = TailWindow(int(lag * 1000))
+    try:
+        response = client.post(
+            f"{index}/_search",
+            # A single page, so no tiebreaker is needed.
+            body=build_tail_body(parsed_query, time_field, None, [{time_field: "desc"}], max(lines, 1), fields),
+            params={"filter_path": _FILTER_PATH},
+            tag="tail_initial",
+        )
+    except Exception as e:
+        console.print(f"[bold red]Error searching {index}:[/bold red] {e}")
+        return
+    if not response and client.dry_run:
+        console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+
+    recent = list(reversed((response or {}).get("hits", {}).get("hits", [])))
+    for hit in recent:
+        window.accept(hit)
+    if lines:
+        _print_hits(recent, time_field, fields, as_json)
+    if window.high_water is None:
+        # Nothing matches yet: follow from now instead of scanning the index.
+        window.high_water = int(time.time() * 1000)
+
+    interval, polls, errors = min_interval, 0, 0
+    try:
+        while max_polls is None or polls < max_polls:
+            time.sleep(interval)
+            polls += 1
+            try:
+                new_hits = poll_new_hits(client, index, parsed_query, window, time_field, tiebreaker, batch_size, fields)
+            except Exception as e:
+                errors += 1
+                console.print(f"[yellow]Poll failed ({errors}): {e}[/yellow]")
+                interval = min(interval * 2, max_interval)
+                continue
+            errors = 0
+            _print_hits(new_hits, time_field, fields, as_json)
+            interval = min_interval if new_hits else min(interval * 1.5, max_interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def _print_hits(hits: List[Dict[str, Any]], time_field: str, fields: List[str], as_json: bool):
+    for hit in hits:
+        source = hit.get("_source", {})
+        if as_json:
+            print(json.dumps(source), flush=True)
+            continue
+        timestamp = source.get(time_field) or datetime.datetime.fromtimestamp(
+            int(hit["sort"][0]) / 1000, tz=datetime.timezone.utc
+        ).isoformat()
+        line = Text(str(timestamp), style="dim")
+        for field in fields:
+            value = _lookup(source, field)
+            if value is not None:
+                line.append(" ")
+                line.append(str(value), style="cyan" if field != fields[-1] else "")
+        console.print(line, highlight=False)
+
+
+def _lookup(source: Dict[str, Any], dotted: str) -> Any:
+    if dotted in source:
+        return source[dotted]
+    value: Any = source
+    for part in dotted.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
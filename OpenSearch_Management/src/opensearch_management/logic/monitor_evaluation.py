@@ -0,0 +1,314 @@
+from typing import List, Dict, Any, Optional, Callable
+import ast
+import json
+import os
+import re
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from .monitor_manager import MONITORS_PATH, load_monitor_definitions
+
+console = Console()
+
+
+class ExpressionError(ValueError):
+    """Raised when a trigger script is outside the supported Painless subset."""
+
+
+# Painless operators that have a different spelling in Python.
+_TOKEN_RE = re.compile(r"""('(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|&&|\|\||!=|!|\bnull\b|\btrue\b|\bfalse\b)""")
+_TOKEN_MAP = {"&&": " and ", "||": " or ", "!": " not ", "null": "None", "true": "True", "false": "False"}
+
+_PERIOD_RE = re.compile(r"\{\{\s*(?:ctx\.)?period_(start|end)\s*\}\}")
+
+_BIN_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: int(a / b) if isinstance(a, int) and isinstance(b, int) else a / b,
+    ast.Mod: lambda a, b: a % b,
+}
+_CMP_OPS: Dict[type, Callable[[Any, Any], bool]] = {
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+}
+
+
+def compile_condition(source: str) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Compiles a `bucket_selector`-style Painless condition into a safe evaluator.
+
+    Supported: `params.x` / `params['x']` lookups, number/string/boolean/null
+    literals, arithmetic, comparisons, `&&`, `||`, `!` and parentheses.
+    Anything else (method calls, loops, assignments) raises `ExpressionError`.
+    """
+    expr = source.strip().rstrip(";").strip()
+    if expr.startswith("return "):
+        expr = expr[len("return "):]
+
+    translated = _TOKEN_RE.sub(lambda m: _TOKEN_MAP.get(m.group(0), m.group(0)), expr)
+    try:
+        tree = ast.parse(translated.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Unsupported expression: {source!r}") from e
+
+    _validate(tree.body, source)
+    return lambda params: _evaluate(tree.body, params)
+
+
+def resolve_bucket_path(bucket: Dict[str, Any], path: str) -> Any:
+    """
+    Resolves a `buckets_path` (e.g. `_count`, `error_check._count`, `a>b.value`) in one bucket.
+    """
+    segments = path.split(">")
+    node: Any = bucket
+    for segment in segments[:-1]:
+        node = (node or {}).get(segment)
+
+    last = segments[-1]
+    if node is None:
+        return None
+    if last == "_count":
+        return node.get("doc_count")
+    if last == "_key":
+        return node.get("key")
+
+    agg_name, _, metric = last.partition(".")
+    value = node.get(agg_name)
+    if not isinstance(value, dict):
+        return value
+    if not metric:
+        return value.get("value", value.get("doc_count"))
+    if metric == "_count":
+        return value.get("doc_count")
+    if metric in value:
+        return value[metric]
+    return value.get("values", {}).get(metric)
+
+
+def resolve_parent_buckets(aggregations: Dict[str, Any], parent_bucket_path: str) -> List[Dict[str, Any]]:
+    """Finds the bucket list addressed by a trigger's `parent_bucket_path`."""
+    node: Any = aggregations
+    for segment in parent_bucket_path.split(">"):
+        node = (node or {}).get(segment)
+
+    buckets = (node or {}).get("buckets", [])
+    if isinstance(buckets, dict):
+        # Keyed buckets (filters, keyed ranges)
+        return [dict(b, key=k) for k, b in buckets.items()]
+    return buckets
+
+
+def evaluate_bucket_trigger(trigger: Dict[str, Any], aggregations: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Evaluates a bucket-level trigger over search aggregations.
+
+    Returns the trigger name, every bucket with its resolved params and whether
+    it fired, plus the evaluation time.
+    """
+    start = time.perf_counter()
+    condition = trigger.get("condition", {})
+    script = condition.get("script", {})
+    source = script.get("source", "") if isinstance(script, dict) else str(script)
+    buckets_path = condition.get("buckets_path", {})
+
+    check = compile_condition(source)
+    results = []
+    for bucket in resolve_parent_buckets(aggregations, condition.get("parent_bucket_path", "")):
+        params = {name: resolve_bucket_path(bucket, path) for name, path in buckets_path.items()}
+        try:
+            fired, error = bool(check(params)), None
+        except (TypeError, ZeroDivisionError) as e:
+            fired, error = False, str(e)
+        results.append({"key": bucket.get("key"), "params": params, "fired": fired, "error": error})
+
+    return {
+        "name": trigger.get("name", "-"),
+        "buckets": results,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
+
+
+def evaluate_monitor(
+    client: OpenSearchClient,
+    source: str,
+    name: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    show_all: bool = False,
+    limit: int = 50,
+):
+    """
+    Runs a monitor's search input once and evaluates its bucket-level triggers locally.
+
+    Nothing is executed by the alerting plugin, so no alerts, actions or
+    notifications are produced.
+    """
+    try:
+        monitor = _load_monitor(client, source, name)
+    except Exception as e:
+        console.print(f"[bold red]Error loading monitor:[/bold red] {e}")
+        return
+    if not monitor:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+
+    search = (monitor.get("inputs") or [{}])[0].get("search")
+    if not search:
+        console.print("[yellow]Monitor has no search input; only query/bucket monitors with a search input are supported.[/yellow]")
+        return
+
+    query = _render_period(search.get("query", {}), monitor.get("schedule", {}))
+    indices = ",".join(search.get("indices", [])) or "_all"
+
+    search_start = time.perf_counter()
+    try:
+        response = client.post(f"{indices}/_search", body=query, tag="monitor_evaluate_search")
+    except Exception as e:
+        console.print(f"[bold red]Error running monitor search:[/bold red] {e}")
+        return
+    search_ms = (time.perf_counter() - search_start) * 1000
+
+    if not response:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+
+    aggregations = response.get("aggregations", {})
+    evaluated = 0
+    for wrapper in monitor.get("triggers", []):
+        trigger = wrapper.get("bucket_level_trigger")
+        if trigger is None:
+            kind = next(iter(wrapper), "unknown")
+            console.print(f"[yellow]Skipping {kind}: only bucket-level triggers are evaluated locally.[/yellow]")
+            continue
+        try:
+            result = evaluate_bucket_trigger(trigger, aggregations)
+        except ExpressionError as e:
+            console.print(f"[bold red]Trigger '{trigger.get('name')}':[/bold red] {e}")
+            continue
+        evaluated += 1
+        _display_trigger_result(result, sort_by, descending, show_all, limit)
+
+    summary = Table(box=None)
+    summary.add_column("Stat", style="cyan")
+    summary.add_column("Value", style="green")
+    summary.add_row("Monitor", monitor.get("name", "-"))
+    summary.add_row("Indices", indices)
+    summary.add_row("Search (took / wall)", f"{response.get('took', '-')} ms / {search_ms:.0f} ms")
+    summary.add_row("Triggers evaluated", str(evaluated))
+    console.print(Panel(summary, title="Monitor Dry Evaluation", expand=False))
+
+
+def _display_trigger_result(
+    result: Dict[str, Any], sort_by: Optional[str], descending: bool, show_all: bool, limit: int
+):
+    buckets = result["buckets"]
+    fired = [b for b in buckets if b["fired"]]
+    rows = buckets if show_all else fired
+
+    if sort_by:
+        # Buckets without the sort value always go last.
+        present = [b for b in rows if b["params"].get(sort_by) is not None]
+        missing = [b for b in rows if b["params"].get(sort_by) is None]
+        rows = sorted(present, key=lambda b: b["params"][sort_by], reverse=descending) + missing
+
+    param_names = list(buckets[0]["params"]) if buckets else []
+    table = Table(show_header=True, header_style="bold yellow", box=None)
+    table.add_column("Bucket Key", style="cyan")
+    for param in param_names:
+        table.add_column(param, justify="right")
+    table.add_column("Fired")
+
+    for bucket in rows[:limit] if limit else rows:
+        key = bucket["key"]
+        key_str = json.dumps(key) if isinstance(key, (dict, list)) else str(key)
+        status = "[red]yes[/red]" if bucket["fired"] else "no"
+        if bucket["error"]:
+            status = f"[yellow]error: {bucket['error']}[/yellow]"
+        table.add_row(key_str, *[str(bucket["params"].get(p)) for p in param_names], status)
+
+    title = (
+        f"Trigger: [bold cyan]{result['name']}[/bold cyan] - "
+        f"{len(fired)}/{len(buckets)} buckets fire ({result['elapsed_ms']:.2f} ms)"
+    )
+    console.print(Panel(table, title=title, expand=False))
+
+
+def _load_monitor(client: OpenSearchClient, source: str, name: Optional[str]) -> Optional[Dict[str, Any]]:
+    if os.path.exists(source):
+        monitors = load_monitor_definitions([source])
+        if name:
+            monitors = [m for m in monitors if m["name"] == name]
+        if len(monitors) != 1:
+            raise ValueError(f"Expected exactly one monitor in {source}, found {len(monitors)} (use --name)")
+        return monitors[0]
+
+    response = client.get(f"{MONITORS_PATH}/{source}", tag="monitor_get")
+    return (response or {}).get("monitor")
+
+
+def _render_period(query: Dict[str, Any], schedule: Dict[str, Any]) -> Dict[str, Any]:
+    """Substitutes `{{period_start}}`/`{{period_end}}` with epoch millis, like the alerting runner."""
+    text = json.dumps(query)
+    if not _PERIOD_RE.search(text):
+        return query
+
+    period = schedule.get("period", {})
+    unit_ms = {"MINUTES": 60_000, "HOURS": 3_600_000, "DAYS": 86_400_000}.get(period.get("unit", "MINUTES"), 60_000)
+    end = int(time.time() * 1000)
+    start = end - int(period.get("interval", 1)) * unit_ms
+    return json.loads(_PERIOD_RE.sub(lambda m: str(start if m.group(1) == "start" else end), text))
+
+
+def _validate(node: ast.AST, source: str) -> None:
+    allowed = (
+        ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+        ast.BinOp, ast.Compare, ast.Constant, ast.Attribute, ast.Name, ast.Subscript, ast.Load,
+        *_BIN_OPS, *_CMP_OPS,
+    )
+    for child in ast.walk(node):
+        if not isinstance(child, allowed):
+            raise ExpressionError(f"Unsupported construct '{type(child).__name__}' in {source!r}")
+        if isinstance(child, ast.Name) and child.id != "params":
+            raise ExpressionError(f"Unknown variable '{child.id}' in {source!r}")
+
+
+def _evaluate(node: ast.AST, params: Dict[str, Any]) -> Any:
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        return params
+    if isinstance(node, ast.Attribute):
+        base = _evaluate(node.value, params)
+        return base.get(node.attr) if isinstance(base, dict) else None
+    if isinstance(node, ast.Subscript):
+        base = _evaluate(node.value, params)
+        key = _evaluate(node.slice, params)
+        return base.get(key) if isinstance(base, dict) else None
+    if isinstance(node, ast.BoolOp):
+        values = (_evaluate(v, params) for v in node.values)
+        return all(values) if isinstance(node.op, ast.And) else any(values)
+    if isinstance(node, ast.UnaryOp):
+        operand = _evaluate(node.operand, params)
+        if isinstance(node.op, ast.Not):
+            return not operand
+        return -operand if isinstance(node.op, ast.USub) else +operand
+    if isinstance(node, ast.BinOp):
+        return _BIN_OPS[type(node.op)](_evaluate(node.left, params), _evaluate(node.right, params))
+    if isinstance(node, ast.Compare):
+        left = _evaluate(node.left, params)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _evaluate(comparator, params)
+            if not _CMP_OPS[type(op)](left, right):
+                return False
+            left = right
+        return True
+    raise ExpressionError(f"Unsupported construct '{type(node).__name__}'")
@@ -0,0 +1,274 @@
+from typing import List, Dict, Any
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import yaml
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..waits import REFRESH_WAIT_FOR
+
+console = Console()
+
+MONITORS_PATH = "_plugins/_alerting/monitors"
+
+# Fields the alerting plugin maintains itself; they never count as drift.
+_VOLATILE_KEYS = {"last_update_time", "enabled_time", "schema_version", "user", "owner"}
+
+# Key under the monitor's `ui_metadata` where the hash of the applied definition is kept.
+_METADATA_KEY = "opensearch_manager"
+
+
+def load_monitor_definitions(paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Loads monitor definitions from JSON/YAML files or directories.
+
+    A file may hold a single monitor, a list of monitors, or a `monitors:` list.
+    """
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for ext in ("*.json", "*.yaml", "*.yml"):
+                files.extend(glob.glob(os.path.join(path, ext)))
+        else:
+            files.append(path)
+
+    monitors: List[Dict[str, Any]] = []
+    seen = set()
+    for file_path in sorted(files):
+        with open(file_path, "r") as f:
+            data = json.load(f) if file_path.endswith(".json") else yaml.safe_load(f)
+
+        if isinstance(data, dict) and "monitors" in data:
+            data = data["monitors"]
+        entries = data if isinstance(data, list) else [data]
+
+        for monitor in entries:
+            name = monitor.get("name") if isinstance(monitor, dict) else None
+            if not name:
+                raise ValueError(f"Monitor definition without a name in {file_path}")
+            if name in seen:
+                raise ValueError(f"Duplicate monitor name '{name}' in {file_path}")
+            seen.add(name)
+            monitors.append(monitor)
+
+    return monitors
+
+
+def canonical_hash(monitor: Dict[str, Any]) -> str:
+    """Stable hash of a monitor body, independent of key order and server-managed fields."""
+    canonical = json.dumps(_strip_volatile(monitor), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def fetch_existing_monitors(client: OpenSearchClient, names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetches all monitors with the given names in a single search.
+
+    Returns `{name: {"id", "monitor", "seq_no", "primary_term"}}`.
+    """
+    if not names:
+        return {}
+
+    body = {
+        "size": max(len(names) * 2, 10),
+        "seq_no_primary_term": True,
+        "query": {"bool": {"filter": [{"terms": {"monitor.name.keyword": names}}]}},
+    }
+    response = client.post(f"{MONITORS_PATH}/_search", body=body, tag="monitor_search")
+    if not response:
+        return {}
+
+    wanted = set(names)
+    existing = {}
+    for hit in response.get("hits", {}).get("hits", []):
+        source = hit.get("_source", {})
+        monitor = source.get("monitor", source)
+        name = monitor.get("name")
+        if name in wanted and name not in existing:
+            existing[name] = {
+                "id": hit.get("_id"),
+                "monitor": monitor,
+                "seq_no": hit.get("_seq_no"),
+                "primary_term": hit.get("_primary_term"),
+            }
+    return existing
+
+
+def plan_monitor_changes(
+    desired: List[Dict[str, Any]], existing: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Compares desired monitors with the cluster's copies.
+
+    The stored monitor is projected onto the keys of the desired definition
+    before hashing, so defaults the plugin fills in (trigger/action ids,
+    execution policies, ...) do not show up as changes. Keys removed from a
+    definition are caught by the hash of the last applied definition, which
+    apply stores in the monitor's `ui_metadata`.
+    """
+    plan = []
+    for monitor in desired:
+        name = monitor["name"]
+        current = existing.get(name)
+        desired_hash = canonical_hash(monitor)
+        if current is None:
+            action = "create"
+        elif canonical_hash(_project(current["monitor"], monitor)) == desired_hash and _applied_hash(
+            current["monitor"]
+        ) in (None, desired_hash):
+            # Monitors created outside this tool carry no applied hash; for
+            # those only the projection can be compared.
+            action = "unchanged"
+        else:
+            action = "update"
+
+        plan.append(
+            {
+                "name": name,
+                "action": action,
+                "monitor": monitor,
+                "body": build_monitor_body(monitor, current["monitor"] if current else None),
+                "id": current["id"] if current else None,
+                "seq_no": current["seq_no"] if current else None,
+                "primary_term": current["primary_term"] if current else None,
+            }
+        )
+    return plan
+
+
+def build_monitor_body(monitor: Dict[str, Any], existing: Any = None) -> Dict[str, Any]:
+    """
+    The body to create or update `monitor` with: trigger and action ids of the
+    stored monitor are carried over by name, so the plugin keeps their
+    throttle and alert state, and the definition hash is recorded.
+    """
+    body = json.loads(json.dumps(monitor))
+    if existing:
+        existing_triggers = {t.get("name"): t for t in map(_trigger_fields, existing.get("triggers", []))}
+        for trigger in map(_trigger_fields, body.get("triggers", [])):
+            stored = existing_triggers.get(trigger.get("name"))
+            if not stored:
+                continue
+            if stored.get("id") and "id" not in trigger:
+                trigger["id"] = stored["id"]
+            stored_actions = {a.get("name"): a for a in stored.get("actions", [])}
+            for action in trigger.get("actions", []):
+                stored_action = stored_actions.get(action.get("name"))
+                if stored_action and stored_action.get("id") and "id" not in action:
+                    action["id"] = stored_action["id"]
+
+    ui_metadata = body.setdefault("ui_metadata", {})
+    ui_metadata[_METADATA_KEY] = {"definition_hash": canonical_hash(monitor)}
+    return body
+
+
+def apply_monitors(client: OpenSearchClient, paths: List[str], workers: int = 8):
+    """
+    Creates or updates monitors from definition files, touching only what changed.
+    """
+    try:
+        desired = load_monitor_definitions(paths)
+    except (OSError, ValueError, yaml.YAMLError, json.JSONDecodeError) as e:
+        console.print(f"[bold red]Error loading monitor definitions:[/bold red] {e}")
+        return
+
+    if not desired:
+        console.print(f"[yellow]No monitor definitions found in: {paths}[/yellow]")
+        return
+
+    try:
+        existing = fetch_existing_monitors(client, [m["name"] for m in desired])
+    except Exception as e:
+        console.print(f"[bold red]Error fetching existing monitors:[/bold red] {e}")
+        return
+
+    plan = plan_monitor_changes(desired, existing)
+    pending = [change for change in plan if change["action"] != "unchanged"]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="monitor-apply") as executor:
+        results = list(executor.map(lambda change: _apply_change(client, change), pending))
+
+    outcome = {change["name"]: result for change, result in zip(pending, results)}
+    _display_plan(plan, outcome, client.dry_run)
+
+
+def _apply_change(client: OpenSearchClient, change: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        # refresh=wait_for: the monitor is searchable (and executable) once apply returns.
+        params = dict(REFRESH_WAIT_FOR)
+        if change["action"] == "create":
+            response = client.post(MONITORS_PATH, body=change["body"], params=params, tag="monitor_create")
+        else:
+            if change["seq_no"] is not None and change["primary_term"] is not None:
+                params.update(if_seq_no=change["seq_no"], if_primary_term=change["primary_term"])
+            response = client.put(
+                f"{MONITORS_PATH}/{change['id']}",
+                body=change["body"],
+                params=params,
+                tag="monitor_update",
+            )
+        return {"id": (response or {}).get("_id", change["id"]), "error": None}
+    except Exception as e:
+        return {"id": change["id"], "error": str(e)}
+
+
+def _display_plan(plan: List[Dict[str, Any]], outcome: Dict[str, Dict[str, Any]], dry_run: bool):
+    table = Table(title="Monitor Apply", show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Monitor", style="cyan")
+    table.add_column("Action")
+    table.add_column("ID", style="dim")
+    table.add_column("Result")
+
+    styles = {"create": "green", "update": "yellow", "unchanged": "dim"}
+    for change in plan:
+        result = outcome.get(change["name"])
+        if change["action"] == "unchanged":
+            status = "-"
+        elif dry_run:
+            status = "[dim]dry run[/dim]"
+        elif result and result["error"]:
+            status = f"[red]{result['error']}[/red]"
+        else:
+            status = "[green]ok[/green]"
+
+        monitor_id = (result or {}).get("id") or change["id"] or "-"
+        style = styles[change["action"]]
+        table.add_row(change["name"], f"[{style}]{change['action']}[/{style}]", str(monitor_id), status)
+
+    counts = {action: sum(1 for c in plan if c["action"] == action) for action in styles}
+    summary = ", ".join(f"{n} {action}" for action, n in counts.items())
+    console.print(Panel(table, title=f"Monitors ({summary})", expand=False))
+
+
+def _strip_volatile(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _strip_volatile(v) for k, v in obj.items() if k not in _VOLATILE_KEYS}
+    if isinstance(obj, list):
+        return [_strip_volatile(v) for v in obj]
+    return obj
+
+
+def _trigger_fields(trigger: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a trigger, inside its `query_level_trigger`/`bucket_level_trigger`/... wrapper if it has one."""
+    if "name" not in trigger and len(trigger) == 1:
+        inner = next(iter(trigger.values()))
+        if isinstance(inner, dict):
+            return inner
+    return trigger
+
+
+def _applied_hash(monitor: Dict[str, Any]) -> Any:
+    return (monitor.get("ui_metadata") or {}).get(_METADATA_KEY, {}).get("definition_hash")
+
+
+def _project(existing: Any, desired: Any) -> Any:
+    """Restricts `existing` to the shape of `desired` (dict keys, list positions)."""
+    if isinstance(existing, dict) and isinstance(desired, dict):
+        return {k: _project(existing[k], desired[k]) for k in desired if k in existing}
+    if isinstance(existing, list) and isinstance(desired, list) and len(existing) == len(desired):
+        return [_project(e, d) for e, d in zip(existing, desired)]
+    return existing
@@ -0,0 +1,315 @@
+from typing import List, Dict, Any, Optional
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+
+console = Console()
+
+_SEARCH_FILTER_PATH = "hits.hits._id,hits.hits._source,hits.hits.sort"
+_BULK_FILTER_PATH = "took,errors,items.*.status,items.*.error.type"
+
+
+class AdaptiveBatchSizer:
+    """
+    AIMD-style batch size controller shared by all backfill workers.
+
+    Batches grow while the embedding pipeline keeps up with the latency
+    target and shrink fast on ML/write rejections (HTTP 429) or slow batches,
+    so the batch size settles near what the ML nodes can sustain.
+    """
+
+    def __init__(self, initial: int = 200, minimum: int = 10, maximum: int = 2000, target_latency: float = 5.0):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.size = max(minimum, min(initial, maximum))
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, rejected: bool = False) -> int:
+        with self._lock:
+            if rejected:
+                self.size = max(self.minimum, self.size // 2)
+            elif latency > self.target_latency:
+                self.size = max(self.minimum, int(self.size * 0.75))
+            elif latency < self.target_latency * 0.8:
+                self.size = min(self.maximum, int(self.size * 1.25) + 1)
+            return self.size
+
+
+def split_time_range(start: int, end: int, slices: int) -> List[Dict[str, Any]]:
+    """Splits [start, end] (epoch millis) into contiguous partitions with resumable cursors."""
+    slices = max(1, slices)
+    step = max(1, (end - start + 1) // slices)
+    partitions = []
+    for i in range(slices):
+        lower = start + i * step
+        upper = end + 1 if i == slices - 1 else start + (i + 1) * step
+        if lower >= upper:
+            break
+        partitions.append({"gte": lower, "lt": upper, "search_after": None, "docs": 0, "done": False})
+    return partitions
+
+
+def backfill_embeddings(
+    client: OpenSearchClient,
+    source: str,
+    dest: str,
+    pipeline: str,
+    timestamp_field: str = "@timestamp",
+    query: Optional[Dict[str, Any]] = None,
+    slices: int = 4,
+    workers: int = 4,
+    batch_size: int = 200,
+    max_batch_size: int = 2000,
+    target_latency: float = 5.0,
+    checkpoint_path: Optional[str] = None,
+    restart: bool = False,
+    report_interval: float = 5.0,
+):
+    """
+    Reindexes `source` into `dest` through an embedding ingest pipeline.
+
+    The source is split into time-range partitions, each walked with a sorted
+    `search_after` cursor by its own worker and written with `_bulk?pipeline=`.
+    Cursors are checkpointed after every batch, so an interrupted backfill
+    resumes where it stopped; documents keep their `_id`, making re-sent
+    batches idempotent.
+    """
+    checkpoint_path = checkpoint_path or os.path.join(
+        client.settings.settings.state_dir, f"backfill_{source}_{dest}.json"
+    )
+
+    state = None if restart else _load_checkpoint(checkpoint_path, source, dest, pipeline)
+    if state:
+        done = sum(p["docs"] for p in state["partitions"])
+        console.print(f"[cyan]Resuming backfill from {checkpoint_path} ({done:,} docs already done)[/cyan]")
+    else:
+        try:
+            bounds = _time_bounds(client, source, timestamp_field, query)
+        except Exception as e:
+            console.print(f"[bold red]Error reading source time range:[/bold red] {e}")
+            return
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+            return
+        if bounds is None:
+            console.print(f"[yellow]No documents with {timestamp_field} found in {source}[/yellow]")
+            return
+        state = {
+            "source": source,
+            "dest": dest,
+            "pipeline": pipeline,
+            "partitions": split_time_range(bounds[0], bounds[1], slices),
+        }
+    if client.dry_run:
+        # Workers would read empty batches and mark every partition of the checkpoint done.
+        console.print("[dim]Dry run: No response to parse.[/dim]")
+        return
+
+    sizer = AdaptiveBatchSizer(batch_size, maximum=max_batch_size, target_latency=target_latency)
+    lock = threading.Lock()
+    stop = threading.Event()
+    stats = {"docs": 0, "batches": 0, "rejected": 0, "failed": 0}
+
+    def _save() -> None:
+        with lock:
+            _write_checkpoint(checkpoint_path, state)
+
+    def _run_partition(partition: Dict[str, Any]) -> None:
+        while not stop.is_set() and not partition["done"]:
+            size = sizer.size
+            hits = _fetch_batch(client, source, timestamp_field, query, partition, size)
+            if not hits:
+                partition["done"] = True
+                _save()
+                return
+
+            started = time.perf_counter()
+            rejected, failed = _index_batch(client, dest, pipeline, hits)
+            latency = time.perf_counter() - started
+            sizer.record(latency, rejected=bool(rejected))
+
+            if rejected:
+                # Cursor stays put; the same batch is re-read (smaller) and re-sent.
+                with lock:
+                    stats["rejected"] += rejected
+                time.sleep(min(5.0, latency))
+                continue
+
+            with lock:
+                partition["search_after"] = hits[-1]["sort"]
+                partition["docs"] += len(hits)
+                stats["docs"] += len(hits)
+                stats["failed"] += failed
+                stats["batches"] += 1
+            _save()
+
+    pending = [p for p in state["partitions"] if not p["done"]]
+    start = time.perf_counter()
+    last_docs, last_time = 0, start
+    ml_baseline = _ml_thread_pools(client)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as executor:
+        futures = [executor.submit(_run_partition, p) for p in pending]
+        try:
+            while True:
+                _, not_done = wait(futures, timeout=report_interval)
+                now = time.perf_counter()
+                rate = (stats["docs"] - last_docs) / (now - last_time) if now > last_time else 0
+                last_docs, last_time = stats["docs"], now
+                ml = _ml_thread_pools(client)
+                console.print(
+                    f"[dim]{stats['docs']:,} docs | {rate:,.0f} embeddings/s | batch {sizer.size} | "
+                    f"ML active {ml['active']} queue {ml['queue']} "
+                    f"rejected +{ml['rejected'] - ml_baseline['rejected']} | "
+                    f"partitions {sum(p['done'] for p in state['partitions'])}/{len(state['partitions'])}[/dim]"
+                )
+                if not not_done:
+                    break
+        except KeyboardInterrupt:
+            console.print("[yellow]Interrupted; finishing in-flight batches and saving checkpoint...[/yellow]")
+            stop.set()
+
+    for future in futures:
+        if future.done() and future.exception():
+            console.print(f"[bold red]Partition failed:[/bold red] {future.exception()}")
+
+    _display_summary(state, stats, time.perf_counter() - start, sizer.size, checkpoint_path)
+
+
+def _time_bounds(
+    client: OpenSearchClient, source: str, timestamp_field: str, query: Optional[Dict[str, Any]]
+) -> Optional[tuple]:
+    body = {
+        "size": 0,
+        "query": query or {"match_all": {}},
+        "aggs": {"min_ts": {"min": {"field": timestamp_field}}, "max_ts": {"max": {"field": timestamp_field}}},
+    }
+    response = client.post(f"{source}/_search", body=body, tag="backfill_bounds")
+    if not response:
+        return None
+    aggs = response.get("aggregations", {})
+    low, high = aggs.get("min_ts", {}).get("value"), aggs.get("max_ts", {}).get("value")
+    if low is None or high is None:
+        return None
+    return int(low), int(high)
+
+
+def _fetch_batch(
+    client: OpenSearchClient,
+    source: str,
+    timestamp_field: str,
+    query: Optional[Dict[str, Any]],
+    partition: Dict[str, Any],
+    size: int,
+) -> List[Dict[str, Any]]:
+    time_range = {"range": {timestamp_field: {"gte": partition["gte"], "lt": partition["lt"], "format": "epoch_millis"}}}
+    body: Dict[str, Any] = {
+        "size": size,
+        "track_total_hits": False,
+        "query": {"bool": {"filter": [query or {"match_all": {}}, time_range]}},
+        "sort": [{timestamp_field: "asc"}, {"_id": "asc"}],
+    }
+    if partition["search_after"]:
+        body["search_after"] = partition["search_after"]
+
+    response = client.post(
+        f"{source}/_search", body=body, params={"filter_path": _SEARCH_FILTER_PATH}, tag="backfill_fetch"
+    )
+    return (response or {}).get("hits", {}).get("hits", [])
+
+
+def _index_batch(client: OpenSearchClient, dest: str, pipeline: str, hits: List[Dict[str, Any]]) -> tuple:
+    """Returns (rejected, failed) item counts; rejected items (429) must be retried."""
+    lines = []
+    for hit in hits:
+        lines.append(json.dumps({"index": {"_id": hit["_id"]}}))
+        lines.append(json.dumps(hit.get("_source", {})))
+    payload = "\n".join(lines) + "\n"
+
+    try:
+        response = client.bulk(
+            payload, index=dest, params={"pipeline": pipeline, "filter_path": _BULK_FILTER_PATH}, tag="backfill_bulk"
+        )
+    except Exception as e:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+        if status == 429:
+            return len(hits), 0
+        raise
+
+    if not response or not response.get("errors"):
+        return 0, 0
+
+    rejected = failed = 0
+    for item in response.get("items", []):
+        result = next(iter(item.values()), {})
+        if result.get("status") == 429:
+            rejected += 1
+        elif result.get("error"):
+            failed += 1
+    return rejected, failed
+
+
+def _ml_thread_pools(client: OpenSearchClient) -> Dict[str, int]:
+    """Sums active/queue/rejected across ML Commons thread pools on all nodes."""
+    totals = {"active": 0, "queue": 0, "rejected": 0}
+    try:
+        response = client.get(
+            "_nodes/stats/thread_pool",
+            params={"filter_path": "nodes.*.thread_pool.*ml*"},
+            tag="backfill_ml_stats",
+        )
+    except Exception:
+        return totals
+
+    for node in (response or {}).get("nodes", {}).values():
+        for pool in node.get("thread_pool", {}).values():
+            for key in totals:
+                totals[key] += pool.get(key, 0)
+    return totals
+
+
+def _load_checkpoint(path: str, source: str, dest: str, pipeline: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if (state.get("source"), state.get("dest"), state.get("pipeline")) != (source, dest, pipeline):
+        return None
+    return state
+
+
+def _write_checkpoint(path: str, state: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    # Atomic replace: a crash never leaves a half-written checkpoint.
+    os.replace(tmp_path, path)
+
+
+def _display_summary(state: Dict[str, Any], stats: Dict[str, int], elapsed: float, batch_size: int, checkpoint_path: str):
+    partitions = state["partitions"]
+    table = Table(box=None)
+    table.add_column("Stat", style="cyan")
+    table.add_column("Value", style="green")
+    table.add_row("Source → Dest", f"{state['source']} → {state['dest']}")
+    table.add_row("Pipeline", state["pipeline"])
+    table.add_row("Docs (this run)", f"{stats['docs']:,}")
+    table.add_row("Docs (total)", f"{sum(p['docs'] for p in partitions):,}")
+    table.add_row("Failed docs", f"{stats['failed']:,}")
+    table.add_row("Rejected (retried)", f"{stats['rejected']:,}")
+    table.add_row("Partitions done", f"{sum(p['done'] for p in partitions)}/{len(partitions)}")
+    table.add_row("Final batch size", str(batch_size))
+    table.add_row("Elapsed", f"{elapsed:.1f}s")
+    if elapsed > 0:
+        table.add_row("Embeddings/sec", f"{stats['docs'] / elapsed:,.1f}")
+    table.add_row("Checkpoint", checkpoint_path)
+    console.print(Panel(table, title="Neural Backfill", expand=False))
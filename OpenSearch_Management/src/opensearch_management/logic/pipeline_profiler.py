@@ -0,0 +1,299 @@
+from typing import List, Dict, Any, Optional
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+
+console = Console()
+
+_PROFILE_TAG = "profile-stage-"
+
+
+def processor_label(processor: Dict[str, Any]) -> str:
+    """`type` or `type:tag` — the same key `_nodes/stats/ingest` uses for processors."""
+    processor_type, config = next(iter(processor.items()))
+    tag = (config or {}).get("tag") if isinstance(config, dict) else None
+    return f"{processor_type}:{tag}" if tag else processor_type
+
+
+def tag_processors(processors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copies of the top-level processors with position tags, so their entries can
+    be told apart from the extra ones `_simulate?verbose` reports for nested
+    `pipeline`/`foreach` processors and `on_failure` handlers.
+    """
+    tagged = []
+    for position, processor in enumerate(processors):
+        processor_type, config = next(iter(processor.items()))
+        tagged.append({processor_type: dict(config or {}, tag=f"{_PROFILE_TAG}{position}")})
+    return tagged
+
+
+def summarize_verbose(
+    processors: List[Dict[str, Any]], sources: List[Dict[str, Any]], results: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Walks `_simulate?verbose` output of the `tag_processors` pipeline document
+    by document.
+
+    Returns per-stage counters (docs in, dropped, failed, skipped, bytes in/out)
+    and, for each stage, the documents as they looked when entering it, so each
+    processor can later be timed on its own realistic input. Entries without a
+    stage tag (nested processors, failure handlers) are attributed to the stage
+    they ran under.
+    """
+    stages = [
+        {"label": processor_label(p), "in": 0, "dropped": 0, "failed": 0, "skipped": 0, "bytes_in": 0, "bytes_out": 0, "inputs": []}
+        for p in processors
+    ]
+    positions = {f"{_PROFILE_TAG}{position}": position for position in range(len(processors))}
+    handles_failure = [
+        (config or {}).get("ignore_failure") is True or bool((config or {}).get("on_failure"))
+        for config in (next(iter(p.values())) for p in processors)
+    ]
+    totals = {"docs": len(sources), "dropped": 0, "failed": 0, "bytes_in": 0, "bytes_out": 0}
+
+    for source, result in zip(sources, results):
+        current = source
+        totals["bytes_in"] += _size(source)
+        stage = None
+        stage_doc = nested_doc = None
+        outcome = None
+        for step in result.get("processor_results", []):
+            position = positions.get(step.get("tag"))
+            doc = (step.get("doc") or {}).get("_source")
+            status = step.get("status")
+            if position is None:
+                # Nested entries; foreach reports them before its own entry, pipeline after.
+                if doc is not None:
+                    nested_doc = doc
+                if status == "dropped" and stage is not None:
+                    outcome = "dropped"
+                    break
+                continue
+
+            if stage is not None:
+                current = _stage_output(stage_doc, nested_doc, current)
+                stage["bytes_out"] += _size(current)
+            stage = stages[position]
+            stage_doc = nested_doc = None
+            stage["in"] += 1
+            stage["inputs"].append(current)
+            stage["bytes_in"] += _size(current)
+            if status == "dropped":
+                outcome = "dropped"
+                break
+            if status == "error" or step.get("error"):
+                if not handles_failure[position]:
+                    outcome = "failed"
+                    break
+                stage["failed"] += 1
+            elif status == "skipped":
+                stage["skipped"] += 1
+            stage_doc = doc
+
+        if outcome:
+            stage[outcome] += 1
+            totals[outcome] += 1
+            continue
+        if stage is not None:
+            current = _stage_output(stage_doc, nested_doc, current)
+            stage["bytes_out"] += _size(current)
+        totals["bytes_out"] += _size(current)
+
+    return {"stages": stages, "totals": totals}
+
+
+def _stage_output(stage_doc: Optional[Dict[str, Any]], nested_doc: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    # A `pipeline` processor's own entry carries no document; its nested entries do.
+    if stage_doc is not None:
+        return stage_doc
+    return nested_doc if nested_doc is not None else current
+
+
+def parse_ingest_stats(response: Dict[str, Any], pipeline_id: str) -> Dict[str, Any]:
+    """Sums a pipeline's live counters from `_nodes/stats/ingest` across nodes, processor by processor."""
+    pipeline = {"count": 0, "time_in_millis": 0, "failed": 0, "processors": []}
+    for node in (response or {}).get("nodes", {}).values():
+        stats = node.get("ingest", {}).get("pipelines", {}).get(pipeline_id)
+        if not stats:
+            continue
+        for key in ("count", "time_in_millis", "failed"):
+            pipeline[key] += stats.get(key, 0)
+        for position, entry in enumerate(stats.get("processors", [])):
+            label, details = next(iter(entry.items()))
+            if position == len(pipeline["processors"]):
+                pipeline["processors"].append({"label": label, "count": 0, "time_in_millis": 0, "failed": 0})
+            totals = pipeline["processors"][position]
+            for key in ("count", "time_in_millis", "failed"):
+                totals[key] += details.get("stats", {}).get(key, 0)
+    return pipeline
+
+
+def profile_pipeline(
+    client: OpenSearchClient,
+    pipeline_id: str,
+    index: Optional[str] = None,
+    file: Optional[str] = None,
+    sample: int = 500,
+    batch_size: int = 50,
+    workers: int = 4,
+    isolate: bool = True,
+):
+    """
+    Profiles an ingest pipeline with real documents via `_simulate?verbose`.
+
+    Verbose simulation shows what every processor did to each document (drop
+    rate, size growth) but carries no timings, so with `isolate` each processor
+    is additionally simulated alone on its actual input documents and timed
+    against an empty pipeline baseline. Live per-processor timings from
+    `_nodes/stats/ingest` are shown alongside for comparison.
+    """
+    try:
+        definition = client.get(f"_ingest/pipeline/{pipeline_id}", tag="pipeline_profile_get") or {}
+        sources = _load_sample(client, index, file, sample)
+    except Exception as e:
+        console.print(f"[bold red]Error loading pipeline or sample documents:[/bold red] {e}")
+        return
+
+    if not definition:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        else:
+            console.print(f"[yellow]Pipeline {pipeline_id} not found.[/yellow]")
+        return
+    if not sources:
+        console.print("[yellow]No sample documents to simulate.[/yellow]")
+        return
+
+    processors = definition.get(pipeline_id, {}).get("processors", [])
+    batches = [sources[i:i + batch_size] for i in range(0, len(sources), batch_size)]
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="simulate") as executor:
+        started = time.perf_counter()
+        try:
+            tagged = {"processors": tag_processors(processors)}
+            responses = list(executor.map(lambda batch: _simulate(client, tagged, batch, verbose=True), batches))
+        except Exception as e:
+            console.print(f"[bold red]Error simulating pipeline:[/bold red] {e}")
+            return
+        verbose_elapsed = time.perf_counter() - started
+
+        results = [doc for response, _ in responses for doc in response.get("docs", [])]
+        summary = summarize_verbose(processors, sources, results)
+
+        timings: Dict[int, float] = {}
+        if isolate:
+            baseline = _time_docs(executor, client, [], sources, batch_size) / len(sources)
+            for position, (processor, stage) in enumerate(zip(processors, summary["stages"])):
+                if not stage["inputs"]:
+                    continue
+                elapsed = _time_docs(executor, client, [processor], stage["inputs"], batch_size)
+                timings[position] = max(0.0, elapsed / len(stage["inputs"]) - baseline)
+
+    try:
+        node_stats = client.get(
+            "_nodes/stats/ingest",
+            params={"filter_path": f"nodes.*.ingest.pipelines.{pipeline_id}"},
+            tag="pipeline_profile_node_stats",
+        )
+    except Exception:
+        node_stats = None
+
+    _display_profile(pipeline_id, summary, timings, parse_ingest_stats(node_stats, pipeline_id), verbose_elapsed, len(batches))
+
+
+def _load_sample(client: OpenSearchClient, index: Optional[str], file: Optional[str], sample: int) -> List[Dict[str, Any]]:
+    if file:
+        with open(file, "r") as f:
+            return [json.loads(line) for line in f if line.strip()][:sample]
+    if not index:
+        raise ValueError("Either an index or a file of sample documents is required")
+
+    body = {
+        "size": sample,
+        "query": {"function_score": {"query": {"match_all": {}}, "random_score": {}}},
+    }
+    response = client.post(f"{index}/_search", body=body, params={"filter_path": "hits.hits._source"}, tag="pipeline_profile_sample")
+    return [hit.get("_source", {}) for hit in (response or {}).get("hits", {}).get("hits", [])]
+
+
+def _simulate(client: OpenSearchClient, pipeline: Dict[str, Any], sources: List[Dict[str, Any]], verbose: bool = False) -> tuple:
+    """Returns (response, elapsed seconds) for one `_ingest/pipeline/_simulate` batch."""
+    body = {"pipeline": pipeline, "docs": [{"_source": source} for source in sources]}
+    params = {"verbose": "true"} if verbose else {"filter_path": "docs._index"}
+    started = time.perf_counter()
+    response = client.post("_ingest/pipeline/_simulate", body=body, params=params, tag="pipeline_profile_simulate")
+    return response or {}, time.perf_counter() - started
+
+
+def _time_docs(executor: ThreadPoolExecutor, client: OpenSearchClient, processors: List[Dict[str, Any]], docs: List[Dict[str, Any]], batch_size: int) -> float:
+    """Summed server round-trip time of simulating `docs` through `processors` in batches."""
+    batches = [docs[i:i + batch_size] for i in range(0, len(docs), batch_size)]
+    return sum(elapsed for _, elapsed in executor.map(lambda batch: _simulate(client, {"processors": processors}, batch), batches))
+
+
+def _display_profile(
+    pipeline_id: str,
+    summary: Dict[str, Any],
+    timings: Dict[int, float],
+    live: Dict[str, Any],
+    verbose_elapsed: float,
+    batch_count: int,
+):
+    live_processors = live["processors"]
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("#", justify="right", style="dim")
+    table.add_column("Processor", style="cyan")
+    table.add_column("Docs In", justify="right")
+    table.add_column("Dropped", justify="right")
+    table.add_column("Failed", justify="right")
+    table.add_column("Skipped", justify="right")
+    table.add_column("Size Δ", justify="right")
+    table.add_column("Sim ms/doc", justify="right", style="green")
+    table.add_column("Live ms/doc", justify="right", style="yellow")
+
+    for position, stage in enumerate(summary["stages"]):
+        growth = (stage["bytes_out"] / stage["bytes_in"] - 1) if stage["bytes_in"] else 0
+        simulated = f"{timings[position] * 1000:.2f}" if position in timings else "-"
+        live_ms = "-"
+        if position < len(live_processors) and live_processors[position]["count"]:
+            entry = live_processors[position]
+            live_ms = f"{entry['time_in_millis'] / entry['count']:.2f}"
+        table.add_row(
+            str(position + 1), stage["label"], f"{stage['in']:,}",
+            _rate(stage["dropped"], stage["in"]), _rate(stage["failed"], stage["in"]), _rate(stage["skipped"], stage["in"]),
+            f"{growth:+.0%}", simulated, live_ms,
+        )
+    console.print(Panel(table, title=f"Pipeline Profile: {pipeline_id}", expand=False))
+
+    totals = summary["totals"]
+    stats = Table(box=None)
+    stats.add_column("Stat", style="cyan")
+    stats.add_column("Value", style="green")
+    stats.add_row("Sample docs", f"{totals['docs']:,}")
+    stats.add_row("Dropped", _rate(totals["dropped"], totals["docs"]))
+    stats.add_row("Failed", _rate(totals["failed"], totals["docs"]))
+    if totals["bytes_in"]:
+        stats.add_row("Avg size in", f"{totals['bytes_in'] / totals['docs']:,.0f} B")
+    kept = totals["docs"] - totals["dropped"] - totals["failed"]
+    if kept:
+        stats.add_row("Avg size out (kept)", f"{totals['bytes_out'] / kept:,.0f} B")
+    stats.add_row("Verbose simulate", f"{verbose_elapsed:.2f}s over {batch_count} batches")
+    if live["count"]:
+        stats.add_row("Live pipeline ms/doc", f"{live['time_in_millis'] / live['count']:.2f} ({live['count']:,} docs, {live['failed']:,} failed)")
+    if timings:
+        slowest = max(timings, key=timings.get)
+        stats.add_row("Dominant processor", summary["stages"][slowest]["label"])
+    console.print(Panel(stats, title="Summary", expand=False))
+
+
+def _rate(part: int, whole: int) -> str:
+    return f"{part:,} ({part / whole:.0%})" if whole else "0"
+
+
+def _size(source: Dict[str, Any]) -> int:
+    return len(json.dumps(source, separators=(",", ":")))
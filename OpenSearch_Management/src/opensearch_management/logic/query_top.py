@@ -0,0 +1,250 @@
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from rich.syntax import Syntax
+from ..metrics import LATENCY_BUCKETS_MS, Histogram
+
+console = Console()
+
+# Values of these keys name fields or select behaviour; they are part of the
+# query shape. Every other scalar is a literal and is replaced by "?".
+STRUCTURAL_KEYS = {
+    "field", "fields", "default_field", "path", "order", "operator", "type", "mode",
+    "calendar_interval", "fixed_interval", "interval", "lang", "format",
+}
+_UNORDERED_CLAUSES = {"must", "should", "filter", "must_not"}
+_AGG_KEYS = {"aggs", "aggregations"}
+
+_SLOWLOG_TOOK = re.compile(r"took_millis\[(\d+)\]")
+_SLOWLOG_INDEX = re.compile(r"\]\s*\[([^\]\[]+)\]\[\d+\]")
+_SLOWLOG_SOURCE = re.compile(r"source\[(.*?)\](?:, id\[[^\]]*\])?,?\s*$")
+_STRING_LITERAL = re.compile(r'"(?:[^"\\]|\\.)*"(?=\s*[,}\]])')
+_NUMBER_LITERAL = re.compile(r"(?<=[:\[,])\s*-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+
+def normalize_query(node: Any, key: Optional[str] = None) -> Any:
+    """
+    Structural form of a query body: literals become "?", lists of literals
+    collapse to ["?"], bool clauses are sorted and aggregation names dropped,
+    so queries that differ only in values or clause order compare equal.
+    """
+    if isinstance(node, dict):
+        if key in _AGG_KEYS:
+            return sorted((normalize_query(agg) for agg in node.values()), key=_canonical)
+        normalized = {}
+        for child_key, value in node.items():
+            if child_key == "_name":
+                continue
+            normalized[child_key] = normalize_query(value, child_key)
+        return normalized
+    if isinstance(node, list):
+        items = [normalize_query(item, key) for item in node]
+        if all(not isinstance(item, (dict, list)) for item in items):
+            return ["?"] if key not in STRUCTURAL_KEYS else items
+        if key in _UNORDERED_CLAUSES:
+            items.sort(key=_canonical)
+        return items
+    if key in STRUCTURAL_KEYS:
+        return node
+    return "?"
+
+
+def fingerprint(body: Dict[str, Any]) -> Dict[str, str]:
+    """Short hash and readable shape of the normalized body."""
+    shape = _canonical(normalize_query(body))
+    return {"id": hashlib.sha1(shape.encode("utf-8")).hexdigest()[:12], "shape": shape}
+
+
+def fingerprint_text(source: str) -> Dict[str, str]:
+    """Fallback for sources that are not valid JSON (slow logs truncate long ones): strip literals textually."""
+    shape = _NUMBER_LITERAL.sub("?", _STRING_LITERAL.sub('"?"', source))
+    shape = re.sub(r"\s+", "", shape)
+    return {"id": hashlib.sha1(shape.encode("utf-8")).hexdigest()[:12], "shape": shape + " (truncated)"}
+
+
+def parse_slowlog_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parses one search slow log line, in the plain-text or the JSON layout.
+    Returns {"index", "took_ms", "source"} or None for other lines.
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            event = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        if "took_millis" not in event or "source" not in event:
+            return None
+        index = _SLOWLOG_INDEX.search(" " + event.get("message", ""))
+        return {
+            "index": index.group(1) if index else event.get("message", ""),
+            "took_ms": float(event["took_millis"]),
+            "source": event["source"],
+        }
+
+    took = _SLOWLOG_TOOK.search(line)
+    source = _SLOWLOG_SOURCE.search(line)
+    if not took or not source:
+        return None
+    index = _SLOWLOG_INDEX.search(line)
+    return {"index": index.group(1) if index else "", "took_ms": float(took.group(1)), "source": source.group(1)}
+
+
+def iter_slowlog(paths: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                entry = parse_slowlog_line(line)
+                if entry:
+                    entry["origin"] = "slowlog"
+                    yield entry
+
+
+def iter_history(history_dir: str) -> Iterator[Dict[str, Any]]:
+    """Search requests captured with --query-history (`-qh`)."""
+    for path in sorted(glob.glob(os.path.join(history_dir, "*.json"))):
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        url, body = entry.get("url", ""), entry.get("body")
+        if not body or not any(part in url for part in ("_search", "_asynchronous_search", "_count")):
+            continue
+        path_part = url.split("://", 1)[-1].split("/", 1)[-1]
+        index = path_part.split("/_", 1)[0] if not path_part.startswith("_") else (entry.get("params") or {}).get("index", "")
+        yield {
+            "index": index,
+            "took_ms": entry.get("took_ms") if entry.get("took_ms") is not None else entry.get("duration_ms"),
+            "source": body,
+            "origin": "history",
+        }
+
+
+class QueryStats:
+    """Streaming per-fingerprint aggregation; memory grows with distinct fingerprints, not entries."""
+
+    def __init__(self):
+        self.groups: Dict[str, Dict[str, Any]] = {}
+        self.entries = 0
+        self.unparsed = 0
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self.entries += 1
+        source = entry["source"]
+        if isinstance(source, str):
+            try:
+                source = json.loads(source)
+            except json.JSONDecodeError:
+                source = None
+        if isinstance(source, dict):
+            fp = fingerprint(source)
+        else:
+            self.unparsed += 1
+            fp = fingerprint_text(entry["source"])
+
+        group = self.groups.get(fp["id"])
+        if group is None:
+            group = self.groups[fp["id"]] = {
+                "id": fp["id"],
+                "shape": fp["shape"],
+                "count": 0,
+                "timed": Histogram(LATENCY_BUCKETS_MS),
+                "indices": set(),
+                "origins": set(),
+                "worst": None,
+            }
+        group["count"] += 1
+        group["indices"].add(entry.get("index") or "?")
+        group["origins"].add(entry["origin"])
+        took = entry.get("took_ms")
+        if took is not None:
+            group["timed"].observe(float(took))
+        if group["worst"] is None or (took or 0) > (group["worst"].get("took_ms") or 0):
+            group["worst"] = {"took_ms": took, "index": entry.get("index"), "source": entry["source"]}
+
+    def ranked(self, sort: str = "total") -> List[Dict[str, Any]]:
+        keys = {
+            "total": lambda g: g["timed"].sum,
+            "count": lambda g: g["count"],
+            "p95": lambda g: g["timed"].percentile(95),
+            "max": lambda g: g["timed"].max,
+        }
+        return sorted(self.groups.values(), key=keys[sort], reverse=True)
+
+
+def query_top(
+    history_dir: Optional[str] = None,
+    slowlogs: Optional[List[str]] = None,
+    sort: str = "total",
+    limit: int = 20,
+    examples: int = 3,
+):
+    """
+    Ranks query fingerprints by cost from search slow logs and the client's
+    query history, with the slowest example of each.
+
+    Slow log lines are per shard, so a query over N shards counts N times.
+    """
+    stats = QueryStats()
+    paths = [p for pattern in slowlogs or [] for p in sorted(glob.glob(pattern))]
+    sources: List[Iterable[Dict[str, Any]]] = [iter_slowlog(paths)]
+    if history_dir:
+        sources.append(iter_history(history_dir))
+    for source in sources:
+        for entry in source:
+            stats.add(entry)
+
+    if not stats.entries:
+        console.print("[yellow]No search entries found. Capture some with --query-history or pass --slowlog.[/yellow]")
+        return
+
+    ranked = stats.ranked(sort)[:limit]
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("#", justify="right")
+    table.add_column("Fingerprint", style="cyan", no_wrap=True)
+    table.add_column("Count", justify="right", no_wrap=True)
+    table.add_column("Total ms", justify="right", style="green", no_wrap=True)
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Indices")
+    table.add_column("Shape", overflow="ellipsis", max_width=48, no_wrap=True)
+    for rank, group in enumerate(ranked, 1):
+        timed = group["timed"]
+        has_times = timed.count > 0
+        table.add_row(
+            str(rank),
+            group["id"],
+            str(group["count"]),
+            f"{timed.sum:,.0f}" if has_times else "-",
+            f"{timed.percentile(50):.0f}" if has_times else "-",
+            f"{timed.percentile(95):.0f}" if has_times else "-",
+            f"{timed.max:.0f}" if has_times else "-",
+            ",".join(sorted(group["indices"]))[:30],
+            group["shape"],
+        )
+    console.print(Panel(table, title=f"Top Queries by {sort} ({len(stats.groups)} fingerprints, {stats.entries} entries)", expand=False))
+    if stats.unparsed:
+        console.print(f"[dim]{stats.unparsed} truncated sources were fingerprinted textually.[/dim]")
+
+    for group in ranked[:examples]:
+        worst = group["worst"]
+        source = worst["source"]
+        text = json.dumps(source, indent=2) if isinstance(source, dict) else source
+        took = f"{worst['took_ms']:.0f} ms" if worst.get("took_ms") is not None else "no timing"
+        console.print(Panel(Syntax(text, "json", theme="monokai", word_wrap=True), title=f"{group['id']} worst: {took} on {worst.get('index')}", expand=False))
+
+
+def _canonical(node: Any) -> str:
+    return json.dumps(node, sort_keys=True, separators=(",", ":"))
@@ -0,0 +1,317 @@
+from typing import List, Dict, Any, Optional, Set
+import time
+from rich.console import Console
+from rich.table import Table
+from rich.panel import Panel
+from ..client import OpenSearchClient
+from ..metrics import format_bytes
+from ..waits import backoff_intervals
+
+console = Console()
+
+_SEGMENT_COLUMNS = "index,shard,prirep,segment,docs.count,docs.deleted,size,node"
+_WRITE_BLOCK = "index.blocks.write"
+# Force merge needs metadata writes, which these blocks also reject.
+_READ_ONLY_BLOCKS = ("index.blocks.read_only", "index.blocks.read_only_allow_delete")
+
+
+def parse_segments(rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-index segment summary from `_cat/segments` rows. Counts are for
+    primaries; `node_bytes` covers every copy, since force merge rewrites
+    replicas too.
+    """
+    indices: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        index = indices.setdefault(row["index"], {
+            "index": row["index"], "segments": 0, "shards": set(), "docs": 0, "deleted": 0, "bytes": 0, "node_bytes": {},
+        })
+        size = int(row.get("size") or 0)
+        node = row.get("node") or "?"
+        index["node_bytes"][node] = index["node_bytes"].get(node, 0) + size
+        if row.get("prirep") != "p":
+            continue
+        index["segments"] += 1
+        index["shards"].add(row["shard"])
+        index["docs"] += int(row.get("docs.count") or 0)
+        index["deleted"] += int(row.get("docs.deleted") or 0)
+        index["bytes"] += size
+
+    for index in indices.values():
+        index["shards"] = len(index["shards"])
+        live_and_deleted = index["docs"] + index["deleted"]
+        index["extra_segments"] = max(0, index["segments"] - index["shards"])
+        index["reclaim_bytes"] = int(index["bytes"] * index["deleted"] / live_and_deleted) if live_and_deleted else 0
+    return indices
+
+
+def rank_candidates(indices: List[Dict[str, Any]], sort: str = "speed") -> List[Dict[str, Any]]:
+    """
+    Orders indices by expected gain: `speed` by segments removed per shard
+    (each extra segment adds per-query work on every search), `disk` by the
+    bytes of deleted documents reclaimed. Indices with nothing to gain are dropped.
+    """
+    gaining = [i for i in indices if i["extra_segments"] or i["reclaim_bytes"]]
+    return sorted(gaining, key=_disk_gain if sort == "disk" else _speed_gain, reverse=True)
+
+
+def _speed_gain(index: Dict[str, Any]):
+    return index["extra_segments"] / max(1, index["shards"]), index["reclaim_bytes"]
+
+
+def _disk_gain(index: Dict[str, Any]):
+    return index["reclaim_bytes"], index["extra_segments"] / max(1, index["shards"])
+
+
+def next_runnable(
+    queue: List[Dict[str, Any]],
+    node_active: Dict[str, int],
+    node_free: Dict[str, int],
+    per_node: int,
+    headroom_bytes: int,
+) -> Optional[Dict[str, Any]]:
+    """
+    First queued index whose nodes all have a free merge slot and enough disk
+    for a rewritten copy of their shards plus `headroom_bytes`.
+    """
+    for index in queue:
+        nodes = index["node_bytes"]
+        if all(node_active.get(node, 0) < per_node for node in nodes) and all(
+            node_free.get(node, 0) - size >= headroom_bytes for node, size in nodes.items()
+        ):
+            return index
+    return None
+
+
+def optimize_segments(
+    client: OpenSearchClient,
+    pattern: str,
+    sort: str = "speed",
+    limit: int = 20,
+    include_active: bool = False,
+    max_num_segments: int = 1,
+    expunge_deletes: bool = False,
+    concurrency: int = 2,
+    per_node: int = 1,
+    headroom_gb: float = 20.0,
+    timeout: float = 6 * 3600,
+    apply: bool = False,
+):
+    """
+    Ranks finished indices (write-blocked, or rolled over: their metadata
+    records a rollover) by force-merge gain and, with `apply`, merges them: at most
+    `concurrency` indices at once, `per_node` merges per data node, and only
+    while each node keeps `headroom_gb` free after the rewrite. Merges run as
+    background tasks, polled through the tasks API.
+    """
+    try:
+        rows = client.get(
+            f"_cat/segments/{pattern}", params={"format": "json", "bytes": "b", "h": _SEGMENT_COLUMNS}, tag="segments_cat"
+        )
+        settings = client.get(
+            f"{pattern}/_settings/{','.join((_WRITE_BLOCK, *_READ_ONLY_BLOCKS))}", params={"flat_settings": "true"}, tag="segments_settings"
+        )
+        metadata = client.get(
+            f"_cluster/state/metadata/{pattern}", params={"filter_path": "metadata.indices.*.rollover_info"}, tag="segments_rollover_info"
+        )
+    except Exception as e:
+        console.print(f"[bold red]Error reading segments for {pattern}:[/bold red] {e}")
+        return
+    if not isinstance(rows, list) or not rows:
+        if client.dry_run:
+            console.print("[dim]Dry run: No response to parse.[/dim]")
+        else:
+            console.print(f"[yellow]No segments found for {pattern}.[/yellow]")
+        return
+
+    indices = parse_segments(rows)
+    finished = _finished_indices(settings or {}, metadata or {})
+    read_only = _blocked_indices(settings or {}, _READ_ONLY_BLOCKS)
+    skipped = [name for name in indices if name not in finished and name not in read_only]
+    candidates = [i for name, i in indices.items() if name not in read_only and (include_active or name in finished)]
+    ranked = rank_candidates(candidates, sort)[:limit]
+    _display_plan(ranked, sort)
+    if skipped and not include_active:
+        console.print(f"[dim]Skipped {len(skipped)} indices still taking writes (use --include-active to consider them).[/dim]")
+    blocked = sorted(read_only & set(indices))
+    if blocked:
+        console.print(f"[yellow]Skipped {len(blocked)} read-only indices (force merge is rejected by the block): {', '.join(blocked)}[/yellow]")
+    if not ranked:
+        console.print("[green]Nothing to optimize.[/green]")
+        return
+    if not apply:
+        console.print("[dim]Plan only. Re-run with --apply to force merge these indices.[/dim]")
+        return
+
+    _execute(client, ranked, max_num_segments, expunge_deletes, concurrency, per_node, int(headroom_gb * 1024 ** 3), timeout)
+
+
+def _blocked_indices(settings: Dict[str, Any], blocks) -> Set[str]:
+    return {
+        index for index, details in settings.items()
+        if any(str(details.get("settings", {}).get(key)).lower() == "true" for key in blocks)
+    }
+
+
+def _finished_indices(settings: Dict[str, Any], metadata: Dict[str, Any]) -> Set[str]:
+    finished = _blocked_indices(settings, (_WRITE_BLOCK,))
+    # Rollover records itself on the old index, with or without is_write_index
+    # aliases. Alias membership alone says nothing: a read alias over daily
+    # indices also covers the one being written.
+    for index, details in metadata.get("metadata", {}).get("indices", {}).items():
+        if details.get("rollover_info"):
+            finished.add(index)
+    return finished
+
+
+def _execute(
+    client: OpenSearchClient,
+    queue: List[Dict[str, Any]],
+    max_num_segments: int,
+    expunge_deletes: bool,
+    concurrency: int,
+    per_node: int,
+    headroom_bytes: int,
+    timeout: float,
+):
+    queue = list(queue)
+    running: Dict[str, Dict[str, Any]] = {}
+    node_active: Dict[str, int] = {}
+    done: List[Dict[str, Any]] = []
+    failed: List[str] = []
+    params = {"wait_for_completion": "false"}
+    if expunge_deletes:
+        params["only_expunge_deletes"] = "true"
+    else:
+        params["max_num_segments"] = str(max_num_segments)
+
+    deadline = time.monotonic() + timeout
+    intervals = backoff_intervals(initial=2.0, factor=1.5, maximum=30.0)
+    while queue or running:
+        try:
+            node_free = _node_free_bytes(client)
+        except Exception as e:
+            # Missing disk figures are not zero free disk: retry until the deadline.
+            if time.monotonic() > deadline:
+                console.print(f"[yellow]Timed out reading disk allocation ({e}); {len(running)} merges keep running on the cluster.[/yellow]")
+                break
+            console.print(f"[yellow]Could not read disk allocation, retrying:[/yellow] {e}")
+            time.sleep(next(intervals))
+            continue
+        # Disk the running merges are still going to write.
+        for entry in running.values():
+            for node, size in entry["index"]["node_bytes"].items():
+                node_free[node] = node_free.get(node, 0) - size
+
+        while len(running) < concurrency:
+            index = next_runnable(queue, node_active, node_free, per_node, headroom_bytes)
+            if index is None:
+                break
+            queue.remove(index)
+            try:
+                response = client.post(f"{index['index']}/_forcemerge", params=params, tag="segments_forcemerge") or {}
+            except Exception as e:
+                console.print(f"[bold red]Error force merging {index['index']}:[/bold red] {e}")
+                failed.append(index["index"])
+                continue
+            for node, size in index["node_bytes"].items():
+                node_active[node] = node_active.get(node, 0) + 1
+                node_free[node] = node_free.get(node, 0) - size
+            running[index["index"]] = {"index": index, "task": response.get("task"), "started": time.monotonic()}
+            console.print(f"[cyan]Force merging {index['index']} ({index['segments']} segments, task {response.get('task', '-')})[/cyan]")
+
+        if not running:
+            for index in queue:
+                console.print(f"[yellow]Not merged: {index['index']} needs more disk headroom than its nodes have.[/yellow]")
+            break
+        if time.monotonic() > deadline:
+            console.print(f"[yellow]Timed out; {len(running)} merges keep running on the cluster.[/yellow]")
+            break
+
+        time.sleep(next(intervals))
+        for name, entry in list(running.items()):
+            error = None
+            try:
+                if _task_running(client, entry["task"]):
+                    continue
+            except Exception as e:
+                error = e
+            del running[name]
+            for node in entry["index"]["node_bytes"]:
+                node_active[node] -= 1
+            intervals = backoff_intervals(initial=2.0, factor=1.5, maximum=30.0)
+            if error is not None:
+                console.print(f"[bold red]Error in force merge of {name}:[/bold red] {error}")
+                failed.append(name)
+                continue
+            entry["elapsed"] = time.monotonic() - entry["started"]
+            done.append(entry)
+            console.print(f"[green]Finished {name} in {entry['elapsed']:.0f}s[/green]")
+
+    if failed:
+        console.print(f"[bold red]{len(failed)} force merges failed:[/bold red] {', '.join(failed)}")
+    if done:
+        _display_results(client, done)
+
+
+def _task_running(client: OpenSearchClient, task_id: Optional[str]) -> bool:
+    """Whether the merge task is still running; raises if it ended with an error."""
+    if not task_id:
+        # Older clusters merge synchronously; the request returned when it was done.
+        return False
+    response = client.get(f"_tasks/{task_id}", tag="segments_task") or {}
+    if response.get("error"):
+        raise RuntimeError(f"task {task_id} failed: {response['error']}")
+    return bool(response) and not response.get("completed")
+
+
+def _node_free_bytes(client: OpenSearchClient) -> Dict[str, int]:
+    rows = client.get("_cat/allocation", params={"format": "json", "bytes": "b", "h": "node,disk.avail"}, tag="segments_allocation")
+    return {row["node"]: int(row.get("disk.avail") or 0) for row in rows or [] if isinstance(row, dict)}
+
+
+def _display_plan(ranked: List[Dict[str, Any]], sort: str):
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Index", style="cyan")
+    table.add_column("Shards", justify="right")
+    table.add_column("Segments", justify="right")
+    table.add_column("Seg/Shard", justify="right", style="green")
+    table.add_column("Deleted", justify="right")
+    table.add_column("Reclaim", justify="right", style="green")
+    table.add_column("Size", justify="right")
+    table.add_column("Nodes")
+    for index in ranked:
+        table.add_row(
+            index["index"],
+            str(index["shards"]),
+            str(index["segments"]),
+            f"{index['segments'] / max(1, index['shards']):.1f}",
+            f"{index['deleted']:,}",
+            format_bytes(index["reclaim_bytes"]),
+            format_bytes(index["bytes"]),
+            str(len(index["node_bytes"])),
+        )
+    console.print(Panel(table, title=f"Force-Merge Candidates (by {sort} gain)", expand=False))
+
+
+def _display_results(client: OpenSearchClient, done: List[Dict[str, Any]]):
+    names = ",".join(entry["index"]["index"] for entry in done)
+    stats = client.get(f"{names}/_stats/segments,docs,store", tag="segments_after") or {}
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Index", style="cyan")
+    table.add_column("Segments", justify="right")
+    table.add_column("Size", justify="right")
+    table.add_column("Time", justify="right")
+    for entry in done:
+        before = entry["index"]
+        after = stats.get("indices", {}).get(before["index"], {}).get("primaries", {})
+        segments_after = after.get("segments", {}).get("count", "?")
+        size_after = after.get("store", {}).get("size_in_bytes")
+        table.add_row(
+            before["index"],
+            f"{before['segments']} → {segments_after}",
+            f"{format_bytes(before['bytes'])} → {format_bytes(size_after) if size_after is not None else '?'}",
+            f"{entry['elapsed']:.0f}s",
+        )
+    console.print(Panel(table, title="Force-Merge Results", expand=False))
+
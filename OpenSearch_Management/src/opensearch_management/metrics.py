@@ -0,0 +1,352 @@
+import atexit
+import bisect
+import math
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError
+from urllib3.util.connection import allowed_gai_family
+
+# Upper bounds of histogram buckets (Prometheus `le` labels).
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, math.inf)
+SIZE_BUCKETS_BYTES = tuple(256 * 4 ** i for i in range(10)) + (math.inf,)
+
+REQUEST_METRICS = ("dns_ms", "connect_ms", "ttfb_ms", "total_ms", "parse_ms", "request_bytes", "response_bytes")
+
+_current = threading.local()
+
+
+class Histogram:
+    """Fixed-bucket histogram with count/sum/min/max; percentiles are interpolated within buckets."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = min(self.buckets[i], self.max)
+                lower = max(lower, self.min)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class MetricsRegistry:
+    """
+    In-process request metrics: one histogram per (tag, metric). Hooks are
+    called with every request record, e.g. to export metrics elsewhere.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._hooks: List[Callable[[Dict[str, Any]], None]] = []
+
+    def observe(self, tag: str, metric: str, value: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((tag, metric))
+            if histogram is None:
+                buckets = SIZE_BUCKETS_BYTES if metric.endswith("_bytes") else LATENCY_BUCKETS_MS
+                histogram = self._histograms[(tag, metric)] = Histogram(buckets)
+            histogram.observe(value)
+
+    def record_request(self, record: Dict[str, Any]) -> None:
+        tag = record["tag"]
+        for metric in REQUEST_METRICS:
+            if record.get(metric) is not None:
+                self.observe(tag, metric, record[metric])
+        if record.get("error"):
+            with self._lock:
+                self._errors[tag] = self._errors.get(tag, 0) + 1
+        for hook in list(self._hooks):
+            hook(record)
+
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            if hook not in self._hooks:
+                self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[Dict[str, Any]], None]) -> None:
+        with self._lock:
+            if hook in self._hooks:
+                self._hooks.remove(hook)
+
+    def histograms(self) -> Dict[Tuple[str, str], Histogram]:
+        with self._lock:
+            return dict(self._histograms)
+
+    def errors(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._errors)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._errors.clear()
+
+
+registry = MetricsRegistry()
+
+
+# --- Per-request phase timing ---------------------------------------------
+
+def begin_request() -> Dict[str, float]:
+    """Starts collecting connection-phase timings for the request made on this thread."""
+    _current.timings = {"dns_ms": 0.0, "connect_ms": 0.0}
+    return _current.timings
+
+
+def end_request() -> None:
+    _current.timings = None
+
+
+def _add_timing(key: str, started: float) -> None:
+    timings = getattr(_current, "timings", None)
+    if timings is not None:
+        timings[key] += (time.perf_counter() - started) * 1000
+
+
+_exporters_lock = threading.Lock()
+
+
+class _TimedResolveMixin:
+    """
+    Resolves the host itself, timed, and then connects to each address in
+    turn. The addresses are numeric, so urllib3 does no second lookup.
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            results = socket.getaddrinfo(host.strip("[]"), self.port, allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        finally:
+            _add_timing("dns_ms", started)
+
+        error: Optional[Exception] = None
+        try:
+            for address in dict.fromkeys(sockaddr[0] for *_, sockaddr in results):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError as e:  # Also NewConnectionError.
+                    error = e
+        finally:
+            self._dns_host = host
+        raise error or OSError("getaddrinfo returns an empty list")
+
+
+class _TimedHTTPConnection(_TimedResolveMixin, HTTPConnection):
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_timing("connect_ms", started)
+
+
+class _TimedHTTPSConnection(_TimedResolveMixin, HTTPSConnection):
+    def connect(self):
+        # Includes the TLS handshake.
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_timing("connect_ms", started)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class InstrumentedAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report DNS and connect (TCP + TLS) time."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+# --- Exporters and reports ---------------------------------------------------
+
+class PrometheusTextfileExporter:
+    """
+    Registry hook that writes all histograms in Prometheus text format for the
+    node_exporter textfile collector. Writes at most every `min_interval`
+    seconds and once more at exit, atomically (tmp file + rename).
+    """
+
+    def __init__(self, path: str, min_interval: float = 5.0, metrics: Optional[MetricsRegistry] = None):
+        self.path = path
+        self.min_interval = min_interval
+        self.registry = metrics or registry
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        if time.monotonic() - self._last_write >= self.min_interval:
+            self.write()
+
+    def write(self) -> None:
+        with self._lock:
+            self._last_write = time.monotonic()
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(render_prometheus(self.registry))
+            os.replace(tmp_path, self.path)
+
+
+_exporters: Dict[str, PrometheusTextfileExporter] = {}
+
+
+def enable_textfile_export(path: str) -> PrometheusTextfileExporter:
+    """Registers (once per path) a textfile exporter hook that also writes at exit."""
+    with _exporters_lock:
+        exporter = _exporters.get(path)
+        if exporter is None:
+            exporter = _exporters[path] = PrometheusTextfileExporter(path)
+            registry.add_hook(exporter)
+            atexit.register(exporter.write)
+    return exporter
+
+
+def render_prometheus(metrics: MetricsRegistry) -> str:
+    lines: List[str] = []
+    by_metric: Dict[str, List[Tuple[str, Histogram]]] = {}
+    for (tag, metric), histogram in sorted(metrics.histograms().items()):
+        by_metric.setdefault(metric, []).append((tag, histogram))
+
+    for metric, series in by_metric.items():
+        name = f"opensearch_manager_request_{metric}"
+        lines.append(f"# HELP {name} OpenSearch request {metric.replace('_', ' ')} by tag.")
+        lines.append(f"# TYPE {name} histogram")
+        for tag, histogram in series:
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                le = "+Inf" if math.isinf(bound) else f"{bound:g}"
+                lines.append(f'{name}_bucket{{tag="{tag}",le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{tag="{tag}"}} {histogram.sum:g}')
+            lines.append(f'{name}_count{{tag="{tag}"}} {histogram.count}')
+
+    errors = metrics.errors()
+    if errors:
+        lines.append("# HELP opensearch_manager_request_errors_total Failed OpenSearch requests by tag.")
+        lines.append("# TYPE opensearch_manager_request_errors_total counter")
+        for tag, count in sorted(errors.items()):
+            lines.append(f'opensearch_manager_request_errors_total{{tag="{tag}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def display_report(wall_seconds: float, metrics: Optional[MetricsRegistry] = None):
+    """Per-tag latency breakdown plus how much of the wall time was spent outside requests."""
+    from rich.console import Console
+    from rich.table import Table
+    from rich.panel import Panel
+
+    metrics = metrics or registry
+    histograms = metrics.histograms()
+    errors = metrics.errors()
+    tags = sorted({tag for tag, _ in histograms}, key=lambda t: -histograms[(t, "total_ms")].sum)
+
+    table = Table(show_header=True, header_style="bold magenta", box=None)
+    table.add_column("Tag", style="cyan")
+    table.add_column("Count", justify="right")
+    table.add_column("Err", justify="right")
+    for column in ("p50", "p95", "max", "DNS", "Connect", "TTFB", "Parse"):
+        table.add_column(column, justify="right", style="green")
+    table.add_column("Sent", justify="right")
+    table.add_column("Recv", justify="right")
+
+    request_ms = 0.0
+    for tag in tags:
+        total = histograms[(tag, "total_ms")]
+        request_ms += total.sum
+
+        def mean(metric: str) -> str:
+            histogram = histograms.get((tag, metric))
+            return f"{histogram.mean:.1f}" if histogram else "-"
+
+        def size(metric: str) -> str:
+            histogram = histograms.get((tag, metric))
+            return format_bytes(histogram.sum) if histogram else "-"
+
+        table.add_row(
+            tag, str(total.count), str(errors.get(tag, 0) or ""),
+            f"{total.percentile(50):.1f}", f"{total.percentile(95):.1f}", f"{total.max:.1f}",
+            mean("dns_ms"), mean("connect_ms"), mean("ttfb_ms"), mean("parse_ms"),
+            size("request_bytes"), size("response_bytes"),
+        )
+
+    console = Console(stderr=True)
+    console.print(Panel(table, title="Request Profile (ms; DNS/Connect/TTFB/Parse are means)", expand=False))
+
+    wall_ms = wall_seconds * 1000
+    console.print(
+        f"Wall time [bold]{wall_ms:,.0f} ms[/bold]; requests [bold]{request_ms:,.0f} ms[/bold] (summed across threads); "
+        f"outside requests ≈ [bold]{max(0.0, wall_ms - request_ms):,.0f} ms[/bold] (rendering and local work, for serial commands)"
+    )
+
+
+def display_cpu_profile(profiler, limit: int = 25, path: Optional[str] = None):
+    """Prints the hottest functions of this package (the logic layer) by cumulative time."""
+    import io
+    import pstats
+
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        profiler.dump_stats(path)
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream).sort_stats("cumulative")
+    stats.print_stats("opensearch_management", limit)
+    print(stream.getvalue(), end="", file=sys.stderr)
+    if path:
+        print(f"Full profile written to {path}", file=sys.stderr)
+
+
+def format_bytes(value: float) -> str:
+    """Human-readable size with binary units, e.g. `1.5 GB`."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
@@ -0,0 +1,285 @@
+"""
+Interactive shell, Unix-socket daemon and the console entry point.
+
+This module is imported on every invocation, so it only uses the standard
+library at import time: when a daemon is listening, the command is forwarded
+to it without importing typer, pydantic or requests at all.
+"""
+import io
+import json
+import os
+import shlex
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+SOCKET_ENV = "OPENSEARCH_MANAGER_SOCKET"
+NO_DAEMON_ENV = "OPENSEARCH_MANAGER_NO_DAEMON"
+DEFAULT_SOCKET = os.path.join(".opensearch-manager", "daemon.sock")
+
+# Commands that must run in the calling process.
+_LOCAL_COMMANDS = {"shell", "daemon"}
+# Streaming or long-running commands also run locally: in the daemon they
+# would hold its single command slot, blocking every other invocation.
+_LONG_RUNNING = {
+    ("tail",), ("datagen",), ("search", "async"), ("neural", "backfill"), ("neural", "bench"),
+    ("cluster", "wait"), ("cluster", "wait-task"), ("cluster", "diagnose"), ("segments", "optimize"),
+    ("field", "materialize"),
+}
+# Global options that take a value, so the command path can be found after them.
+_VALUE_OPTIONS = {"--config", "-c", "--cluster", "--clusters", "--fanout-workers"}
+
+
+def default_socket_path() -> str:
+    return os.environ.get(SOCKET_ENV, DEFAULT_SOCKET)
+
+
+def main() -> None:
+    """Console entry point: forward to a running daemon if there is one, else run locally."""
+    argv = sys.argv[1:]
+    if not os.environ.get(NO_DAEMON_ENV) and not runs_locally(argv):
+        exit_code = attach(argv, default_socket_path())
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from .cli import app
+
+    app(prog_name="opensearch-manager")
+
+
+def command_path(argv: List[str]) -> List[str]:
+    """The command and subcommand tokens of `argv`, skipping the global options before them."""
+    path: List[str] = []
+    tokens = iter(argv)
+    for token in tokens:
+        if token.startswith("-"):
+            if token in _VALUE_OPTIONS:
+                next(tokens, None)
+            continue
+        path.append(token)
+        if len(path) == 2:
+            break
+    return path
+
+
+def runs_locally(argv: List[str]) -> bool:
+    """Whether `argv` must run in the calling process rather than be forwarded to the daemon."""
+    path = tuple(command_path(argv))
+    return bool(path) and (path[0] in _LOCAL_COMMANDS or path[:1] in _LONG_RUNNING or path in _LONG_RUNNING)
+
+
+def run_command(argv: List[str], pool: Any) -> int:
+    """Runs one CLI command in-process against the warm contexts in `pool`; returns its exit code."""
+    from .cli import app
+
+    try:
+        app(args=argv, obj=pool, prog_name="opensearch-manager")
+    except SystemExit as e:
+        # Typer always exits via SystemExit in standalone mode, also on success.
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def repl(pool: Any, base_args: Optional[List[str]] = None) -> None:
+    """Reads commands line by line and runs them with `base_args` (global options) prepended."""
+    try:
+        import readline  # noqa: F401  (line editing and history where available)
+    except ImportError:
+        pass
+
+    base_args = base_args or []
+    print("opensearch-manager shell. 'help' lists commands, 'reload' drops cached clients, 'exit' quits.")
+    while True:
+        try:
+            line = input("opensearch> ")
+        except EOFError:
+            print()
+            break
+        except KeyboardInterrupt:
+            print()
+            continue
+
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            continue
+        if not argv:
+            continue
+        if argv[0] in ("exit", "quit"):
+            break
+        if argv[0] == "reload":
+            pool.clear()
+            continue
+        if argv[0] == "help":
+            argv = argv[1:] + ["--help"]
+        if _LOCAL_COMMANDS.intersection(argv[:1]):
+            print(f"'{argv[0]}' is not available inside the shell.", file=sys.stderr)
+            continue
+
+        started = time.perf_counter()
+        exit_code = run_command(base_args + argv, pool)
+        elapsed = time.perf_counter() - started
+        status = f"exit {exit_code}, " if exit_code else ""
+        print(f"({status}{elapsed:.2f}s)", file=sys.stderr)
+
+
+class _StreamWriter(io.TextIOBase):
+    """File-like object that forwards writes to the attached client as JSON-line frames."""
+
+    def __init__(self, channel: "_Channel", name: str):
+        self._channel = channel
+        self._name = name
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            try:
+                self._channel.send({"stream": self._name, "data": text})
+            except OSError:
+                # The client is gone (e.g. Ctrl-C): stop the command as a local Ctrl-C would.
+                raise KeyboardInterrupt
+        return len(text)
+
+
+class _Channel:
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sock.sendall((json.dumps(message) + "\n").encode("utf-8"))
+
+
+def serve(socket_path: str, pool: Any) -> None:
+    """
+    Serves commands over a Unix socket until stopped.
+
+    Commands run one at a time: they share the process-wide stdout/stderr
+    (redirected to the calling client) and working directory. The socket is
+    created owner-only, since commands run with the daemon's credentials.
+    """
+    import contextlib
+    import socketserver
+
+    started_at = time.time()
+    run_lock = threading.Lock()
+    counters = {"commands": 0}
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline() or b"{}")
+            channel = _Channel(self.request)
+
+            control = request.get("control")
+            if control == "ping":
+                channel.send({"exit": 0, "pid": os.getpid(), "commands": counters["commands"], "uptime": time.time() - started_at})
+                return
+            if control == "stop":
+                # Unlink first so new invocations run locally instead of connecting.
+                with contextlib.suppress(OSError):
+                    os.unlink(socket_path)
+                channel.send({"exit": 0})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+            with run_lock:
+                previous_cwd = os.getcwd()
+                try:
+                    os.chdir(request.get("cwd") or previous_cwd)
+                    with contextlib.redirect_stdout(_StreamWriter(channel, "stdout")), \
+                            contextlib.redirect_stderr(_StreamWriter(channel, "stderr")):
+                        exit_code = run_command(request.get("argv", []), pool)
+                finally:
+                    os.chdir(previous_cwd)
+                counters["commands"] += 1
+            with contextlib.suppress(OSError):
+                channel.send({"exit": exit_code})
+
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    if os.path.exists(socket_path):
+        if send_control(socket_path, "ping"):
+            print(f"A daemon is already listening on {socket_path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(socket_path)
+
+    previous_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(previous_umask)
+    server.daemon_threads = True
+
+    print(f"Daemon pid {os.getpid()} listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def attach(argv: List[str], socket_path: str) -> Optional[int]:
+    """Runs `argv` on the daemon, streaming its output; returns None when no daemon is reachable."""
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+
+    received = False
+    try:
+        with sock, sock.makefile("rb") as replies:
+            sock.sendall((json.dumps({"argv": argv, "cwd": os.getcwd()}) + "\n").encode("utf-8"))
+            for line in replies:
+                received = True
+                message = json.loads(line)
+                if "exit" in message:
+                    return message["exit"]
+                stream = sys.stderr if message.get("stream") == "stderr" else sys.stdout
+                stream.write(message.get("data", ""))
+                stream.flush()
+    except OSError:
+        pass
+    except KeyboardInterrupt:
+        # Closing the connection interrupts the command on its next output.
+        return 130
+    # Nothing received: the daemon was shutting down, so run locally instead.
+    # Otherwise it went away mid-command.
+    return 1 if received else None
+
+
+def send_control(socket_path: str, control: str) -> Optional[Dict[str, Any]]:
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    try:
+        with sock, sock.makefile("rb") as replies:
+            sock.sendall((json.dumps({"control": control}) + "\n").encode("utf-8"))
+            line = replies.readline()
+    except OSError:
+        return None
+    return json.loads(line) if line else None
+
+
+def _connect(socket_path: str) -> Optional[socket.socket]:
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        # Stale socket file left by a daemon that did not shut down cleanly.
+        sock.close()
+        return None
+    return sock
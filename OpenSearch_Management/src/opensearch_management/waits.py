@@ -0,0 +1,143 @@
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+import structlog
+from .client import OpenSearchClient
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+# Pass as `params` on write requests so they return once the change is searchable.
+REFRESH_WAIT_FOR = {"refresh": "wait_for"}
+
+# Server-side waits are chunked below the client's HTTP timeout (30s).
+_MAX_SERVER_WAIT = 20.0
+
+_HEALTH_ORDER = {"red": 0, "yellow": 1, "green": 2}
+
+
+class WaitTimeout(TimeoutError):
+    """Raised when a readiness condition is not met within its timeout."""
+
+
+def backoff_intervals(
+    initial: float = 0.1, factor: float = 1.5, maximum: float = 5.0
+) -> Iterator[float]:
+    """Yields polling intervals that grow geometrically up to `maximum`."""
+    interval = initial
+    while True:
+        yield interval
+        interval = min(interval * factor, maximum)
+
+
+def poll_until(
+    check: Callable[[], Optional[T]],
+    timeout: float = 60.0,
+    initial: float = 0.1,
+    factor: float = 1.5,
+    maximum: float = 5.0,
+    description: str = "condition",
+) -> T:
+    """
+    Calls `check` until it returns a truthy value, backing off between attempts.
+
+    Fast conditions finish after ~100ms instead of a fixed sleep; slow ones are
+    polled at most every `maximum` seconds.
+    """
+    deadline = time.monotonic() + timeout
+    for interval in backoff_intervals(initial, factor, maximum):
+        result = check()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WaitTimeout(f"Timed out after {timeout:.0f}s waiting for {description}")
+        time.sleep(min(interval, remaining))
+    raise AssertionError("unreachable")
+
+
+def wait_for_cluster_health(
+    client: OpenSearchClient,
+    status: str = "yellow",
+    index: Optional[str] = None,
+    timeout: float = 60.0,
+) -> Dict[str, Any]:
+    """
+    Blocks until the cluster (or `index`) reaches at least `status`.
+
+    Uses `_cluster/health?wait_for_status`, so the cluster answers as soon as the
+    status is reached rather than the client polling.
+    """
+    path = f"_cluster/health/{index}" if index else "_cluster/health"
+    deadline = time.monotonic() + timeout
+
+    while True:
+        chunk = max(1, int(min(deadline - time.monotonic(), _MAX_SERVER_WAIT)))
+        try:
+            response = client.get(
+                path,
+                params={"wait_for_status": status, "timeout": f"{chunk}s"},
+                tag="wait_cluster_health",
+            )
+        except Exception as e:
+            # The server-side wait timed out (HTTP 408); the body still carries the current health.
+            if getattr(getattr(e, "response", None), "status_code", None) != 408:
+                raise
+            response = _timed_out_health(e.response)
+        if not response:
+            # Dry run
+            return {}
+
+        reached = _HEALTH_ORDER.get(response.get("status"), -1) >= _HEALTH_ORDER[status]
+        if reached and not response.get("timed_out"):
+            return response
+        if time.monotonic() >= deadline:
+            raise WaitTimeout(
+                f"Cluster health for {index or 'cluster'} is {response.get('status')}, "
+                f"expected {status} within {timeout:.0f}s"
+            )
+        logger.info("Waiting for cluster health", status=response.get("status"), expected=status)
+
+
+def _timed_out_health(response: Any) -> Dict[str, Any]:
+    try:
+        health = response.json()
+    except ValueError:
+        health = {}
+    if not isinstance(health, dict):
+        health = {}
+    health["timed_out"] = True
+    return health
+
+
+def wait_for_task(
+    client: OpenSearchClient,
+    task_id: str,
+    timeout: float = 3600.0,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Waits for a background task (reindex, update_by_query, forcemerge, ...) to complete.
+
+    Returns the completed task document; raises `RuntimeError` if the task
+    reported an error and `WaitTimeout` if it is still running after `timeout`.
+    """
+
+    def _check() -> Optional[Dict[str, Any]]:
+        response = client.get(f"_tasks/{task_id}", tag="wait_task")
+        if not response:
+            # Dry run
+            return {"completed": True}
+        if on_progress:
+            on_progress(response.get("task", {}).get("status", {}))
+        return response if response.get("completed") else None
+
+    result = poll_until(_check, timeout=timeout, initial=0.5, maximum=10.0, description=f"task {task_id}")
+    if result.get("error"):
+        raise RuntimeError(f"Task {task_id} failed: {result['error']}")
+    return result
+
+
+def refresh(client: OpenSearchClient, index: str) -> Dict[str, Any]:
+    """Makes all operations on `index` searchable now, instead of sleeping past the refresh interval."""
+    return client.post(f"{index}/_refresh", tag="refresh")
@@ -0,0 +1,152 @@
+"""
+Benchmark fixtures.
+
+`bench(fn, *args)` times `fn` pytest-benchmark style (warm-up, then repeated
+rounds). Each round is paired with a run of a fixed reference workload,
+and the score is the fastest round divided by the fastest reference run.
+Both are measured under the same load at the same time, so the score
+depends neither on how fast the machine is nor on what else it is doing.
+The fastest runs are the ones least affected by other processes. The test
+fails when the score exceeds the `relative` score in `baseline.json` by
+more than BENCH_TOLERANCE (default 1.5). Set BENCH_SAVE to a path to write the
+measured scores there in the baseline's format, e.g. to refresh the
+baseline after an intended change.
+"""
+from typing import Any, Callable, Dict, List
+import io
+import json
+import os
+import statistics
+import time
+
+import pytest
+from rich.console import Console
+
+from fake_opensearch import FakeOpenSearch
+from opensearch_management import config, log_setup
+from opensearch_management.client import OpenSearchClient
+from opensearch_management.config import AppSettings, AuthConfig, ConnectionConfig, Settings
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+_results: Dict[str, Dict[str, float]] = {}
+
+
+def _load_baseline() -> Dict[str, Any]:
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+_REFERENCE_PAYLOAD = {f"field_{i}": {"type": "keyword", "doc_count": i, "values": list(range(20))} for i in range(2000)}
+
+
+def _reference_ms() -> float:
+    """One run of the reference workload: JSON and dict work, like most of what the benchmarks exercise."""
+    started = time.perf_counter()
+    decoded = json.loads(json.dumps(_REFERENCE_PAYLOAD))
+    sorted(decoded.items(), key=lambda item: item[1]["doc_count"], reverse=True)
+    return (time.perf_counter() - started) * 1000
+
+
+@pytest.fixture(scope="session", autouse=True)
+def quiet_logging():
+    """Configures logging at WARNING, so per-request DEBUG lines are not rendered inside the timed loops."""
+    previous = config._settings_instance
+    config._settings_instance = Settings(settings=AppSettings(log_level="WARNING"))
+    log_setup.configure_logging()
+    yield
+    log_setup._shutdown()
+    config._settings_instance = previous
+
+
+@pytest.fixture
+def fake_cluster(tmp_path):
+    """Starts a FakeOpenSearch with the given options; returns (server, client)."""
+    servers: List[FakeOpenSearch] = []
+
+    def start(**options):
+        server = FakeOpenSearch(**options).start()
+        servers.append(server)
+        settings = Settings(
+            connection=ConnectionConfig(hosts=["127.0.0.1"], port=server.port, use_ssl=False, verify_certs=False),
+            auth=AuthConfig(type="basic", username="admin", password="admin"),
+            settings=AppSettings(state_dir=str(tmp_path), history_dir=str(tmp_path / "history")),
+        )
+        return server, OpenSearchClient(settings=settings)
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def quiet_console(monkeypatch):
+    """Renders rich output of the given modules into memory at a fixed width."""
+
+    def apply(*modules):
+        console = Console(file=io.StringIO(), width=160, color_system="truecolor", force_terminal=True)
+        for module in modules:
+            monkeypatch.setattr(module, "console", console)
+        return console
+
+    return apply
+
+
+@pytest.fixture
+def bench(request):
+    name = request.node.name
+    baseline = _load_baseline().get(name, {}).get("relative")
+
+    def run(fn: Callable[..., Any], *args, rounds: int = 5, warmup: int = 1, **kwargs) -> Any:
+        result = None
+        for _ in range(warmup):
+            result = fn(*args, **kwargs)
+        timings, references = [], []
+        for _ in range(rounds):
+            references.append(min(_reference_ms() for _ in range(3)))
+            started = time.perf_counter()
+            result = fn(*args, **kwargs)
+            timings.append((time.perf_counter() - started) * 1000)
+        references.append(min(_reference_ms() for _ in range(3)))
+
+        best = min(timings)
+        reference_ms = min(references)
+        relative = best / reference_ms
+        _results[name] = {
+            "relative": round(relative, 3),
+            "min_ms": round(best, 3),
+            "median_ms": round(statistics.median(timings), 3),
+            "reference_ms": round(reference_ms, 3),
+            "rounds": rounds,
+        }
+        if baseline is not None:
+            limit = baseline * float(os.environ.get("BENCH_TOLERANCE", "1.5"))
+            _results[name]["baseline"] = baseline
+            if relative > limit:
+                pytest.fail(
+                    f"{name}: {best:.1f} ms is {relative:.2f}x the reference workload ({reference_ms:.1f} ms), "
+                    f"above the limit of {limit:.2f}x (baseline {baseline}x)"
+                )
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    terminalreporter.section("benchmarks")
+    reference = next(iter(_results.values()))["reference_ms"]
+    terminalreporter.write_line(f"reference workload: {reference:.2f} ms")
+    terminalreporter.write_line(f"{'name':<44}{'min ms':>10}{'median ms':>12}{'relative':>10}{'baseline':>10}")
+    for name, result in sorted(_results.items()):
+        baseline = result.get("baseline")
+        terminalreporter.write_line(
+            f"{name:<44}{result['min_ms']:>10.2f}{result['median_ms']:>12.2f}{result['relative']:>10.3f}{baseline if baseline is not None else '-':>10}"
+        )
+    save_path = os.environ.get("BENCH_SAVE")
+    if save_path:
+        # Same shape as baseline.json, so the file can replace it as is.
+        scores = {name: {"relative": result["relative"]} for name, result in _results.items()}
+        with open(save_path, "w") as f:
+            json.dump(scores, f, indent=2, sort_keys=True)
+        terminalreporter.write_line(f"Saved results to {save_path}")
@@ -0,0 +1,233 @@
+"""
+Local stand-in for an OpenSearch cluster, for benchmarks.
+
+Serves synthetic but realistically shaped `_stats`, `_mapping`, index
+details, `_analyze`, `_bulk` and `_search` responses over plain HTTP on a
+loopback port, with an optional per-request latency. GET responses are
+serialized once and served from memory so the server stays off the
+critical path of what is being measured.
+"""
+from typing import Any, Dict, List, Optional
+import fnmatch
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+_FIELD_TYPES = ("keyword", "text", "long", "date", "ip", "double", "boolean", "float")
+
+
+def synthetic_properties(field_count: int, group_size: int = 100) -> Dict[str, Any]:
+    """Mapping properties with `field_count` leaf fields, grouped under objects of `group_size`."""
+    properties: Dict[str, Any] = {}
+    for number in range(field_count):
+        ftype = _FIELD_TYPES[number % len(_FIELD_TYPES)]
+        details: Dict[str, Any] = {"type": ftype}
+        if ftype == "text":
+            details["fields"] = {"keyword": {"type": "keyword", "ignore_above": 256}}
+        elif ftype == "keyword":
+            details["ignore_above"] = 1024
+        group = properties.setdefault(f"group_{number // group_size}", {"properties": {}})
+        group["properties"][f"field_{number}"] = details
+    return properties
+
+
+def synthetic_index_stats(docs: int = 100_000, size_bytes: int = 50 * 1024 ** 2) -> Dict[str, Any]:
+    shard = {
+        "docs": {"count": docs, "deleted": docs // 50},
+        "store": {"size_in_bytes": size_bytes},
+        "indexing": {"index_total": docs, "index_time_in_millis": docs // 10},
+        "search": {"query_total": docs // 4, "query_time_in_millis": docs // 40},
+        "segments": {"count": 24, "memory_in_bytes": size_bytes // 100},
+        "merges": {"total": 10, "total_time_in_millis": 1_000},
+        "refresh": {"total": 500, "total_time_in_millis": 2_000},
+    }
+    return {"uuid": "synthetic", "primaries": shard, "total": shard}
+
+
+class FakeOpenSearch:
+    """
+    Threaded HTTP server answering a subset of the OpenSearch REST API.
+
+    `indices` is the number of synthetic indices (`logs-000000` …), each with
+    `fields` mapped fields. `latency_ms` is slept in every request before
+    the response is written.
+    """
+
+    def __init__(self, indices: int = 10, fields: int = 20, hits: int = 10, latency_ms: float = 0.0):
+        self.index_names = [f"logs-{number:06d}" for number in range(indices)]
+        self.fields = fields
+        self.hits = hits
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._payloads: Dict[str, bytes] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None, "server is not running"
+        return self._server.server_address[1]
+
+    def start(self) -> "FakeOpenSearch":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out as separate writes; without this,
+            # delayed ACKs add ~40 ms to every keep-alive request.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                fake._handle(self, "GET")
+
+            def do_POST(self):
+                fake._handle(self, "POST")
+
+            def do_PUT(self):
+                fake._handle(self, "PUT")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeOpenSearch":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # --- Routing ---
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        with self._lock:
+            self.requests += 1
+        length = int(handler.headers.get("Content-Length") or 0)
+        raw_body = handler.rfile.read(length) if length else b""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        url = urlsplit(handler.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            status, payload = self._route(method, parts, params, raw_body)
+        except Exception as e:  # Report handler bugs to the client instead of hanging it.
+            status, payload = 500, json.dumps({"error": repr(e)}).encode("utf-8")
+
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _route(self, method: str, parts: List[str], params: Dict[str, str], raw_body: bytes):
+        endpoint = next((part for part in parts if part.startswith("_")), None)
+        target = parts[0] if parts and not parts[0].startswith("_") else "*"
+
+        if endpoint == "_bulk":
+            return 200, self._encode(self._bulk(raw_body.decode("utf-8")))
+        if endpoint == "_analyze":
+            return 200, self._encode(self._analyze(json.loads(raw_body or b"{}")))
+        if endpoint == "_search":
+            body = json.loads(raw_body or b"{}")
+            return 200, self._encode(self._search(target, int(body.get("size", params.get("size", self.hits)))))
+        if method != "GET":
+            return 404, self._encode({"error": f"no handler for {method} {'/'.join(parts)}", "status": 404})
+
+        key = "/".join(parts)
+        if key not in self._payloads:
+            if endpoint is None and parts:
+                response = self._index_details(target)
+            elif endpoint == "_stats":
+                response = self._stats(target)
+            elif endpoint == "_mapping":
+                response = {name: {"mappings": self._mappings()} for name in self._match(target)}
+            elif endpoint == "_cluster" and parts[-1] == "health":
+                response = {"cluster_name": "fake", "status": "green", "number_of_nodes": 3}
+            else:
+                return 404, self._encode({"error": f"no handler for GET {key}", "status": 404})
+            self._payloads[key] = self._encode(response)
+        return 200, self._payloads[key]
+
+    # --- Payloads ---
+
+    def _match(self, target: str) -> List[str]:
+        patterns = target.split(",")
+        if patterns in (["*"], ["_all"]):
+            return self.index_names
+        return [name for name in self.index_names if any(fnmatch.fnmatchcase(name, p) for p in patterns)]
+
+    def _mappings(self) -> Dict[str, Any]:
+        return {"properties": synthetic_properties(self.fields)}
+
+    def _index_details(self, target: str) -> Dict[str, Any]:
+        mappings = self._mappings()
+        return {
+            name: {
+                "aliases": {"logs": {}} if number else {"logs": {"is_write_index": True}},
+                "mappings": mappings,
+                "settings": {"index": {
+                    "number_of_shards": "3",
+                    "number_of_replicas": "1",
+                    "refresh_interval": "30s",
+                    "translog": {"durability": "async", "sync_interval": "10s"},
+                    "max_result_window": "10000",
+                    "provided_name": name,
+                    "uuid": f"uuid-{name}",
+                }},
+            }
+            for number, name in enumerate(self._match(target))
+        }
+
+    def _stats(self, target: str) -> Dict[str, Any]:
+        indices = {name: synthetic_index_stats() for name in self._match(target)}
+        return {"_shards": {"total": 6 * len(indices), "successful": 6 * len(indices), "failed": 0},
+                "_all": synthetic_index_stats(), "indices": indices}
+
+    def _bulk(self, payload: str) -> Dict[str, Any]:
+        lines = payload.splitlines()
+        items = []
+        for line in lines[::2]:
+            action, meta = next(iter(json.loads(line).items()))
+            items.append({action: {"_index": meta.get("_index", "logs"), "result": "created", "status": 201}})
+        return {"took": 1, "errors": False, "items": items}
+
+    def _analyze(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        text = body.get("text", "")
+        texts = text if isinstance(text, list) else [text]
+        tokens = []
+        for value in texts:
+            for position, token in enumerate(value.lower().split()):
+                tokens.append({"token": token, "start_offset": 0, "end_offset": len(token), "type": "<ALPHANUM>", "position": position})
+        return {"tokens": tokens}
+
+    def _search(self, target: str, size: int) -> Dict[str, Any]:
+        names = self._match(target) or [target]
+        hits = [
+            {
+                "_index": names[number % len(names)],
+                "_id": str(number),
+                "_score": 1.0,
+                "_source": {"@timestamp": "2024-01-01T00:00:00Z", "message": f"synthetic log line {number}", "level": "INFO", "duration_ms": number},
+            }
+            for number in range(size)
+        ]
+        return {"took": 1, "timed_out": False, "hits": {"total": {"value": size, "relation": "eq"}, "max_score": 1.0, "hits": hits}}
+
+    @staticmethod
+    def _encode(response: Dict[str, Any]) -> bytes:
+        return json.dumps(response).encode("utf-8")
@@ -0,0 +1,62 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_sequential_get_throughput(fake_cluster, bench):
+    _, client = fake_cluster()
+
+    def run():
+        for _ in range(200):
+            client.get("_cluster/health", tag="bench_health")
+
+    bench(run)
+
+
+def test_threaded_get_throughput_with_latency(fake_cluster, bench):
+    # 400 requests at 2 ms each: bounded by the connection pool, not the server.
+    _, client = fake_cluster(latency_ms=2.0)
+
+    def run():
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(lambda _: client.get("_cluster/health", tag="bench_health"), range(400)))
+
+    bench(run, rounds=3)
+
+
+def test_stats_5000_indices(fake_cluster, bench):
+    _, client = fake_cluster(indices=5000)
+    response = bench(client.get, "_stats", tag="bench_stats")
+    assert len(response["indices"]) == 5000
+
+
+def test_mapping_20k_fields(fake_cluster, bench):
+    _, client = fake_cluster(indices=1, fields=20_000)
+    response = bench(client.get, "logs-000000/_mapping", tag="bench_mapping")
+    assert len(response["logs-000000"]["mappings"]["properties"]) == 200
+
+
+def test_bulk_5000_documents(fake_cluster, bench):
+    _, client = fake_cluster()
+    payload = "".join(
+        json.dumps({"index": {"_index": "logs-000000"}}) + "\n" + json.dumps({"message": f"line {n}", "level": "INFO"}) + "\n"
+        for n in range(5000)
+    )
+    response = bench(client.bulk, payload, tag="bench_bulk")
+    assert len(response["items"]) == 5000
+
+
+def test_search_1000_hits(fake_cluster, bench):
+    _, client = fake_cluster()
+    response = bench(client.post, "logs-000000/_search", body={"size": 1000, "query": {"match_all": {}}}, tag="bench_search")
+    assert len(response["hits"]["hits"]) == 1000
+
+
+def test_analyze_10k_tokens(fake_cluster, bench):
+    _, client = fake_cluster()
+    text = " ".join(f"token{n}" for n in range(10_000))
+    response = bench(client.post, "_analyze", body={"analyzer": "standard", "text": text}, tag="bench_analyze")
+    assert len(response["tokens"]) == 10_000
@@ -0,0 +1,39 @@
+import pytest
+
+from fake_opensearch import synthetic_properties
+from opensearch_management.logic import index_operations, knn_memory
+from opensearch_management.logic.index_operations import _display_field_analysis, _flatten_dict, flatten_fields, get_index_details
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_flatten_fields_20k(bench):
+    properties = synthetic_properties(20_000)
+    fields = bench(flatten_fields, properties)
+    # Every eighth field is text with a keyword sub-field.
+    assert len(fields) == 22_500
+
+
+def test_flatten_dict_settings_5000_indices(bench):
+    settings = {f"logs-{n:06d}": {"index": {"number_of_shards": "3", "translog": {"durability": "async"}}} for n in range(5000)}
+    flat = bench(_flatten_dict, settings)
+    assert len(flat) == 10_000
+
+
+def test_render_field_analysis_500_fields(bench, quiet_console):
+    console = quiet_console(index_operations)
+    bench(_display_field_analysis, {"properties": synthetic_properties(500)}, rounds=3)
+    assert "group_4.field_499" in console.file.getvalue()
+
+
+def test_get_index_details_50_indices(fake_cluster, bench, quiet_console):
+    _, client = fake_cluster(indices=50, fields=20)
+    console = quiet_console(index_operations, knn_memory)
+    bench(get_index_details, client, ["logs-*"], rounds=3)
+    assert "logs-000049" in console.file.getvalue()
+
+
+def test_get_index_details_wide_mapping(fake_cluster, bench, quiet_console):
+    _, client = fake_cluster(indices=1, fields=1000)
+    quiet_console(index_operations, knn_memory)
+    bench(get_index_details, client, ["logs-000000"], rounds=3)
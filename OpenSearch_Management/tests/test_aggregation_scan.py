@@ -0,0 +1,72 @@
+from unittest.mock import Mock
+from opensearch_management.logic.aggregation_scan import (
+    build_composite_sources,
+    hash_partition_filters,
+    iter_composite_buckets,
+    partition_field,
+)
+
+
+def _page(keys, after=None):
+    result = {"buckets": [{"key": {"hostname": k}, "doc_count": 1} for k in keys]}
+    if after:
+        result["after_key"] = {"hostname": after}
+    return {"aggregations": {"scan": result}}
+
+
+def test_build_composite_sources():
+    sources = build_composite_sources(["hostname"], ["@timestamp:5m"])
+    assert sources == [
+        {"hostname": {"terms": {"field": "hostname"}}},
+        {"@timestamp": {"date_histogram": {"field": "@timestamp", "fixed_interval": "5m"}}},
+    ]
+
+
+def test_iter_composite_buckets_follows_after_key():
+    client = Mock()
+    # The short second page (e.g. trimmed by a bucket_selector) does not end the scan.
+    client.post.side_effect = [_page(["a", "b"], after="b"), _page(["c"], after="c"), _page([], after=None)]
+
+    sources = build_composite_sources(["hostname"])
+    keys = [b["key"]["hostname"] for b in iter_composite_buckets(client, "logs", sources, page_size=2)]
+
+    assert keys == ["a", "b", "c"]
+    assert client.post.call_count == 3
+    second_body = client.post.call_args_list[1].kwargs["body"]
+    assert second_body["aggs"]["scan"]["composite"]["after"] == {"hostname": "b"}
+
+
+def test_iter_composite_buckets_parallel_partitions():
+    def _post(path, body=None, params=None, tag=None):
+        partition = body["query"]["bool"]["filter"][1]["script"]["script"]["params"]["p"]
+        if "after" in body["aggs"]["scan"]["composite"]:
+            return {}
+        return _page([f"p{partition}-{i}" for i in range(2)], after="x")
+
+    client = Mock()
+    client.post.side_effect = _post
+
+    sources = build_composite_sources(["hostname"])
+    buckets = list(
+        iter_composite_buckets(
+            client, "logs", sources, page_size=2, partition_filters=hash_partition_filters("hostname", 3)
+        )
+    )
+
+    assert sorted(b["key"]["hostname"] for b in buckets) == [
+        "p0-0", "p0-1", "p1-0", "p1-1", "p2-0", "p2-1"
+    ]
+
+
+def test_partition_field_only_for_single_valued_terms():
+    client = Mock()
+    terms, histogram = build_composite_sources(["hostname"], ["@timestamp:1h"])
+
+    assert partition_field(client, "logs", histogram) is None
+    client.post.assert_not_called()
+
+    client.post.return_value = {"hits": {"total": {"value": 0}}}
+    assert partition_field(client, "logs", terms) == "hostname"
+
+    client.post.return_value = {"hits": {"total": {"value": 1}}}
+    assert partition_field(client, "logs", terms) is None
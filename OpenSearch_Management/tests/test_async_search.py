@@ -0,0 +1,50 @@
+from unittest.mock import Mock
+
+from opensearch_management.cache import LRUCache
+from opensearch_management.logic.async_search import (
+    build_body,
+    cache_key,
+    is_relative_range,
+    next_interval,
+    run_async_search,
+)
+
+QUERY = {"size": 0, "query": {"match": {"_raw": "error"}}}
+
+
+def test_build_body_wraps_query_with_time_range():
+    body = build_body(QUERY, start="now-90d", end="now")
+    assert body["query"]["bool"]["filter"] == [{"range": {"@timestamp": {"gte": "now-90d", "lte": "now"}}}]
+    assert body["query"]["bool"]["must"] == [QUERY["query"]]
+    assert "bool" not in QUERY["query"]
+    assert build_body(QUERY) == QUERY
+
+
+def test_cache_key_depends_on_range_not_key_order():
+    reordered = {"query": QUERY["query"], "size": 0}
+    assert cache_key("patronidata", QUERY) == cache_key("patronidata", reordered)
+    assert cache_key("patronidata", build_body(QUERY, start="now-1d")) != cache_key("patronidata", build_body(QUERY, start="now-2d"))
+    assert is_relative_range("now-90d", "now") and is_relative_range("2024-01-01", None)
+    assert not is_relative_range("2024-01-01", "2024-02-01")
+
+
+def test_next_interval_backs_off_and_resets():
+    assert next_interval(1.0, False, 0.5, 2.0, 3.0) == 2.0
+    assert next_interval(2.0, False, 0.5, 2.0, 3.0) == 3.0
+    assert next_interval(3.0, True, 0.5, 2.0, 3.0) == 0.5
+
+
+def test_resumes_pending_search_and_caches_result(tmp_path):
+    client = Mock(dry_run=False)
+    client.settings.settings.state_dir = str(tmp_path)
+    body = build_body(QUERY, start="2024-01-01", end="2024-02-01")
+    LRUCache(path=str(tmp_path / "async_search_pending.json")).put(cache_key("patronidata", body), {"id": "abc"})
+
+    client.get.return_value = {"id": "abc", "state": "SUCCEEDED", "response": {"took": 5, "hits": {"total": {"value": 3}}}}
+    run_async_search(client, "patronidata", QUERY, start="2024-01-01", end="2024-02-01")
+    client.post.assert_not_called()
+    client.delete.assert_called_once()
+
+    client.get.reset_mock()
+    run_async_search(client, "patronidata", QUERY, start="2024-01-01", end="2024-02-01")
+    client.get.assert_not_called()
@@ -0,0 +1,82 @@
+import json
+import socket
+from unittest.mock import Mock
+
+import pytest
+
+from opensearch_management.logic.bulk_mode import (
+    BULK_SETTINGS,
+    bulk_mode,
+    disable_bulk_mode,
+    enable_bulk_mode,
+    load_state,
+    snapshot_settings,
+)
+
+
+def _client(tmp_path, settings_response):
+    client = Mock(dry_run=False)
+    client.settings.settings.state_dir = str(tmp_path)
+    client.get.return_value = settings_response
+    return client
+
+
+def _puts(client):
+    return {call.args[0]: call.kwargs["body"] for call in client.put.call_args_list}
+
+
+def test_snapshot_records_unset_settings_as_none():
+    snapshot = snapshot_settings({"logs-1": {"settings": {"index.refresh_interval": "5s", "index.number_of_replicas": "1"}}})
+    assert snapshot["logs-1"]["index.refresh_interval"] == "5s"
+    assert snapshot["logs-1"]["index.translog.durability"] is None
+
+
+def test_on_off_restores_exact_previous_values(tmp_path):
+    client = _client(tmp_path, {
+        "logs-1": {"settings": {"index.refresh_interval": "5s", "index.number_of_replicas": "2"}},
+        "logs-2": {"settings": {"index.number_of_replicas": "1"}},
+    })
+
+    assert enable_bulk_mode(client, ["logs-*"]) == ["logs-1", "logs-2"]
+    assert _puts(client) == {"logs-1/_settings": BULK_SETTINGS, "logs-2/_settings": BULK_SETTINGS}
+
+    # A second "on" must not overwrite the snapshot with the tuned values.
+    client.get.return_value = {"logs-1": {"settings": BULK_SETTINGS}}
+    assert enable_bulk_mode(client, ["logs-1"]) == []
+    assert load_state(str(tmp_path / "bulk_mode.json"))["indices"]["logs-1"]["previous"]["index.refresh_interval"] == "5s"
+
+    client.put.reset_mock()
+    assert disable_bulk_mode(client, ["logs-1"]) == ["logs-1"]
+    restored = _puts(client)["logs-1/_settings"]
+    assert restored["index.refresh_interval"] == "5s" and restored["index.translog.durability"] is None
+    assert list(load_state(str(tmp_path / "bulk_mode.json"))["indices"]) == ["logs-2"]
+
+
+def test_context_manager_restores_on_error_and_recovers_dead_owner(tmp_path):
+    client = _client(tmp_path, {"logs-1": {"settings": {"index.refresh_interval": "1s"}}})
+    try:
+        with bulk_mode(client, ["logs-1"]):
+            raise RuntimeError("backfill failed")
+    except RuntimeError:
+        pass
+    assert load_state(str(tmp_path / "bulk_mode.json"))["indices"] == {}
+
+    # An entry owned by a process that no longer exists is restored by the next run.
+    state = load_state(str(tmp_path / "bulk_mode.json"))
+    state["indices"]["logs-9"] = {"previous": {"index.refresh_interval": "1s"}, "pid": 2 ** 22 + 1, "host": socket.gethostname(), "enabled_at": 0}
+    (tmp_path / "bulk_mode.json").write_text(json.dumps(state))
+    client.put.reset_mock()
+    with bulk_mode(client, ["logs-1"]):
+        assert "logs-9/_settings" in _puts(client)
+
+
+def test_missing_index_raises_instead_of_auto_created_index(tmp_path):
+    client = _client(tmp_path, None)
+    client.get.side_effect = Exception("404 Client Error")
+    client.get.side_effect.response = Mock(status_code=404)
+
+    with pytest.raises(ValueError, match="create it before enabling bulk mode"):
+        with bulk_mode(client, ["logs-neural"]):
+            pass
+    client.put.assert_not_called()
+    assert load_state(str(tmp_path / "bulk_mode.json"))["indices"] == {}
@@ -37,7 +37,7 @@ def test_client_init(client, mock_settings):
     assert client.verify_certs is False
 
 
-@patch("requests.request")
+@patch("requests.Session.request")
 def test_client_get_success(mock_request, client):
     mock_response = Mock()
     mock_response.status_code = 200
@@ -59,7 +59,7 @@ def test_client_get_success(mock_request, client):
     )
 
 
-@patch("requests.request")
+@patch("requests.Session.request")
 def test_client_dry_run(mock_request, mock_settings):
     client = OpenSearchClient(settings=mock_settings, dry_run=True)
 
@@ -71,7 +71,7 @@ def test_client_dry_run(mock_request, mock_settings):
 
 @patch("opensearch_management.client.open", new_callable=mock_open)
 @patch("opensearch_management.client.os.makedirs")
-@patch("requests.request")
+@patch("requests.Session.request")
 def test_client_query_history(mock_request, mock_makedirs, mock_file, mock_settings):
     client = OpenSearchClient(settings=mock_settings, query_history=True)
 
@@ -89,3 +89,20 @@ def test_client_query_history(mock_request, mock_makedirs, mock_file, mock_setti
     mock_file.assert_called()
     handle = mock_file()
     handle.write.assert_called()
+
+
+@patch("requests.Session.request")
+def test_client_metadata_cache(mock_request, mock_settings):
+    client = OpenSearchClient(settings=mock_settings, metadata_ttl=30)
+    mock_response = Mock()
+    mock_response.json.return_value = {"test-index": {"mappings": {}}}
+    mock_request.return_value = mock_response
+
+    client.get_cached("test-index")
+    client.get_cached("test-index")
+    assert mock_request.call_count == 1
+
+    # Writes invalidate cached metadata.
+    client.put("test-index/_mapping", body={})
+    client.get_cached("test-index")
+    assert mock_request.call_count == 3
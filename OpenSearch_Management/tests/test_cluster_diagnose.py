@@ -0,0 +1,113 @@
+import json
+from unittest.mock import Mock
+
+from opensearch_management.logic.cluster_diagnose import (
+    diagnose_cluster,
+    load_series,
+    parse_hot_threads,
+    parse_node_stats,
+    summarize,
+)
+
+HOT_THREADS = """::: {node-1}{abc}{def}{10.0.0.1}{10.0.0.1:9300}{dimr}{shard_indexing_pressure_enabled=true}
+   Hot threads at 2024-01-01T00:00:00.000Z, interval=500ms, busiestThreads=2, ignoreIdleThreads=true:
+
+   87.3% (436.5ms out of 500ms) cpu usage by thread 'opensearch[node-1][search][T#3]'
+     2/10 snapshots sharing following 29 elements
+       app//org.apache.lucene.search.TermScorer.score(TermScorer.java:76)
+       app//org.apache.lucene.search.TopScoreDocCollector$SimpleTopScoreDocCollector$1.collect(TopScoreDocCollector.java:73)
+       app//org.apache.lucene.search.Weight$DefaultBulkScorer.scoreAll(Weight.java:300)
+       app//org.apache.lucene.search.Weight$DefaultBulkScorer.score(Weight.java:247)
+
+   12.0% (60ms out of 500ms) cpu usage by thread 'opensearch[node-1][write][T#1]'
+     unique snapshot
+       java.base@17.0.9/java.util.zip.Deflater.deflateBytesBytes(Native Method)
+
+::: {node-2}{ghi}{jkl}{10.0.0.2}{10.0.0.2:9300}{dimr}
+   Hot threads at 2024-01-01T00:00:00.000Z, interval=500ms, busiestThreads=2, ignoreIdleThreads=true:
+"""
+
+
+def _node_stats(name, young, old, rejected, tripped=0, heap=50):
+    return {"nodes": {f"id-{name}": {
+        "name": name,
+        "jvm": {"mem": {"heap_used_percent": heap}, "gc": {"collectors": {
+            "young": {"collection_count": young, "collection_time_in_millis": young * 10},
+            "old": {"collection_count": old, "collection_time_in_millis": old * 500},
+        }}},
+        "thread_pool": {"write": {"active": 4, "queue": 150, "rejected": rejected}, "get": {"active": 0, "queue": 0, "rejected": 0}},
+        "breakers": {"parent": {"estimated_size_in_bytes": 90, "limit_size_in_bytes": 100, "tripped": tripped}},
+    }}}
+
+
+def test_parse_hot_threads_reads_nodes_pools_and_top_frames():
+    nodes = parse_hot_threads(HOT_THREADS)
+    assert set(nodes) == {"node-1", "node-2"}
+    assert nodes["node-2"] == []
+    search, write = nodes["node-1"]
+    assert search["pct"] == 87.3 and search["pool"] == "search" and search["kind"] == "cpu"
+    assert search["frames"] == [
+        "org.apache.lucene.search.TermScorer.score(TermScorer.java:76)",
+        "org.apache.lucene.search.TopScoreDocCollector$SimpleTopScoreDocCollector$1.collect(TopScoreDocCollector.java:73)",
+        "org.apache.lucene.search.Weight$DefaultBulkScorer.scoreAll(Weight.java:300)",
+    ]
+    assert write["frames"] == ["java.util.zip.Deflater.deflateBytesBytes(Native Method)"]
+
+
+def test_parse_node_stats_keeps_only_busy_pools():
+    stats = parse_node_stats(_node_stats("node-1", 10, 1, 5))["node-1"]
+    assert stats["heap_pct"] == 50
+    assert stats["gc_old"] == [1, 500]
+    assert stats["pools"] == {"write": [4, 150, 5]}
+
+
+def test_summarize_reports_deltas_between_first_and_last_sample():
+    records = [
+        {"ts": 0.0, "kind": "node_stats", "node": "node-1", **parse_node_stats(_node_stats("node-1", 10, 1, 5))["node-1"]},
+        {"ts": 2.0, "kind": "node_stats", "node": "node-1", **parse_node_stats(_node_stats("node-1", 30, 2, 45, tripped=1, heap=85))["node-1"]},
+        {"ts": 0.0, "kind": "hot_threads", "node": "node-1", "threads": parse_hot_threads(HOT_THREADS)["node-1"]},
+        {"ts": 2.0, "kind": "hot_threads", "node": "node-1", "threads": parse_hot_threads(HOT_THREADS)["node-1"][:1]},
+        {"ts": 0.0, "kind": "pending", "count": 3, "max_wait_ms": 1200.0, "sources": ["put-mapping [logs]"]},
+    ]
+    summary = summarize(records)
+
+    gc = summary["gc"][0]
+    assert (gc["young_count"], gc["old_count"], gc["heap_min"], gc["heap_max"]) == (20, 1, 50, 85)
+    # 200 ms young + 500 ms old over 2 s.
+    assert gc["gc_ms_per_s"] == 350.0
+    assert summary["rejections"] == [{"node": "node-1", "pool": "write", "rejected": 40, "total": 45, "max_queue": 150}]
+    assert summary["breakers"][0]["tripped"] == 1
+    assert summary["stacks"][0]["seen"] == 2 and summary["stacks"][0]["pool"] == "search"
+    assert summary["pending"]["max_count"] == 3
+
+
+def test_summarize_counts_rejections_of_a_pool_idle_in_the_first_sample():
+    idle = _node_stats("node-1", 10, 1, 0)
+    idle["nodes"]["id-node-1"]["thread_pool"]["write"] = {"active": 0, "queue": 0, "rejected": 0}
+    records = [
+        {"ts": 0.0, "kind": "node_stats", "node": "node-1", **parse_node_stats(idle)["node-1"]},
+        {"ts": 2.0, "kind": "node_stats", "node": "node-1", **parse_node_stats(_node_stats("node-1", 10, 1, 120))["node-1"]},
+    ]
+    assert "write" not in records[0]["pools"]
+
+    rejections = summarize(records)["rejections"]
+    assert [(r["pool"], r["rejected"], r["total"]) for r in rejections] == [("write", 120, 120)]
+
+
+def test_diagnose_writes_jsonl_time_series(tmp_path):
+    client = Mock(dry_run=False)
+    responses = {
+        "_cat/nodes": [{"id": "abc", "name": "node-1"}],
+        "_nodes/abc/hot_threads": Mock(text=HOT_THREADS),
+        "_nodes/stats/jvm,thread_pool,breaker": _node_stats("node-1", 10, 1, 5),
+        "_cat/pending_tasks": [],
+    }
+    client.get.side_effect = lambda path, **kwargs: responses[path]
+    path = tmp_path / "series.jsonl"
+
+    diagnose_cluster(client, samples=2, interval=0, output=str(path))
+
+    records = load_series(str(path))
+    assert [r["kind"] for r in records].count("node_stats") == 2
+    assert [r["node"] for r in records if r["kind"] == "hot_threads"] == ["node-1", "node-2", "node-1", "node-2"]
+    assert json.loads(path.read_text().splitlines()[0])["ts"] > 0
@@ -31,3 +31,26 @@ settings:
         assert settings.auth.type == "token"
         assert settings.auth.token == "secret"
         assert settings.settings.app_env == "prod"
+
+
+def test_cluster_profiles():
+    yaml_content = """
+connection:
+  hosts: ["dev-host"]
+clusters:
+  prod-eu:
+    connection:
+      hosts: ["prod-eu-host"]
+      port: 9201
+    auth:
+      username: "ops"
+"""
+    with patch("builtins.open", mock_open(read_data=yaml_content)):
+        settings = load_settings("clusters.yaml")
+
+    prod = settings.for_cluster("prod-eu")
+    assert prod.connection.hosts == ["prod-eu-host"]
+    assert prod.connection.port == 9201
+    assert prod.auth.username == "ops"
+    assert prod.settings.state_dir.endswith("clusters/prod-eu")
+    assert settings.connection.hosts == ["dev-host"]
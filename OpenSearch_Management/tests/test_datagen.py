@@ -0,0 +1,25 @@
+import json
+from unittest.mock import Mock
+from opensearch_management.logic.datagen import LogDocumentGenerator, generate_logs
+
+
+def test_ndjson_batch_is_valid_bulk_payload():
+    generator = LogDocumentGenerator(hosts=3, error_ratio=1.0, skew_seconds=10, seed=42)
+    lines = generator.ndjson_batch(50).splitlines()
+
+    assert len(lines) == 100
+    docs = [json.loads(line) for line in lines[1::2]]
+    assert all(json.loads(line) == {"index": {}} for line in lines[::2])
+    assert {d["hostname"] for d in docs} <= {"pg-node-0000", "pg-node-0001", "pg-node-0002"}
+    assert all(d["level"] in ("ERROR", "FATAL", "WARNING") for d in docs)
+
+
+def test_generate_logs_sends_exact_doc_count():
+    client = Mock()
+    client.dry_run = False
+    client.bulk.return_value = {"took": 1, "errors": False}
+
+    generate_logs(client, "logs", total_docs=2500, workers=3, batch_size=1000, seed=1)
+
+    sent = sum(call.args[0].count("\n") // 2 for call in client.bulk.call_args_list)
+    assert sent == 2500
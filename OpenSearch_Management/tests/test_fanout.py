@@ -0,0 +1,38 @@
+import io
+import threading
+from opensearch_management.fanout import ThreadLocalStream, select_clusters, strip_option
+
+
+def test_select_clusters_keeps_config_order():
+    names = ["dev", "staging", "prod-eu", "prod-us"]
+    assert select_clusters(names, "prod-*") == ["prod-eu", "prod-us"]
+    assert select_clusters(names, "prod-us, dev") == ["dev", "prod-us"]
+    assert select_clusters(names, "qa-*") == []
+
+
+def test_strip_option_removes_value_forms():
+    argv = ["--dry-run", "--clusters", "prod-*", "index", "info", "logs"]
+    assert strip_option(argv, "--clusters") == ["--dry-run", "index", "info", "logs"]
+    assert strip_option(["--clusters=prod-*", "hello"], "--clusters") == ["hello"]
+
+
+def test_thread_local_stream_separates_threads():
+    real = io.StringIO()
+    stream = ThreadLocalStream(real)
+    captured = {}
+
+    def _worker(name):
+        buffer = stream.capture()
+        stream.write(f"from {name}\n")
+        stream.release()
+        captured[name] = buffer.getvalue()
+
+    threads = [threading.Thread(target=_worker, args=(n,)) for n in ("a", "b")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    stream.write("main\n")
+
+    assert captured == {"a": "from a\n", "b": "from b\n"}
+    assert real.getvalue() == "main\n"
@@ -0,0 +1,49 @@
+import re
+
+import pytest
+
+from opensearch_management.logic.field_materializer import (
+    capture_group_span,
+    regex_to_grok,
+    runtime_to_ingest_script,
+    upsert_processor,
+)
+
+ERROR_CODE_SCRIPT = (
+    "if (doc['_raw.keyword'].size() == 0) return; "
+    "String raw = doc['_raw.keyword'].value; int i = raw.indexOf('e='); "
+    "if (i >= 0) { int end = raw.indexOf(',', i); emit(raw.substring(i + 2, end > 0 ? end : raw.length())); }"
+)
+
+
+def test_capture_group_span_skips_non_capturing_and_classes():
+    pattern = r"(?:x)[(]e=(?<code>[^,)]+)"
+    start, inner, end = capture_group_span(pattern)
+    assert pattern[start:end + 1] == "(?<code>[^,)]+)"
+    assert pattern[inner:end] == "[^,)]+"
+    with pytest.raises(ValueError):
+        capture_group_span(r"(?:a)\(b\)")
+
+
+def test_regex_to_grok_captures_first_group_into_target():
+    grok = regex_to_grok(r"e=([^,]+),", "error.code")
+    assert grok["patterns"] == ["e=%{MATERIALIZED:error.code},"]
+    assert grok["pattern_definitions"] == {"MATERIALIZED": "[^,]+"}
+
+
+def test_runtime_to_ingest_script_translates_doc_access_and_emit():
+    script = runtime_to_ingest_script(ERROR_CODE_SCRIPT, "error_code")
+    assert "doc[" not in script and "emit(" not in script
+    assert "if (ctx._raw == null) return;" in script
+    assert re.search(r"ctx\['error_code'\] = raw\.substring\(i \+ 2, end > 0 \? end : raw\.length\(\)\)", script)
+
+    with pytest.raises(ValueError):
+        runtime_to_ingest_script("emit(doc['a'].get(0))", "x")
+
+
+def test_upsert_processor_is_idempotent():
+    existing = [{"drop": {"if": "false"}}, {"grok": {"field": "_raw", "patterns": ["old"], "tag": "materialize-x"}}]
+    processor = {"grok": {"field": "_raw", "patterns": ["new"], "tag": "materialize-x"}}
+    updated = upsert_processor(existing, processor)
+    assert updated == [existing[0], processor]
+    assert upsert_processor(updated, processor) == updated
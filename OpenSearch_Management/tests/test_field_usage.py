@@ -0,0 +1,56 @@
+from opensearch_management.logic.field_usage import (
+    estimate_field_usage,
+    parse_disk_usage,
+    referenced_fields,
+    segment_file_totals,
+    source_value_bytes,
+    suggest,
+)
+
+MAPPED = {
+    "_raw": {"type": "text"},
+    "_raw.keyword": {"type": "keyword", "ignore_above": 256},
+    "host.name": {"type": "keyword"},
+    "@timestamp": {"type": "date"},
+}
+
+
+def test_parse_disk_usage_maps_structures():
+    response = {"_shards": {"total": 1}, "patronidata": {"fields": {"host.name": {
+        "total_in_bytes": 60, "inverted_index": {"total_in_bytes": 40}, "stored_fields_in_bytes": 0,
+        "doc_values_in_bytes": 20, "points_in_bytes": 0, "norms_in_bytes": 0,
+    }}}}
+    usage = parse_disk_usage(response)["host.name"]
+    assert (usage["inverted_index"], usage["doc_values"], usage["total"]) == (40, 20, 60)
+
+
+def test_estimate_splits_structure_totals_by_value_size():
+    stats = {"indices": {"patronidata": {"primaries": {"segments": {"file_sizes": {
+        "tim": {"size_in_bytes": 900}, "dvd": {"size_in_bytes": 300}, "kdd": {"size_in_bytes": 50}, "nvd": {"size_in_bytes": 10},
+    }}}}}}
+    totals = segment_file_totals(stats)
+    sizes = source_value_bytes([{"_raw": "x" * 98, "host": {"name": "patroni1"}, "@timestamp": "2024"}])
+    assert sizes == {"_raw": 100, "host.name": 10, "@timestamp": 6}
+
+    usage = estimate_field_usage(MAPPED, totals, sizes)
+    # Inverted index: _raw, _raw.keyword (parent's values) and host.name.
+    assert usage["_raw"]["inverted_index"] == 428 and usage["host.name"]["inverted_index"] == 42
+    assert usage["@timestamp"]["points"] == 50 and usage["_raw"]["norms"] == 10
+    assert usage["_raw.keyword"]["stored"] == 0
+
+
+def test_referenced_fields_covers_queries_aggs_and_sort():
+    body = {
+        "query": {"bool": {"filter": [{"term": {"host.name": "patroni1"}}, {"exists": {"field": "log.level"}}],
+                           "must": [{"match": {"_raw": {"query": "error", "boost": 2}}}]}},
+        "aggs": {"by_host": {"terms": {"field": "host.name"}}},
+        "sort": [{"@timestamp": "desc"}, "_score"],
+    }
+    assert referenced_fields(body) == {"host.name", "log.level", "_raw", "@timestamp"}
+
+
+def test_suggest_only_for_unqueried_fields():
+    usage = {"total": 10, "doc_values": 5, "inverted_index": 5, "norms": 0, "points": 0}
+    assert suggest("keyword", usage, 0) == "doc_values: false, index: false"
+    assert suggest("keyword", usage, 3) == ""
+    assert suggest("keyword", usage, None) == ""
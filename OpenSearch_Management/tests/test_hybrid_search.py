@@ -0,0 +1,63 @@
+from unittest.mock import Mock
+from opensearch_management.cache import LRUCache
+from opensearch_management.logic.hybrid_search import (
+    _cache_key,
+    _index_generation,
+    build_hybrid_query,
+    ensure_search_pipeline,
+    normalize_query_text,
+    search_pipeline_body,
+)
+
+
+def test_normalized_queries_share_cache_key():
+    assert normalize_query_text("  Replication   LAG ") == "replication lag"
+    assert _cache_key("logs", "Replication  lag", "1:0:5:0") == _cache_key("logs", "replication lag", "1:0:5:0")
+    assert _cache_key("logs", "replication lag", "1:0:5:0") != _cache_key("logs", "replication lag", "2:0:6:0")
+
+
+def test_hybrid_query_combines_match_and_neural():
+    body = build_hybrid_query("disk full", "_raw", "message_embedding", "model-1", 50, 10)
+    match, neural = body["query"]["hybrid"]["queries"]
+    assert match == {"match": {"_raw": {"query": "disk full"}}}
+    assert neural["neural"]["message_embedding"] == {"query_text": "disk full", "model_id": "model-1", "k": 50}
+    assert body["_source"] == {"excludes": ["message_embedding"]}
+
+
+def test_ensure_search_pipeline_skips_unchanged():
+    body = search_pipeline_body([0.3, 0.7])
+    client = Mock()
+    client.get.return_value = {"hybrid": body}
+    assert ensure_search_pipeline(client, "hybrid", body) is False
+    client.put.assert_not_called()
+
+    client.get.return_value = {"hybrid": search_pipeline_body([0.5, 0.5])}
+    assert ensure_search_pipeline(client, "hybrid", body) is True
+    client.put.assert_called_once()
+
+
+def test_lru_cache_evicts_and_persists(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = LRUCache(max_entries=2, path=path)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+
+    reloaded = LRUCache(max_entries=2, path=path)
+    assert reloaded.get("a") == 1
+    assert reloaded.get("c") == 3
+
+
+def test_index_generation_follows_searchable_docs_only():
+    def _stats(count, deleted):
+        return {"_all": {"primaries": {"docs": {"count": count, "deleted": deleted}}}}
+
+    client = Mock()
+    client.get.side_effect = [_stats(10, 0), _stats(10, 0), _stats(10, 1)]
+    # Refreshes without new searchable writes keep the generation; an update shows up as a deleted doc.
+    first = _index_generation(client, "logs")
+    assert _index_generation(client, "logs") == first
+    assert _index_generation(client, "logs") != first
+    assert client.get.call_args.args[0] == "logs/_stats/docs"
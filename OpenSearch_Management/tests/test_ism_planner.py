@@ -0,0 +1,56 @@
+from opensearch_management.logic.ism_planner import (
+    DAY_MS,
+    GB,
+    build_policy,
+    build_template,
+    clashing_indices,
+    daily_rates,
+    parse_cat_indices,
+    plan_hash,
+    plan_rollover,
+    record_sample,
+)
+
+
+def test_daily_rates_use_time_until_next_index():
+    rows = [
+        {"index": "patronidata-2024.05.02", "creation.date": str(DAY_MS), "pri": "1", "rep": "1", "pri.store.size": str(80 * GB)},
+        {"index": "patronidata-2024.05.01", "creation.date": "0", "pri": "1", "rep": "1", "pri.store.size": str(GB // 5)},
+    ]
+    indices = parse_cat_indices(rows)
+    assert [i["index"] for i in indices] == ["patronidata-2024.05.01", "patronidata-2024.05.02"]
+    assert daily_rates(indices, now_ms=3 * DAY_MS) == [GB // 5, 40 * GB]
+    assert daily_rates(indices, now_ms=3 * DAY_MS, write_rate=70 * GB)[-1] == 70 * GB
+
+
+def test_plan_rollover_sizes_primaries_for_peak():
+    rates = [0.2 * GB] * 10 + [80 * GB]
+    plan = plan_rollover(rates, 30 * GB, 10 * GB, 50 * GB, max_age_days=30, max_primaries=6)
+    assert plan["primaries"] == 3
+    assert plan["conditions"] == {"min_primary_shard_size": "30gb", "min_index_age": "30d"}
+    assert plan["shard_at_median"] < 10 * GB and plan["notes"]
+
+
+def test_plan_hash_ignores_stored_hash():
+    policy = build_policy("patronidata-logs", {"min_index_age": "30d"}, "7d", "30d", warm_attribute="temp=warm")
+    before = plan_hash(policy)
+    policy["policy"]["description"] = f"plan:{before}"
+    assert plan_hash(policy) == before
+    warm = policy["policy"]["states"][1]["actions"]
+    assert warm[0]["allocation"]["require"] == {"temp": "warm"} and warm[-1] == {"force_merge": {"max_num_segments": 1}}
+
+
+def test_series_pattern_leaves_daily_indices_with_the_same_prefix_alone():
+    policy = build_policy("patronidata", {"min_index_age": "1d"}, "7d", "30d")
+    template = build_template("patronidata", 3, 1)
+    assert policy["policy"]["ism_template"][0]["index_patterns"] == ["patronidata-0*"]
+    assert template["index_patterns"] == ["patronidata-0*"]
+    assert clashing_indices(["patronidata-2024.01.01", "patronidata-000001"], "patronidata") == []
+    assert clashing_indices(["patronidata-01.02.2024"], "patronidata") == ["patronidata-01.02.2024"]
+
+
+def test_record_sample_returns_write_rate(tmp_path):
+    path = str(tmp_path / "samples.jsonl")
+    index = {"index": "patronidata-2024.05.02", "pri_bytes": GB}
+    assert record_sample(path, [index], now=0) is None
+    assert record_sample(path, [dict(index, pri_bytes=2 * GB)], now=43200) == 2 * GB
@@ -0,0 +1,36 @@
+from unittest.mock import Mock
+
+import pytest
+
+from opensearch_management.logic.knn_benchmark import _benchmark_candidate, build_candidates, pareto_front
+
+
+def test_build_candidates_is_cartesian_product():
+    candidates = build_candidates(["lucene", "faiss"], [8, 16], [128], "l2")
+    assert len(candidates) == 4
+    assert {"engine": "faiss", "m": 16, "ef_construction": 128, "space_type": "l2"} in candidates
+
+
+def test_pareto_front():
+    rows = [
+        {"recall": 0.99, "p95": 12.0},  # best recall
+        {"recall": 0.90, "p95": 4.0},  # fastest
+        {"recall": 0.90, "p95": 6.0},  # dominated by the row above
+        {"recall": 0.95, "p95": 8.0},  # trade-off
+    ]
+    assert pareto_front(rows, maximize=["recall"], minimize=["p95"]) == [True, True, False, True]
+
+
+def test_rejected_documents_abort_the_candidate():
+    np = pytest.importorskip("numpy")
+    client = Mock(dry_run=False)
+    client.bulk.return_value = {
+        "errors": True,
+        "items": [{"index": {"error": {"type": "mapper_parsing_exception", "reason": "wrong dimension"}}}],
+    }
+    candidate = build_candidates(["lucene"], [16], [128], "l2")[0]
+    corpus = np.zeros((3, 4), dtype=np.float32)
+
+    with pytest.raises(RuntimeError, match="1 of 3 documents rejected.*mapper_parsing_exception"):
+        _benchmark_candidate(client, "knn-bench-x", candidate, corpus, corpus[:1], [set()], 4, 1, None, False)
+    client.post.assert_not_called()
@@ -0,0 +1,38 @@
+import pytest
+from opensearch_management.logic.knn_memory import (
+    estimate_hnsw_bytes,
+    estimate_index_knn_memory,
+    knn_field_specs,
+)
+
+MAPPINGS = {
+    "properties": {
+        "_raw": {"type": "text"},
+        "message_embedding": {
+            "type": "knn_vector",
+            "dimension": 384,
+            "method": {"name": "hnsw", "engine": "lucene", "parameters": {"m": 16, "ef_construction": 128}},
+        },
+    }
+}
+
+
+def test_estimate_hnsw_bytes():
+    # 1.1 * (4 * 384 + 8 * 16) * 1M vectors
+    assert estimate_hnsw_bytes(384, 1_000_000, m=16) == pytest.approx(1.1 * 1664 * 1_000_000)
+
+
+def test_knn_field_specs():
+    assert knn_field_specs(MAPPINGS) == [
+        {"field": "message_embedding", "dimension": 384, "engine": "lucene", "m": 16, "mode": "fp32 (1x)"}
+    ]
+
+
+def test_estimate_index_knn_memory_counts_replicas_and_modes():
+    row = estimate_index_knn_memory(knn_field_specs(MAPPINGS), 1000, replicas=1)[0]
+
+    assert row["copies"] == 2
+    assert row["location"] == "page cache"
+    assert row["heap"] == "indexing buffer"
+    assert row["total_bytes"] == pytest.approx(2 * estimate_hnsw_bytes(384, 1000, 16))
+    assert row["alternatives"]["byte (4x)"] < row["alternatives"]["fp16 (2x)"] < row["total_bytes"]
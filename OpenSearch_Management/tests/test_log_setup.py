@@ -0,0 +1,55 @@
+import io
+import json
+import logging
+import sys
+import pytest
+import structlog
+from opensearch_management.log_setup import EventSampler, JsonLinesHandler, _ExcludeEvents, _StderrHandler
+
+
+def test_sampler_drops_and_tags_events():
+    sampler = EventSampler({"noisy": 0.0, "kept": 1.0}, {})
+    with pytest.raises(structlog.DropEvent):
+        sampler(None, "info", {"event": "noisy"})
+    assert sampler(None, "info", {"event": "kept"})["sample_rate"] == 1.0
+    assert sampler(None, "error", {"event": "noisy"}) == {"event": "noisy"}
+    assert sampler.dropped == {"noisy": 1}
+
+
+def test_sampler_rate_limit():
+    sampler = EventSampler({}, {"burst": 3})
+    kept = 0
+    for _ in range(10):
+        try:
+            sampler(None, "info", {"event": "burst"})
+            kept += 1
+        except structlog.DropEvent:
+            pass
+    assert kept == 3
+
+
+def test_json_lines_handler(tmp_path):
+    path = tmp_path / "events.jsonl"
+    handler = JsonLinesHandler(str(path))
+    handler.setFormatter(logging.Formatter('{"event": "%(message)s"}'))
+    for i in range(3):
+        handler.emit(logging.LogRecord("t", logging.INFO, __file__, 1, f"e{i}", None, None))
+    handler.close()
+    assert [json.loads(line)["event"] for line in path.read_text().splitlines()] == ["e0", "e1", "e2"]
+
+
+def test_stderr_handler_writes_to_current_stderr(monkeypatch):
+    handler = _StderrHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    captured = io.StringIO()
+    monkeypatch.setattr(sys, "stderr", captured)
+    handler.emit(logging.LogRecord("t", logging.INFO, __file__, 1, "late", None, None))
+    assert captured.getvalue() == "late\n"
+
+
+def test_exclude_events_keeps_high_volume_events_off_the_console():
+    only_in_file = _ExcludeEvents(["Request completed"])
+    record = logging.LogRecord("t", logging.DEBUG, __file__, 1, {"event": "Request completed"}, None, None)
+    assert not only_in_file.filter(record)
+    record.msg = {"event": "Query saved to history"}
+    assert only_in_file.filter(record)
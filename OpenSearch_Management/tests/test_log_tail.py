@@ -0,0 +1,64 @@
+from unittest.mock import Mock
+
+from opensearch_management.logic.log_tail import TailWindow, build_tail_body, parse_query, poll_new_hits
+
+
+def _hit(doc_id, ts):
+    return {"_index": "patronidata", "_id": doc_id, "_source": {"_raw": doc_id}, "sort": [ts, doc_id]}
+
+
+def test_parse_query_accepts_dsl_or_query_string():
+    assert parse_query('{"term": {"host.name": "patroni1"}}') == {"term": {"host.name": "patroni1"}}
+    assert parse_query("error")["query_string"]["query"] == "error"
+    assert parse_query(None) == {"match_all": {}}
+
+
+def test_build_tail_body_filters_from_window_start():
+    body = build_tail_body({"match_all": {}}, "@timestamp", 1000, [{"@timestamp": "asc"}], 50, ["_raw"])
+    assert body["query"]["bool"]["filter"][1] == {"range": {"@timestamp": {"gte": 1000, "format": "epoch_millis"}}}
+    assert body["_source"] == ["@timestamp", "_raw"]
+    assert len(build_tail_body({"match_all": {}}, "@timestamp", None, [], 50)["query"]["bool"]["filter"]) == 1
+
+
+def test_window_dedupes_overlap_and_prunes():
+    window = TailWindow(lag_ms=100)
+    assert window.accept(_hit("a", 1000)) and window.accept(_hit("b", 1200))
+    assert not window.accept(_hit("a", 1000))
+    assert window.start_ms() == 1100
+    window.prune()
+    assert len(window) == 1
+
+
+def test_poll_pages_through_its_own_pit_and_skips_seen():
+    window = TailWindow(lag_ms=1000)
+    window.accept(_hit("a", 5000))
+    client = Mock()
+    client.post.side_effect = [
+        {"pit_id": "pit-1"},
+        {"pit_id": "pit-2", "hits": {"hits": [_hit("a", 5000), _hit("b", 5100)]}},
+        {"hits": {"hits": [_hit("c", 5200)]}},
+    ]
+
+    new = poll_new_hits(client, "patronidata", {"match_all": {}}, window, batch_size=2)
+
+    assert [h["_id"] for h in new] == ["b", "c"]
+    assert client.post.call_args_list[0].args[0] == "patronidata/_search/point_in_time"
+    searches = client.post.call_args_list[1:]
+    assert [call.args[0] for call in searches] == ["_search", "_search"]
+    bodies = [call.kwargs["body"] for call in searches]
+    assert bodies[0]["sort"] == [{"@timestamp": "asc"}, {"_shard_doc": "asc"}]
+    assert bodies[1]["search_after"] == [5100, "b"]
+    assert bodies[1]["pit"]["id"] == "pit-2"
+    assert bodies[0]["query"]["bool"]["filter"][1]["range"]["@timestamp"]["gte"] == 4000
+    client.delete.assert_called_once_with("_search/point_in_time", body={"pit_id": ["pit-2"]}, tag="tail_pit_close")
+
+
+def test_poll_with_field_tiebreaker_searches_index_without_pit():
+    client = Mock()
+    client.post.return_value = {"hits": {"hits": [_hit("a", 5000)]}}
+
+    poll_new_hits(client, "patronidata", {"match_all": {}}, TailWindow(lag_ms=1000), tiebreaker="event.id")
+
+    assert client.post.call_args.args[0] == "patronidata/_search"
+    assert "pit" not in client.post.call_args.kwargs["body"]
+    client.delete.assert_not_called()
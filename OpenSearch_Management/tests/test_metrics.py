@@ -0,0 +1,86 @@
+import datetime
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import Mock, patch
+import requests
+from opensearch_management import metrics
+from opensearch_management.client import OpenSearchClient, _response_metrics
+from opensearch_management.config import Settings
+
+
+def test_histogram_percentiles():
+    histogram = metrics.Histogram(metrics.LATENCY_BUCKETS_MS)
+    for value in range(1, 101):
+        histogram.observe(float(value))
+    assert histogram.count == 100
+    assert histogram.mean == 50.5
+    assert 40 <= histogram.percentile(50) <= 60
+    assert 90 <= histogram.percentile(95) <= 100
+    assert histogram.percentile(100) == 100
+
+
+def test_registry_hooks_and_prometheus_text():
+    registry = metrics.MetricsRegistry()
+    seen = []
+    registry.add_hook(seen.append)
+    registry.record_request({"tag": "bulk", "total_ms": 12.0, "response_bytes": 2048})
+    registry.record_request({"tag": "bulk", "total_ms": 30.0, "error": "ConnectionError"})
+
+    assert len(seen) == 2
+    text = metrics.render_prometheus(registry)
+    assert 'opensearch_manager_request_total_ms_bucket{tag="bulk",le="25"} 1' in text
+    assert 'opensearch_manager_request_total_ms_count{tag="bulk"} 2' in text
+    assert 'opensearch_manager_request_errors_total{tag="bulk"} 1' in text
+
+
+@patch("requests.Session.request")
+def test_client_records_request_metrics(mock_request):
+    response = Mock(status_code=200, _content=b'{"ok": true}')
+    response.json.return_value = {"ok": True}
+    response.request.body = b'{"query": {}}'
+    mock_request.return_value = response
+
+    metrics.registry.reset()
+    OpenSearchClient(settings=Settings()).post("logs/_search", body={"query": {}}, tag="search")
+
+    histograms = metrics.registry.histograms()
+    assert histograms[("search", "total_ms")].count == 1
+    assert histograms[("search", "response_bytes")].sum == len(b'{"ok": true}')
+    assert ("search", "parse_ms") in histograms
+
+
+def test_ttfb_excludes_connection_setup():
+    response = Mock(status_code=200, _content=b"{}", elapsed=datetime.timedelta(milliseconds=50))
+    response.request.body = None
+    record = _response_metrics(response, {"dns_ms": 5.0, "connect_ms": 20.0})
+    assert (record["dns_ms"], record["connect_ms"], record["ttfb_ms"]) == (5.0, 15.0, 30.0)
+
+
+def test_instrumented_adapter_times_dns_without_patching_socket():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    session = requests.Session()
+    session.mount("http://", metrics.InstrumentedAdapter())
+    resolver = socket.getaddrinfo
+    timings = metrics.begin_request()
+    try:
+        # localhost may resolve to ::1 first; the adapter falls back to 127.0.0.1.
+        assert session.get(f"http://localhost:{server.server_address[1]}/", timeout=5).status_code == 200
+    finally:
+        metrics.end_request()
+        server.shutdown()
+        server.server_close()
+    assert timings["dns_ms"] > 0
+    assert timings["connect_ms"] >= timings["dns_ms"]
+    assert socket.getaddrinfo is resolver
@@ -0,0 +1,50 @@
+import pytest
+from opensearch_management.logic.monitor_evaluation import (
+    ExpressionError,
+    compile_condition,
+    evaluate_bucket_trigger,
+    resolve_bucket_path,
+)
+
+
+def test_compile_condition_painless_subset():
+    check = compile_condition("params.error_count > 0 && !(params._count < 2) || params['x'] == 'a&&b';")
+    assert check({"error_count": 1, "_count": 3, "x": None}) is True
+    assert check({"error_count": 0, "_count": 3, "x": "a&&b"}) is True
+    assert check({"error_count": 0, "_count": 3, "x": "b"}) is False
+
+
+@pytest.mark.parametrize("source", ["params.x.size() > 0", "__import__('os')", "x > 1", "params.x = 1"])
+def test_compile_condition_rejects_unsafe(source):
+    with pytest.raises(ExpressionError):
+        compile_condition(source)
+
+
+def test_resolve_bucket_path():
+    bucket = {"key": "h", "doc_count": 5, "error_check": {"doc_count": 2, "max_error_time": {"value": 10.0}}}
+    assert resolve_bucket_path(bucket, "_count") == 5
+    assert resolve_bucket_path(bucket, "error_check._count") == 2
+    assert resolve_bucket_path(bucket, "error_check>max_error_time") == 10.0
+
+
+def test_evaluate_bucket_trigger():
+    trigger = {
+        "name": "Error Trigger",
+        "condition": {
+            "buckets_path": {"error_count": "error_check._count"},
+            "parent_bucket_path": "by_hostname",
+            "script": {"source": "params.error_count > 0", "lang": "painless"},
+        },
+    }
+    aggregations = {
+        "by_hostname": {
+            "buckets": [
+                {"key": "host-A", "doc_count": 3, "error_check": {"doc_count": 2}},
+                {"key": "host-C", "doc_count": 1, "error_check": {"doc_count": 0}},
+            ]
+        }
+    }
+
+    result = evaluate_bucket_trigger(trigger, aggregations)
+
+    assert [b["key"] for b in result["buckets"] if b["fired"]] == ["host-A"]
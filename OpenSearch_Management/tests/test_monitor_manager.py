@@ -0,0 +1,61 @@
+from opensearch_management.logic.monitor_manager import build_monitor_body, canonical_hash, plan_monitor_changes
+
+
+def _monitor(name, threshold=0):
+    return {
+        "name": name,
+        "monitor_type": "bucket_level_monitor",
+        "triggers": [
+            {"bucket_level_trigger": {"name": "t", "condition": {"script": {"source": f"params.c > {threshold}"}}}}
+        ],
+    }
+
+
+def test_canonical_hash_ignores_key_order_and_volatile_fields():
+    a = {"name": "m", "enabled": True, "schedule": {"period": {"interval": 1, "unit": "MINUTES"}}}
+    b = {"schedule": {"period": {"unit": "MINUTES", "interval": 1}}, "enabled": True, "name": "m", "last_update_time": 1}
+    assert canonical_hash(a) == canonical_hash(b)
+
+
+def test_plan_monitor_changes():
+    stored = _monitor("same")
+    # Server-side defaults such as trigger ids must not be reported as drift.
+    stored["triggers"][0]["bucket_level_trigger"]["id"] = "abc"
+    existing = {
+        "same": {"id": "1", "monitor": stored, "seq_no": 3, "primary_term": 1},
+        "changed": {"id": "2", "monitor": _monitor("changed"), "seq_no": 4, "primary_term": 1},
+    }
+    desired = [_monitor("same"), _monitor("changed", threshold=5), _monitor("new")]
+
+    plan = {change["name"]: change for change in plan_monitor_changes(desired, existing)}
+
+    assert plan["same"]["action"] == "unchanged"
+    assert plan["changed"]["action"] == "update"
+    assert plan["changed"]["seq_no"] == 4
+    assert plan["new"]["action"] == "create"
+    assert plan["new"]["id"] is None
+
+
+def test_removed_keys_are_detected_through_the_applied_hash():
+    applied = dict(_monitor("m"), enabled=False)
+    stored = build_monitor_body(applied)
+    desired = _monitor("m")  # "enabled" removed from the definition
+
+    plan = plan_monitor_changes([desired], {"m": {"id": "1", "monitor": stored, "seq_no": 1, "primary_term": 1}})
+
+    assert plan[0]["action"] == "update"
+    assert plan_monitor_changes([applied], {"m": {"id": "1", "monitor": stored, "seq_no": 1, "primary_term": 1}})[0]["action"] == "unchanged"
+
+
+def test_update_body_keeps_trigger_and_action_ids_by_name():
+    desired = _monitor("m", threshold=5)
+    desired["triggers"][0]["bucket_level_trigger"]["actions"] = [{"name": "mail"}, {"name": "new"}]
+    stored = _monitor("m")
+    stored["triggers"][0]["bucket_level_trigger"].update(id="t-1", actions=[{"name": "mail", "id": "a-1"}])
+
+    body = build_monitor_body(desired, stored)
+
+    trigger = body["triggers"][0]["bucket_level_trigger"]
+    assert trigger["id"] == "t-1"
+    assert trigger["actions"] == [{"name": "mail", "id": "a-1"}, {"name": "new"}]
+    assert "id" not in desired["triggers"][0]["bucket_level_trigger"]
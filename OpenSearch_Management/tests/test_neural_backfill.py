@@ -0,0 +1,88 @@
+import json
+from unittest.mock import Mock
+
+from opensearch_management.logic.neural_backfill import AdaptiveBatchSizer, backfill_embeddings, split_time_range
+
+
+def test_adaptive_batch_sizer():
+    sizer = AdaptiveBatchSizer(initial=100, minimum=10, maximum=150, target_latency=2.0)
+
+    assert sizer.record(0.5) == 126
+    assert sizer.record(0.5) == 150  # capped at maximum
+    assert sizer.record(3.0) == 112  # too slow: shrink gently
+    assert sizer.record(1.0, rejected=True) == 56  # 429: halve
+
+
+def test_split_time_range_covers_whole_range():
+    partitions = split_time_range(1000, 1999, 3)
+
+    assert partitions[0]["gte"] == 1000
+    assert partitions[-1]["lt"] == 2000
+    for left, right in zip(partitions, partitions[1:]):
+        assert left["lt"] == right["gte"]
+
+
+def _client(hits_by_call, dry_run=False):
+    client = Mock(dry_run=dry_run)
+    fetches = iter(hits_by_call)
+
+    def post(path, body=None, params=None, tag=None):
+        if tag == "backfill_bounds":
+            return {"aggregations": {"min_ts": {"value": 0}, "max_ts": {"value": 99}}}
+        return {"hits": {"hits": next(fetches, [])}}
+
+    client.post.side_effect = post
+    client.bulk.return_value = {"errors": False}
+    client.get.return_value = {}
+    return client
+
+
+def _fetch_bodies(client):
+    return [call.kwargs["body"] for call in client.post.call_args_list if call.kwargs["tag"] == "backfill_fetch"]
+
+
+def _hit(doc_id, ts):
+    return {"_id": doc_id, "_source": {"@timestamp": ts}, "sort": [ts, doc_id]}
+
+
+def test_backfill_walks_partition_with_cursor_and_checkpoints(tmp_path):
+    checkpoint = tmp_path / "backfill.json"
+    client = _client([[_hit("a", 1), _hit("b", 2)]])
+
+    backfill_embeddings(client, "logs", "logs-neural", "embed", slices=1, checkpoint_path=str(checkpoint), report_interval=0.01)
+
+    bodies = _fetch_bodies(client)
+    assert "search_after" not in bodies[0]
+    assert bodies[1]["search_after"] == [2, "b"]
+    assert client.bulk.call_args.kwargs["params"]["pipeline"] == "embed"
+    partition = json.loads(checkpoint.read_text())["partitions"][0]
+    assert (partition["docs"], partition["search_after"], partition["done"]) == (2, [2, "b"], True)
+
+
+def test_backfill_resumes_pending_partitions_from_checkpoint(tmp_path):
+    checkpoint = tmp_path / "backfill.json"
+    partitions = split_time_range(0, 99, 2)
+    partitions[0].update(done=True, docs=10)
+    partitions[1].update(search_after=[60, "x"], docs=3)
+    checkpoint.write_text(json.dumps({"source": "logs", "dest": "logs-neural", "pipeline": "embed", "partitions": partitions}))
+    client = _client([[_hit("y", 70)]])
+
+    backfill_embeddings(client, "logs", "logs-neural", "embed", checkpoint_path=str(checkpoint), report_interval=0.01)
+
+    bodies = _fetch_bodies(client)
+    assert [body["search_after"] for body in bodies] == [[60, "x"], [70, "y"]]
+    assert all(call.kwargs["tag"] != "backfill_bounds" for call in client.post.call_args_list)
+    assert json.loads(checkpoint.read_text())["partitions"][1]["docs"] == 4
+
+
+def test_dry_run_resume_leaves_checkpoint_untouched(tmp_path):
+    checkpoint = tmp_path / "backfill.json"
+    saved = json.dumps({"source": "logs", "dest": "logs-neural", "pipeline": "embed", "partitions": split_time_range(0, 99, 2)})
+    checkpoint.write_text(saved)
+    client = _client([], dry_run=True)
+
+    backfill_embeddings(client, "logs", "logs-neural", "embed", checkpoint_path=str(checkpoint), report_interval=0.01)
+
+    client.post.assert_not_called()
+    client.bulk.assert_not_called()
+    assert checkpoint.read_text() == saved
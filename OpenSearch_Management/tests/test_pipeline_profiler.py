@@ -0,0 +1,88 @@
+from opensearch_management.logic.pipeline_profiler import parse_ingest_stats, processor_label, summarize_verbose, tag_processors
+
+PROCESSORS = [
+    {"drop": {"if": "ctx.host?.name != 'patroni1'"}},
+    {"text_embedding": {"model_id": "m", "field_map": {"_raw": "message_embedding"}, "tag": "embed"}},
+]
+
+
+def test_processor_label_uses_tag():
+    assert processor_label(PROCESSORS[0]) == "drop"
+    assert processor_label(PROCESSORS[1]) == "text_embedding:embed"
+
+
+def test_summarize_verbose_tracks_drops_and_growth():
+    kept = {"host": {"name": "patroni1"}, "_raw": "hello"}
+    dropped = {"host": {"name": "patroni2"}, "_raw": "bye"}
+    embedded = dict(kept, message_embedding=[0.1] * 8)
+    results = [
+        {"processor_results": [
+            {"processor_type": "drop", "tag": "profile-stage-0", "status": "skipped"},
+            {"processor_type": "text_embedding", "tag": "profile-stage-1", "status": "success", "doc": {"_source": embedded}},
+        ]},
+        {"processor_results": [{"processor_type": "drop", "tag": "profile-stage-0", "status": "dropped"}]},
+    ]
+
+    summary = summarize_verbose(PROCESSORS, [kept, dropped], results)
+    drop, embed = summary["stages"]
+    assert (drop["in"], drop["dropped"], drop["skipped"]) == (2, 1, 1)
+    assert embed["in"] == 1 and embed["inputs"] == [kept]
+    assert embed["bytes_out"] > embed["bytes_in"]
+    assert summary["totals"]["dropped"] == 1
+
+
+def test_tag_processors_keeps_config_and_original_labels():
+    tagged = tag_processors(PROCESSORS)
+    assert tagged[1]["text_embedding"]["tag"] == "profile-stage-1"
+    assert tagged[1]["text_embedding"]["model_id"] == "m"
+    assert processor_label(PROCESSORS[1]) == "text_embedding:embed"
+
+
+def test_summarize_verbose_matches_stages_by_tag_not_position():
+    processors = [
+        {"pipeline": {"name": "inner"}},
+        {"rename": {"field": "a", "target_field": "b", "on_failure": [{"set": {"field": "err", "value": "1"}}]}},
+        {"lowercase": {"field": "b"}},
+    ]
+    after_inner = {"a": "X", "inner": True}
+    with_error = dict(after_inner, err="1")
+    results = [{"processor_results": [
+        {"processor_type": "pipeline", "tag": "profile-stage-0", "status": "success"},
+        {"processor_type": "set", "status": "success", "doc": {"_source": after_inner}},
+        {"processor_type": "rename", "tag": "profile-stage-1", "status": "error", "error": {"type": "illegal_argument_exception"}},
+        {"processor_type": "set", "status": "success", "doc": {"_source": with_error}},
+        {"processor_type": "lowercase", "tag": "profile-stage-2", "status": "success", "doc": {"_source": with_error}},
+    ]}]
+
+    summary = summarize_verbose(processors, [{"a": "X"}], results)
+    pipeline, rename, lowercase = summary["stages"]
+    assert rename["inputs"] == [after_inner] and rename["failed"] == 1
+    assert lowercase["in"] == 1 and lowercase["inputs"] == [with_error]
+    assert summary["totals"]["failed"] == 0
+
+
+def test_summarize_verbose_ignore_failure_false_ends_the_document():
+    processors = [{"rename": {"field": "a", "target_field": "b", "ignore_failure": False}}, {"lowercase": {"field": "b"}}]
+    results = [{"processor_results": [
+        {"processor_type": "rename", "tag": "profile-stage-0", "status": "error", "error": {"type": "illegal_argument_exception"}},
+    ]}]
+
+    summary = summarize_verbose(processors, [{"a": "X"}], results)
+    rename, lowercase = summary["stages"]
+    assert rename["failed"] == 1 and lowercase["in"] == 0
+    assert summary["totals"]["failed"] == 1
+
+
+def test_parse_ingest_stats_sums_nodes():
+    node = {
+        "ingest": {"pipelines": {"p": {
+            "count": 10, "time_in_millis": 50, "failed": 1,
+            "processors": [
+                {"drop": {"type": "drop", "stats": {"count": 10, "time_in_millis": 2, "failed": 0}}},
+                {"text_embedding:embed": {"type": "text_embedding", "stats": {"count": 4, "time_in_millis": 40, "failed": 1}}},
+            ],
+        }}}
+    }
+    stats = parse_ingest_stats({"nodes": {"a": node, "b": node}}, "p")
+    assert stats["count"] == 20
+    assert stats["processors"][1] == {"label": "text_embedding:embed", "count": 8, "time_in_millis": 80, "failed": 2}
@@ -0,0 +1,52 @@
+import json
+
+from opensearch_management.logic.query_top import QueryStats, fingerprint, iter_history, parse_slowlog_line
+
+ERRORS_PER_HOST = {
+    "size": 0,
+    "query": {"bool": {"filter": [{"term": {"host.name": "patroni1"}}, {"match": {"_raw": "error"}}]}},
+    "aggs": {"hosts_with_errors": {"terms": {"field": "host.name", "size": 10}}},
+}
+
+
+def test_fingerprint_ignores_literals_clause_order_and_agg_names():
+    other = {
+        "size": 0,
+        "query": {"bool": {"filter": [{"match": {"_raw": "timeout"}}, {"term": {"host.name": "patroni2"}}]}},
+        "aggs": {"by_host": {"terms": {"field": "host.name", "size": 5}}},
+    }
+    assert fingerprint(ERRORS_PER_HOST)["id"] == fingerprint(other)["id"]
+    assert '"field":"host.name"' in fingerprint(ERRORS_PER_HOST)["shape"]
+
+    by_level = json.loads(json.dumps(ERRORS_PER_HOST).replace('"field": "host.name"', '"field": "log.level"'))
+    assert fingerprint(by_level)["id"] != fingerprint(ERRORS_PER_HOST)["id"]
+
+
+def test_parse_slowlog_text_and_json_layouts():
+    text = (
+        "[2024-05-01T10:00:00,000][WARN ][i.s.s.query] [node-1] [patronidata][0] took[1.2s], took_millis[1200], "
+        'total_hits[5 hits], search_type[QUERY_THEN_FETCH], total_shards[1], source[{"query":{"match":{"_raw":"error"}}}], id[], '
+    )
+    entry = parse_slowlog_line(text)
+    assert entry == {"index": "patronidata", "took_ms": 1200.0, "source": '{"query":{"match":{"_raw":"error"}}}'}
+
+    layout = {"type": "index_search_slowlog", "message": "[patronidata][2]", "took_millis": "80", "source": "{}"}
+    assert parse_slowlog_line(json.dumps(layout))["took_ms"] == 80.0
+    assert parse_slowlog_line("[2024-05-01] [INFO] started") is None
+
+
+def test_stats_aggregate_history_and_keep_worst(tmp_path):
+    for i, took in enumerate([10, 250, 40]):
+        entry = {"url": "https://localhost:9200/patronidata/_search", "body": ERRORS_PER_HOST, "took_ms": took}
+        (tmp_path / f"{i}_search.json").write_text(json.dumps(entry))
+    (tmp_path / "ignored.json").write_text(json.dumps({"url": "https://localhost:9200/_cluster/health", "body": None}))
+
+    stats = QueryStats()
+    for entry in iter_history(str(tmp_path)):
+        stats.add(entry)
+    stats.add({"index": "patronidata", "took_ms": 5, "source": '{"query": {"match_all": {}', "origin": "slowlog"})
+
+    top = stats.ranked("total")[0]
+    assert top["count"] == 3 and top["timed"].sum == 300
+    assert top["worst"]["took_ms"] == 250 and top["indices"] == {"patronidata"}
+    assert stats.unparsed == 1
@@ -0,0 +1,126 @@
+from unittest.mock import Mock
+
+from opensearch_management.logic import segment_optimizer
+from opensearch_management.logic.segment_optimizer import (
+    next_runnable,
+    optimize_segments,
+    parse_segments,
+    rank_candidates,
+)
+
+GB = 1024 ** 3
+
+
+def _row(index, shard, prirep, docs, deleted, size, node):
+    return {"index": index, "shard": shard, "prirep": prirep, "segment": "_0",
+            "docs.count": str(docs), "docs.deleted": str(deleted), "size": str(size), "node": node}
+
+
+ROWS = [
+    *[_row("logs-1", "0", "p", 100, 0, GB, "n1") for _ in range(40)],
+    *[_row("logs-1", "0", "r", 100, 0, GB, "n2") for _ in range(40)],
+    _row("logs-2", "0", "p", 900, 100, 10 * GB, "n2"),
+    _row("logs-2", "0", "p", 100, 0, GB, "n2"),
+    _row("logs-3", "0", "p", 100, 0, GB, "n1"),
+]
+
+
+def test_parse_segments_counts_primaries_and_all_copies_per_node():
+    indices = parse_segments(ROWS)
+    assert indices["logs-1"]["segments"] == 40
+    assert indices["logs-1"]["extra_segments"] == 39
+    assert indices["logs-1"]["node_bytes"] == {"n1": 40 * GB, "n2": 40 * GB}
+    assert indices["logs-2"]["reclaim_bytes"] == int(11 * GB * 100 / 1100)
+
+
+def test_rank_candidates_by_speed_or_disk_and_drops_merged():
+    indices = list(parse_segments(ROWS).values())
+    assert [i["index"] for i in rank_candidates(indices, "speed")] == ["logs-1", "logs-2"]
+    assert [i["index"] for i in rank_candidates(indices, "disk")] == ["logs-2", "logs-1"]
+
+
+def test_next_runnable_respects_node_slots_and_headroom():
+    small = {"index": "a", "node_bytes": {"n1": 5 * GB}}
+    big = {"index": "b", "node_bytes": {"n2": 50 * GB}}
+    free = {"n1": 100 * GB, "n2": 60 * GB}
+    assert next_runnable([big, small], {}, free, 1, 20 * GB) is small
+    assert next_runnable([small], {"n1": 1}, free, 1, 20 * GB) is None
+    assert next_runnable([small], {"n1": 1}, free, 2, 20 * GB) is small
+
+
+def test_apply_merges_only_finished_indices_and_polls_tasks(tmp_path, monkeypatch):
+    monkeypatch.setattr(segment_optimizer.time, "sleep", lambda _: None)
+    responses = {
+        "_cat/segments/logs-*": ROWS,
+        # Only logs-1 was rolled over; logs-2 being in a read alias does not make it finished.
+        "_cluster/state/metadata/logs-*": {"metadata": {"indices": {"logs-1": {"rollover_info": {"logs": {"time": 1}}}}}},
+        "_cat/allocation": [{"node": "n1", "disk.avail": str(500 * GB)}, {"node": "n2", "disk.avail": str(500 * GB)}],
+        "_tasks/t1": {"completed": True},
+    }
+    client = Mock(dry_run=False)
+    client.get.side_effect = lambda path, **kwargs: responses.get(path, {})
+    client.post.return_value = {"task": "t1"}
+
+    optimize_segments(client, "logs-*", apply=True)
+
+    assert [call.args[0] for call in client.post.call_args_list] == ["logs-1/_forcemerge"]
+    assert client.post.call_args.kwargs["params"] == {"wait_for_completion": "false", "max_num_segments": "1"}
+
+
+def test_allocation_error_is_retried_not_read_as_full_disks(monkeypatch):
+    monkeypatch.setattr(segment_optimizer.time, "sleep", lambda _: None)
+    allocation = iter([Exception("503 Service Unavailable")])
+
+    def get(path, **kwargs):
+        if path == "_cat/allocation":
+            error = next(allocation, None)
+            if error:
+                raise error
+            return [{"node": "n1", "disk.avail": str(500 * GB)}, {"node": "n2", "disk.avail": str(500 * GB)}]
+        return {"_cat/segments/logs-*": ROWS, "_tasks/t1": {"completed": True}}.get(path, {})
+
+    client = Mock(dry_run=False)
+    client.get.side_effect = get
+    client.post.return_value = {"task": "t1"}
+
+    optimize_segments(client, "logs-*", apply=True, include_active=True, concurrency=2)
+
+    assert sorted(call.args[0] for call in client.post.call_args_list) == ["logs-1/_forcemerge", "logs-2/_forcemerge"]
+
+
+def test_plan_only_does_not_merge():
+    client = Mock(dry_run=False)
+    client.get.side_effect = lambda path, **kwargs: ROWS if path.startswith("_cat/segments") else {}
+
+    optimize_segments(client, "logs-*", include_active=True)
+
+    client.post.assert_not_called()
+
+
+def test_read_only_indices_are_skipped_and_merge_errors_do_not_abort(monkeypatch):
+    monkeypatch.setattr(segment_optimizer.time, "sleep", lambda _: None)
+    responses = {
+        # logs-3 has two segments now, so only its block keeps it out.
+        "_cat/segments/logs-*": ROWS + [_row("logs-3", "0", "p", 100, 0, GB, "n1")],
+        "logs-*/_settings/index.blocks.write,index.blocks.read_only,index.blocks.read_only_allow_delete": {
+            "logs-1": {"settings": {"index.blocks.write": "true"}},
+            "logs-2": {"settings": {"index.blocks.write": "true"}},
+            "logs-3": {"settings": {"index.blocks.read_only_allow_delete": "true"}},
+        },
+        "_cat/allocation": [{"node": "n1", "disk.avail": str(500 * GB)}, {"node": "n2", "disk.avail": str(500 * GB)}],
+        "_tasks/t2": {"completed": True},
+    }
+    client = Mock(dry_run=False)
+    client.get.side_effect = lambda path, **kwargs: responses.get(path, {})
+
+    def post(path, **kwargs):
+        if path == "logs-1/_forcemerge":
+            raise Exception("403 cluster_block_exception")
+        return {"task": "t2"}
+
+    client.post.side_effect = post
+
+    optimize_segments(client, "logs-*", apply=True, concurrency=1)
+
+    assert [call.args[0] for call in client.post.call_args_list] == ["logs-1/_forcemerge", "logs-2/_forcemerge"]
+    assert client.get.call_args.args[0] == "logs-2/_stats/segments,docs,store"
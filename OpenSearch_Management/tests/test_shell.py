@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from opensearch_management.cli import ContextPool
+from opensearch_management.shell import _StreamWriter, attach, command_path, runs_locally, send_control, serve
+
+
+def test_attach_without_daemon_falls_back(tmp_path):
+    assert attach(["hello"], str(tmp_path / "missing.sock")) is None
+
+
+def test_command_path_skips_global_options():
+    assert command_path(["--config", "prod.yaml", "--dry-run", "neural", "backfill", "src"]) == ["neural", "backfill"]
+    assert command_path(["-c", "daemon", "index", "info", "daemon"]) == ["index", "info"]
+
+
+def test_long_running_and_daemon_commands_run_locally():
+    assert runs_locally(["--cluster", "prod", "tail", "logs"])
+    assert runs_locally(["search", "async", "logs"])
+    assert runs_locally(["daemon", "stop"])
+    assert not runs_locally(["search", "hybrid", "logs", "text"])
+    # An index named like a local command is still forwarded.
+    assert not runs_locally(["index", "info", "daemon"])
+
+
+def test_stream_writer_interrupts_command_once_client_is_gone():
+    channel = Mock()
+    channel.send.side_effect = BrokenPipeError()
+
+    with pytest.raises(KeyboardInterrupt):
+        _StreamWriter(channel, "stdout").write("more output")
+
+
+def test_context_pool_reuses_contexts_until_config_changes(tmp_path):
+    config = tmp_path / "config.yaml"
+    config.write_text("settings:\n  app_env: test\n")
+    pool = ContextPool()
+
+    first = pool.context(str(config), False, False)
+    assert pool.context(str(config), False, False) is first
+    assert pool.context(str(config), True, False) is not first
+
+    os.utime(config, (time.time() + 10, time.time() + 10))
+    assert pool.context(str(config), False, False) is not first
+
+
+def test_daemon_round_trip(tmp_path):
+    path = str(tmp_path / "d.sock")
+    thread = threading.Thread(target=serve, args=(path, ContextPool()), daemon=True)
+    thread.start()
+    deadline = time.time() + 5
+    while not os.path.exists(path) and time.time() < deadline:
+        time.sleep(0.01)
+
+    # The client runs in its own process: the daemon redirects this process's stdout.
+    code = f"import sys; from opensearch_management.shell import attach; sys.exit(attach(['hello', '--name', 'tester'], {path!r}))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=tmp_path)
+    assert result.returncode == 0
+    assert "Hello, tester!" in result.stdout
+
+    assert send_control(path, "ping")["commands"] == 1
+    send_control(path, "stop")
+    thread.join(5)
+    assert not os.path.exists(path)
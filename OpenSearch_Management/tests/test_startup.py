@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+# Modules that only commands talking to the cluster should pay for.
+HEAVY_MODULES = ("requests", "structlog", "pydantic", "yaml", "numpy")
+
+# Cumulative import time budget for opensearch_management.cli (microseconds).
+# Generous to avoid CI noise; a regression to eager imports is several times larger.
+IMPORT_BUDGET_US = 250_000
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], capture_output=True, text=True, check=True)
+
+
+def test_help_does_not_import_heavy_modules():
+    code = (
+        "import sys\n"
+        "from typer.testing import CliRunner\n"
+        "from opensearch_management.cli import app\n"
+        "CliRunner().invoke(app, ['neural', '--help'])\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    assert _run(code).stdout.strip() == ""
+
+
+def test_cli_import_time_budget():
+    result = _run("import opensearch_management.cli", "-X", "importtime")
+    line = next(line for line in result.stderr.splitlines() if line.rstrip().endswith("| opensearch_management.cli"))
+    cumulative_us = int(line.split("|")[1])
+    assert cumulative_us < IMPORT_BUDGET_US, line
+
+    # rich (typer renders help with it) and importlib.metadata stay unloaded on plain import.
+    loaded = {line.split("|")[2].strip() for line in result.stderr.splitlines() if line.count("|") == 2}
+    assert not loaded & {*HEAVY_MODULES, "rich.console", "importlib.metadata"}
+
+
+def test_entry_point_imports_only_stdlib():
+    # The console script forwards to a running daemon before importing the CLI.
+    code = "import sys, opensearch_management.shell; print(','.join(m for m in ('typer', 'requests', 'pydantic') if m in sys.modules))"
+    assert _run(code).stdout.strip() == ""
@@ -0,0 +1,56 @@
+import pytest
+from unittest.mock import Mock
+from opensearch_management.waits import WaitTimeout, poll_until, wait_for_cluster_health, wait_for_task
+
+
+def test_poll_until_returns_first_truthy_result():
+    results = iter([None, None, {"done": True}])
+    assert poll_until(lambda: next(results), timeout=5, initial=0.001) == {"done": True}
+
+
+def test_poll_until_times_out():
+    with pytest.raises(WaitTimeout):
+        poll_until(lambda: None, timeout=0.05, initial=0.01)
+
+
+def test_wait_for_cluster_health_uses_server_side_wait():
+    client = Mock()
+    client.get.return_value = {"status": "green", "timed_out": False}
+
+    wait_for_cluster_health(client, status="yellow", index="logs", timeout=10)
+
+    path = client.get.call_args.args[0]
+    params = client.get.call_args.kwargs["params"]
+    assert path == "_cluster/health/logs"
+    assert params["wait_for_status"] == "yellow"
+
+
+def _health_timeout():
+    error = Exception("408 Client Error: Request Timeout")
+    error.response = Mock(status_code=408)
+    error.response.json.return_value = {"status": "red", "timed_out": True}
+    return error
+
+
+def test_wait_for_cluster_health_keeps_waiting_after_server_timeout():
+    client = Mock()
+    client.get.side_effect = [_health_timeout(), {"status": "yellow", "timed_out": False}]
+
+    assert wait_for_cluster_health(client, status="yellow", timeout=10)["status"] == "yellow"
+    assert client.get.call_count == 2
+
+
+def test_wait_for_cluster_health_raises_wait_timeout_after_server_timeouts():
+    client = Mock()
+    client.get.side_effect = _health_timeout()
+
+    with pytest.raises(WaitTimeout, match="is red"):
+        wait_for_cluster_health(client, status="green", timeout=0.05)
+
+
+def test_wait_for_task_raises_on_task_error():
+    client = Mock()
+    client.get.return_value = {"completed": True, "error": {"type": "search_phase_execution_exception"}}
+
+    with pytest.raises(RuntimeError):
+        wait_for_task(client, "node:1", timeout=1)